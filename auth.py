@@ -0,0 +1,120 @@
+import base64
+import hashlib
+import hmac
+import json
+import logging
+import os
+import secrets
+import time
+
+from cache import TTLCache
+
+logger = logging.getLogger("donorconnect.auth")
+
+# scrypt cost: 2**14 iterations x 8 x 128 bytes = 16 MiB of memory per hash
+SCRYPT_N, SCRYPT_R, SCRYPT_P = 2 ** 14, 8, 1
+SCRYPT_MAXMEM = 64 * 1024 * 1024
+HASH_PREFIX = "scrypt"
+
+
+class InvalidToken(Exception):
+    """Raised for malformed, tampered or expired tokens"""
+
+
+def _b64encode(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode("ascii")
+
+
+def _b64decode(text: str) -> bytes:
+    return base64.urlsafe_b64decode(text + "=" * (-len(text) % 4))
+
+
+def hash_password(password: str) -> str:
+    """scrypt hash in the form scrypt$n$r$p$salt$hash (CPU and memory heavy; run off the event loop)"""
+    salt = secrets.token_bytes(16)
+    digest = hashlib.scrypt(password.encode(), salt=salt, n=SCRYPT_N, r=SCRYPT_R, p=SCRYPT_P,
+                            maxmem=SCRYPT_MAXMEM, dklen=32)
+    return f"{HASH_PREFIX}${SCRYPT_N}${SCRYPT_R}${SCRYPT_P}${_b64encode(salt)}${_b64encode(digest)}"
+
+
+def verify_password(password: str, stored: str):
+    """Return (matches, needs_rehash).
+
+    Rows written before hashing was introduced hold the plaintext password;
+    those still verify, and ``needs_rehash`` tells the caller to upgrade them.
+    """
+    if stored and stored.startswith(HASH_PREFIX + "$"):
+        try:
+            _, n, r, p, salt, digest = stored.split("$")
+            expected = _b64decode(digest)
+            actual = hashlib.scrypt(password.encode(), salt=_b64decode(salt), n=int(n), r=int(r), p=int(p),
+                                    maxmem=SCRYPT_MAXMEM, dklen=len(expected))
+        except ValueError:
+            return False, False
+        return hmac.compare_digest(actual, expected), (int(n), int(r), int(p)) != (SCRYPT_N, SCRYPT_R, SCRYPT_P)
+    matches = hmac.compare_digest((stored or "").encode(), password.encode())
+    return matches, matches
+
+
+# Verified against when the username is unknown, so both cases cost the same
+DUMMY_HASH = None
+
+
+def dummy_verify(password: str):
+    global DUMMY_HASH
+    if DUMMY_HASH is None:
+        DUMMY_HASH = hash_password(secrets.token_hex(8))
+    verify_password(password, DUMMY_HASH)
+
+
+class TokenSigner:
+    """Issues and verifies stateless HMAC-SHA256 signed, expiring tokens.
+
+    A token is ``base64url(claims).base64url(signature)``; verifying one is
+    a single HMAC with no database access. Verified tokens are remembered
+    in a small TTL cache so repeat requests skip even the HMAC and JSON
+    decode.
+    """
+
+    def __init__(self, secret: bytes, ttl=3600, cache_size=10000, cache_ttl=60):
+        self.secret = secret
+        self.ttl = ttl
+        self._verified = TTLCache(maxsize=cache_size, ttl=cache_ttl)
+
+    @classmethod
+    def from_env(cls):
+        secret = os.getenv("AUTH_SECRET")
+        if not secret:
+            # Tokens will not survive a restart or work across worker processes
+            logger.warning("AUTH_SECRET is not set; using a random per-process signing key")
+            secret = secrets.token_hex(32)
+        return cls(
+            secret.encode(),
+            ttl=int(os.getenv("AUTH_TOKEN_TTL", 3600)),
+            cache_size=int(os.getenv("AUTH_TOKEN_CACHE_SIZE", 10000)),
+        )
+
+    def _sign(self, payload: bytes) -> bytes:
+        return hmac.new(self.secret, payload, hashlib.sha256).digest()
+
+    def issue(self, username: str, role: str) -> str:
+        now = int(time.time())
+        claims = {"sub": username, "role": role, "iat": now, "exp": now + self.ttl}
+        payload = _b64encode(json.dumps(claims, separators=(",", ":")).encode())
+        return f"{payload}.{_b64encode(self._sign(payload.encode()))}"
+
+    def verify(self, token: str) -> dict:
+        claims = self._verified.get(token)
+        if claims is None:
+            try:
+                payload, signature = token.split(".")
+                valid = hmac.compare_digest(self._sign(payload.encode()), _b64decode(signature))
+                claims = json.loads(_b64decode(payload)) if valid else None
+            except (ValueError, UnicodeDecodeError):
+                raise InvalidToken("Malformed token")
+            if claims is None:
+                raise InvalidToken("Bad token signature")
+            self._verified.set(token, claims)
+        if claims.get("exp", 0) < time.time():
+            raise InvalidToken("Token expired")
+        return claims
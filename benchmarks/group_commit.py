@@ -0,0 +1,149 @@
+"""Donation intake: one commit per row versus group commit.
+
+    DB_PASS=bench python -m benchmarks.group_commit --writers 32 --rows 5000
+
+Runs the same number of concurrent writers against donation_records twice:
+once with the per-request path (insert + commit on a pooled connection)
+and once through GroupCommitter. Reports rows/s, commits issued, average
+cost per commit and acknowledgement latency percentiles. Rows written by
+the benchmark are deleted afterwards.
+"""
+
+import argparse
+import os
+import sys
+import threading
+import time
+from datetime import date
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import schema  # noqa: E402
+from db import ConnectionPool  # noqa: E402
+from group_commit import GroupCommitter  # noqa: E402
+from metrics import GROUP_COMMIT_FLUSH  # noqa: E402
+
+INSERT_SQL = """
+    INSERT INTO donation_records
+    (patient_name, blood_type, doctor_name, date, time, blood_pressure, symptoms, medical_history, contact_number)
+    VALUES (%s,%s,%s,%s,%s,%s,%s,%s,%s)
+"""
+MARKER = "bench-group-commit"
+
+
+def row(i):
+    return (MARKER, "O+", "Dr. Bench", date.today(), "10:00:00", 120, "none", f"row {i}", "9000000000")
+
+
+def per_row_insert(pool, params):
+    with pool.connection() as conn:
+        cur = conn.cursor()
+        try:
+            cur.execute(INSERT_SQL, params)
+            conn.commit()
+        finally:
+            cur.close()
+
+
+def drive(writers, rows, submit):
+    """Run ``writers`` threads that together submit ``rows`` rows; return per-row latencies"""
+    latencies = []
+    lock = threading.Lock()
+    counter = iter(range(rows))
+
+    def worker():
+        local = []
+        while True:
+            with lock:
+                i = next(counter, None)
+            if i is None:
+                break
+            start = time.perf_counter()
+            submit(row(i))
+            local.append(time.perf_counter() - start)
+        with lock:
+            latencies.extend(local)
+
+    threads = [threading.Thread(target=worker) for _ in range(writers)]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return latencies, time.perf_counter() - start
+
+
+def report(label, latencies, elapsed, commits, commit_seconds):
+    latencies.sort()
+    pct = lambda p: latencies[min(len(latencies) - 1, int(p / 100 * len(latencies)))] * 1000  # noqa: E731
+    print(f"{label}")
+    print(f"  rows/s              : {len(latencies) / elapsed:10,.0f}")
+    print(f"  commits             : {commits:10}")
+    print(f"  rows per commit     : {len(latencies) / commits:10.1f}")
+    print(f"  avg commit cost     : {commit_seconds / commits * 1000:10.2f} ms")
+    print(f"  ack p50 / p99       : {pct(50):8.2f} / {pct(99):.2f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--writers", type=int, default=32)
+    parser.add_argument("--rows", type=int, default=5000)
+    parser.add_argument("--max-rows", type=int, default=100, help="group commit batch cap")
+    parser.add_argument("--max-delay-ms", type=float, default=5)
+    args = parser.parse_args()
+
+    conn = schema.connect()
+    try:
+        schema.migrate(conn)
+    finally:
+        conn.close()
+
+    pool = ConnectionPool(
+        size=args.writers, timeout=30, warm=args.writers,
+        host=os.getenv("DB_HOST", "localhost"),
+        user=os.getenv("DB_USER", "root"),
+        password=os.getenv("DB_PASS", ""),
+        database=os.getenv("DB_NAME", "patient"),
+    )
+    pool.open()
+    try:
+        # Current path: every request inserts and commits on its own
+        commit_time = [0.0]
+        timing_lock = threading.Lock()
+
+        def timed_per_row(params):
+            start = time.perf_counter()
+            per_row_insert(pool, params)
+            with timing_lock:
+                commit_time[0] += time.perf_counter() - start
+
+        latencies, elapsed = drive(args.writers, args.rows, timed_per_row)
+        report("commit per row", latencies, elapsed, len(latencies), commit_time[0])
+
+        # Group commit: rows share one multi-row INSERT and one commit per batch
+        committer = GroupCommitter(pool, INSERT_SQL, max_rows=args.max_rows, max_delay=args.max_delay_ms / 1000)
+        committer.start()
+        flushes_before = GROUP_COMMIT_FLUSH.snapshot()
+        try:
+            latencies, elapsed = drive(args.writers, args.rows, lambda params: committer.submit(params).result())
+        finally:
+            committer.stop()
+        commits, commit_seconds = [a - b for a, b in zip(GROUP_COMMIT_FLUSH.snapshot(), flushes_before)]
+        report(f"group commit (max {args.max_rows} rows / {args.max_delay_ms} ms)", latencies, elapsed, commits, commit_seconds)
+    finally:
+        with pool.connection() as conn:
+            cur = conn.cursor()
+            try:
+                cur.execute("DELETE FROM donation_records WHERE patient_name = %s", (MARKER,))
+                conn.commit()
+            finally:
+                cur.close()
+        pool.close()
+
+
+if __name__ == "__main__":
+    from dotenv import load_dotenv
+
+    load_dotenv()
+    main()
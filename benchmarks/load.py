@@ -0,0 +1,352 @@
+"""Load driver: mixed read/write scenarios against a running API.
+
+    uvicorn api:app --port 8000 &
+    python -m benchmarks.load --scenario mixed --concurrency 32 --duration 60
+    python -m benchmarks.load --scenario mixed --compare benchmarks/results/<baseline>.json
+
+Each virtual user picks operations by weight from the scenario and records
+per-operation latency. Results (p50/p90/p99/max, throughput, errors, git
+commit) are written as JSON under benchmarks/results/, and --compare flags
+operations whose p99 or throughput regressed beyond --tolerance.
+Seed the database first with benchmarks.seed so IDs, cities and the admin
+account (--user/--password, BENCH_USER/BENCH_PASSWORD) exist.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+
+import httpx
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from benchmarks.seed import BLOOD_GROUPS, CITIES, CITY_COORDS, DEFAULT_PASSWORD, DEFAULT_USER  # noqa: E402
+from ids import format_id  # noqa: E402
+
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+
+
+class Context:
+    """Shared state for virtual users: known IDs to read back, RNG, scale, credentials"""
+
+    def __init__(self, rng, donors, user, password):
+        self.rng = rng
+        self.donors = donors
+        self.user = user
+        self.password = password
+        self.request_ids = []
+        self.appointment_ids = []
+
+    def donor_id(self):
+        return format_id("D", self.rng.randrange(1, self.donors + 1))
+
+    def city(self):
+        return self.rng.choice(CITIES)
+
+    def group(self):
+        return self.rng.choice(BLOOD_GROUPS)
+
+
+# ---- operations: each returns the httpx response ----
+async def list_donors(client, ctx):
+    return await client.get("/api/donors", params={"city": ctx.city(), "blood_group": ctx.group(), "limit": 100})
+
+async def list_donors_page(client, ctx):
+    return await client.get("/api/donors", params={"after": ctx.donor_id(), "limit": 100})
+
+async def list_camps(client, ctx):
+    return await client.get("/api/camps", params={"city": ctx.city()})
+
+async def list_inventory(client, ctx):
+    return await client.get("/api/inventory", params={"blood_group": ctx.group()})
+
+async def inventory_summary(client, ctx):
+    return await client.get("/api/inventory/summary")
+
+async def nearest_inventory(client, ctx):
+    lat, lon = CITY_COORDS[ctx.city()]
+    return await client.get("/api/inventory/nearest", params={
+        "lat": lat + ctx.rng.uniform(-0.2, 0.2), "lon": lon + ctx.rng.uniform(-0.2, 0.2),
+        "blood_group": ctx.group(), "units": ctx.rng.randrange(1, 6),
+    })
+
+async def get_dashboard(client, ctx):
+    return await client.get("/api/dashboard")
+
+async def list_doctors(client, ctx):
+    return await client.get("/api/doctors")
+
+async def list_emergency_requests(client, ctx):
+    return await client.get("/api/emergency-requests", params={"status": "pending"})
+
+async def list_appointments(client, ctx):
+    return await client.get("/api/appointments", params={"date_from": date.today().isoformat()})
+
+async def match_donors(client, ctx):
+    request_id = ctx.rng.choice(ctx.request_ids) if ctx.request_ids else "R0000001"
+    return await client.get(f"/api/emergency-requests/{request_id}/matches")
+
+async def export_doctors(client, ctx):
+    return await client.get("/api/doctors/export", params={"format": "ndjson"})
+
+async def create_donor(client, ctx):
+    n = ctx.rng.randrange(10**9)
+    return await client.post("/api/donors", json={
+        "name": f"Bench Donor {n}", "blood_group": ctx.group(), "phone": f"9{n:09d}",
+        "email": f"bench{n}@example.com", "city": ctx.city(),
+        "last_donation_date": (date.today() - timedelta(days=ctx.rng.randrange(400))).isoformat(),
+        "gender": "Female", "age": 30,
+    })
+
+async def create_camp(client, ctx):
+    return await client.post("/api/camps", json={
+        "title": "Bench Camp", "venue": "Bench Hall", "city": ctx.city(),
+        "date": (date.today() + timedelta(days=ctx.rng.randrange(1, 60))).isoformat(),
+        "start_time": "09:00", "end_time": "15:00", "organizer": "Bench", "capacity": 100,
+    })
+
+async def create_inventory(client, ctx):
+    return await client.post("/api/inventory", json={
+        "blood_group": ctx.group(), "units_available": ctx.rng.randrange(1, 10),
+        "location": f"{ctx.city()} Blood Bank {ctx.rng.randrange(1, 6)}",
+        "expiry_date": (date.today() + timedelta(days=ctx.rng.randrange(1, 42))).isoformat(),
+    })
+
+async def create_donation(client, ctx):
+    return await client.post("/api/donations", json={
+        "patient_name": "Bench Patient", "blood_type": ctx.group(), "doctor_name": "Dr. Bench",
+        "date": date.today().isoformat(), "time": "10:00:00", "blood_pressure": 120,
+        "symptoms": "none", "medical_history": "none", "contact_number": "9000000000",
+    })
+
+async def create_emergency_request(client, ctx):
+    response = await client.post("/api/emergency-requests", json={
+        "hospital_name": "Bench Hospital", "blood_group": ctx.group(), "units_needed": 2, "city": ctx.city(),
+    })
+    if response.status_code == 200:
+        ctx.request_ids.append(response.json()["request_id"])
+    return response
+
+async def update_emergency_status(client, ctx):
+    request_id = ctx.rng.choice(ctx.request_ids) if ctx.request_ids else "R0000001"
+    return await client.put(f"/api/emergency-requests/{request_id}/status", json={"status": "fulfilled"})
+
+async def create_appointment(client, ctx):
+    response = await client.post("/api/appointments", json={
+        "patient_name": "Bench Patient", "doctor_name": "Dr. Bench", "specialty": "Hematology",
+        "date": (date.today() + timedelta(days=ctx.rng.randrange(1, 30))).isoformat(),
+        "time": f"{ctx.rng.randrange(9, 17):02d}:00", "reason": "Checkup", "phone": "9000000000",
+    })
+    if response.status_code == 200:
+        ctx.appointment_ids.append(response.json()["appointment_id"])
+    return response
+
+async def update_appointment_status(client, ctx):
+    appointment_id = ctx.rng.choice(ctx.appointment_ids) if ctx.appointment_ids else "A0000001"
+    return await client.put(f"/api/appointments/{appointment_id}/status", json={"status": "completed"})
+
+async def login(client, ctx):
+    return await client.post("/api/auth/login", json={"username": ctx.user, "password": ctx.password})
+
+async def register(client, ctx):
+    n = ctx.rng.randrange(10**12)
+    return await client.post("/api/auth/register", json={
+        "username": f"bench{n}", "email": f"bench{n}@example.com", "password": "bench-password",
+    })
+
+async def create_doctor(client, ctx):
+    n = ctx.rng.randrange(10**9)
+    return await client.post("/api/doctors", json={
+        "name": f"Dr. Bench {n}", "specialty": "Hematology", "phone": f"8{n:09d}",
+        "email": f"doctor{n}@example.com", "city": ctx.city(),
+    })
+
+async def import_donors(client, ctx):
+    lines = []
+    for _ in range(100):
+        n = ctx.rng.randrange(10**9)
+        lines.append(json.dumps({
+            "name": f"Bench Donor {n}", "blood_group": ctx.group(), "phone": f"9{n:09d}",
+            "email": f"bench{n}@example.com", "city": ctx.city(),
+            "last_donation_date": date.today().isoformat(), "gender": "Male", "age": 40,
+        }))
+    return await client.post("/api/donors/import", params={"format": "ndjson"}, content="\n".join(lines).encode())
+
+async def export_donors_csv(client, ctx):
+    return await client.get("/api/donors/export", params={"format": "csv", "fields": "donor_id,blood_group,city"})
+
+async def chatbot(client, ctx):
+    return await client.post("/api/chatbot", json={"message": f"how many {ctx.group()} units in {ctx.city()}"})
+
+
+# scenario -> {operation: weight}
+SCENARIOS = {
+    "read": {
+        list_donors: 20, list_donors_page: 10, list_camps: 10, list_inventory: 10, inventory_summary: 15,
+        list_doctors: 10, list_emergency_requests: 10, list_appointments: 10, match_donors: 5,
+        nearest_inventory: 10, get_dashboard: 10,
+    },
+    "camp-day": {
+        create_donor: 25, create_donation: 30, create_inventory: 15, list_camps: 10,
+        inventory_summary: 10, list_donors: 10, import_donors: 1, get_dashboard: 5,
+    },
+    "emergency": {
+        create_emergency_request: 20, match_donors: 40, update_emergency_status: 10,
+        list_emergency_requests: 20, inventory_summary: 10, nearest_inventory: 20,
+    },
+    "mixed": {
+        list_donors: 10, list_donors_page: 5, list_camps: 6, list_inventory: 6, inventory_summary: 8,
+        list_doctors: 5, list_emergency_requests: 6, list_appointments: 5, match_donors: 6, nearest_inventory: 5,
+        export_doctors: 1, create_donor: 6, create_camp: 2, create_inventory: 4, create_donation: 6,
+        create_emergency_request: 3, update_emergency_status: 2, create_appointment: 4,
+        update_appointment_status: 2, create_doctor: 1, login: 2, register: 1, import_donors: 1,
+        export_donors_csv: 1, chatbot: 1, get_dashboard: 4,
+    },
+}
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, max(0, int(round(pct / 100 * len(sorted_values))) - 1))
+    return sorted_values[index]
+
+
+async def virtual_user(client, ctx, operations, weights, deadline, samples):
+    while time.perf_counter() < deadline:
+        op = ctx.rng.choices(operations, weights)[0]
+        start = time.perf_counter()
+        try:
+            response = await op(client, ctx)
+            ok = response.status_code < 400
+        except httpx.HTTPError:
+            ok = False
+        samples.setdefault(op.__name__, []).append((time.perf_counter() - start, ok))
+
+
+async def run(args):
+    scenario = SCENARIOS[args.scenario]
+    operations, weights = list(scenario), list(scenario.values())
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    samples = {}
+    async with httpx.AsyncClient(base_url=args.url, limits=limits, timeout=30) as client:
+        ctx = Context(random.Random(args.seed), args.donors, args.user, args.password)
+        # Write, import and export routes need a bearer token
+        response = await login(client, ctx)
+        if response.status_code == 401:
+            raise SystemExit(f"Login as {args.user!r} failed; create the account with benchmarks.seed")
+        response.raise_for_status()
+        client.headers["Authorization"] = f"Bearer {response.json()['token']}"
+        if args.warmup:
+            await asyncio.gather(*(
+                virtual_user(client, ctx, operations, weights, time.perf_counter() + args.warmup, {})
+                for _ in range(args.concurrency)
+            ))
+        start = time.perf_counter()
+        deadline = start + args.duration
+        await asyncio.gather(*(
+            virtual_user(client, ctx, operations, weights, deadline, samples)
+            for _ in range(args.concurrency)
+        ))
+        elapsed = time.perf_counter() - start
+    return samples, elapsed
+
+
+def summarize(samples, elapsed):
+    operations = {}
+    total = errors = 0
+    for name, values in sorted(samples.items()):
+        latencies = sorted(v[0] * 1000 for v in values)
+        failed = sum(1 for v in values if not v[1])
+        total += len(values)
+        errors += failed
+        operations[name] = {
+            "count": len(values),
+            "errors": failed,
+            "rps": round(len(values) / elapsed, 2),
+            "p50_ms": round(percentile(latencies, 50), 2),
+            "p90_ms": round(percentile(latencies, 90), 2),
+            "p99_ms": round(percentile(latencies, 99), 2),
+            "max_ms": round(latencies[-1], 2),
+        }
+    return {"requests": total, "errors": errors, "rps": round(total / elapsed, 2), "operations": operations}
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def compare(current, baseline, tolerance):
+    """Print per-operation deltas; return the names that regressed"""
+    regressions = []
+    print(f"\nCompared with {baseline['commit']} ({baseline['timestamp']}):")
+    for name, now in current["operations"].items():
+        before = baseline["operations"].get(name)
+        if not before:
+            continue
+        p99_delta = (now["p99_ms"] - before["p99_ms"]) / before["p99_ms"] * 100 if before["p99_ms"] else 0
+        rps_delta = (now["rps"] - before["rps"]) / before["rps"] * 100 if before["rps"] else 0
+        flag = ""
+        if p99_delta > tolerance or rps_delta < -tolerance:
+            flag = "  REGRESSION"
+            regressions.append(name)
+        print(f"  {name:28} p99 {before['p99_ms']:>8} -> {now['p99_ms']:>8} ms ({p99_delta:+6.1f}%)  "
+              f"rps {before['rps']:>8} -> {now['rps']:>8} ({rps_delta:+6.1f}%){flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--scenario", choices=sorted(SCENARIOS), default="mixed")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=30, help="seconds to measure")
+    parser.add_argument("--warmup", type=float, default=5, help="seconds to run before measuring")
+    parser.add_argument("--donors", type=int, default=10_000, help="donor count the database was seeded with")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--user", default=os.getenv("BENCH_USER", DEFAULT_USER), help="admin account from benchmarks.seed")
+    parser.add_argument("--password", default=os.getenv("BENCH_PASSWORD", DEFAULT_PASSWORD))
+    parser.add_argument("--out", type=Path, help="result file (default benchmarks/results/<time>-<commit>-<scenario>.json)")
+    parser.add_argument("--compare", type=Path, help="earlier result file to compare against")
+    parser.add_argument("--tolerance", type=float, default=10, help="allowed regression in percent")
+    args = parser.parse_args()
+
+    samples, elapsed = asyncio.run(run(args))
+    now = datetime.now(timezone.utc)
+    result = {
+        "commit": git_commit(),
+        "timestamp": now.isoformat(timespec="seconds"),
+        "scenario": args.scenario,
+        "concurrency": args.concurrency,
+        "duration_s": round(elapsed, 2),
+        "url": args.url,
+        **summarize(samples, elapsed),
+    }
+
+    out = args.out or RESULTS_DIR / f"{now:%Y%m%dT%H%M%S}-{result['commit']}-{args.scenario}.json"
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps(result, indent=2))
+
+    print(f"{args.scenario}: {result['requests']} requests, {result['errors']} errors, {result['rps']} req/s")
+    for name, stats in result["operations"].items():
+        print(f"  {name:28} n={stats['count']:>6} p50={stats['p50_ms']:>8} p99={stats['p99_ms']:>8} ms  errors={stats['errors']}")
+    print(f"Results written to {out}")
+
+    if args.compare:
+        regressions = compare(result, json.loads(args.compare.read_text()), args.tolerance)
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,246 @@
+"""Synthetic data generator for benchmarks.
+
+    python -m benchmarks.seed --donors 100000 --truncate
+
+Seeds donors, camps, doctors, blood_inventory, emergency_requests and
+appointments at a chosen scale (10k to 10M donors; the other tables scale
+with it unless given explicitly). Data is deterministic for a given
+--seed, so runs on different commits see the same database. Intended for
+a throwaway MySQL, e.g.:
+
+    docker run -d --name donorconnect-mysql -p 3306:3306 \\
+        -e MYSQL_ROOT_PASSWORD=bench -e MYSQL_DATABASE=patient mysql:8.0
+    DB_PASS=bench python -m benchmarks.seed --donors 100000 --truncate
+
+It also creates the admin account that benchmarks.load and the
+test_setup.py --concurrency checks log in with (BENCH_USER and
+BENCH_PASSWORD, see DEFAULT_USER below).
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import auth  # noqa: E402
+import schema  # noqa: E402
+from ids import ID_SEQUENCES, format_id  # noqa: E402
+
+# Account for the load driver and concurrency checks; only ever seeded into a throwaway database
+DEFAULT_USER, DEFAULT_PASSWORD = "bench-admin", "bench-admin-password"
+
+BLOOD_GROUPS = ["O+", "A+", "B+", "AB+", "O-", "A-", "B-", "AB-"]
+# Rough population frequencies, so compatibility matching sees realistic skew
+BLOOD_GROUP_WEIGHTS = [37, 28, 20, 5, 4, 3, 2, 1]
+CITIES = ["Kolkata", "Pune", "Delhi", "Mumbai", "Chennai", "Bengaluru", "Hyderabad", "Jaipur", "Lucknow", "Bhopal"]
+# City centres; seeded locations are scattered around them for the nearest-bank index
+CITY_COORDS = {
+    "Kolkata": (22.5726, 88.3639), "Pune": (18.5204, 73.8567), "Delhi": (28.6139, 77.2090),
+    "Mumbai": (19.0760, 72.8777), "Chennai": (13.0827, 80.2707), "Bengaluru": (12.9716, 77.5946),
+    "Hyderabad": (17.3850, 78.4867), "Jaipur": (26.9124, 75.7873), "Lucknow": (26.8467, 80.9462),
+    "Bhopal": (23.2599, 77.4126),
+}
+SPECIALTIES = ["Hematology", "Cardiology", "General Medicine", "Pediatrics", "Oncology"]
+FIRST_NAMES = ["Aarav", "Priya", "Rahul", "Ananya", "Vikram", "Sneha", "Arjun", "Isha", "Rohan", "Meera"]
+LAST_NAMES = ["Sharma", "Das", "Rao", "Iyer", "Gupta", "Sen", "Patel", "Nair", "Bose", "Singh"]
+
+TABLE_COLUMNS = {
+    "donors": ["donor_id", "name", "blood_group", "phone", "email", "city", "last_donation_date", "gender", "age"],
+    "camps": ["camp_id", "title", "venue", "city", "date", "start_time", "end_time", "organizer", "capacity", "registered", "latitude", "longitude"],
+    "doctors": ["doctor_id", "name", "specialty", "phone", "email", "city"],
+    "blood_inventory": ["inventory_id", "blood_group", "units_available", "location", "camp_id", "expiry_date", "latitude", "longitude"],
+    "emergency_requests": ["request_id", "hospital_name", "blood_group", "units_needed", "city", "status", "contact_phone", "contact_email"],
+    "appointments": ["appointment_id", "patient_name", "doctor_name", "specialty", "date", "time", "status", "reason", "phone"],
+}
+
+
+def person(rng):
+    return f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+
+
+def near(rng, city, spread=0.15):
+    lat, lon = CITY_COORDS[city]
+    return round(lat + rng.uniform(-spread, spread), 6), round(lon + rng.uniform(-spread, spread), 6)
+
+
+def donor_rows(rng, count, today):
+    for i in range(1, count + 1):
+        yield (
+            format_id("D", i), person(rng),
+            rng.choices(BLOOD_GROUPS, BLOOD_GROUP_WEIGHTS)[0],
+            f"9{rng.randrange(10**9):09d}", f"donor{i}@example.com", rng.choice(CITIES),
+            None if rng.random() < 0.05 else today - timedelta(days=rng.randrange(730)),
+            rng.choice(["Male", "Female"]), rng.randrange(18, 66),
+        )
+
+
+def camp_rows(rng, count, today):
+    for i in range(1, count + 1):
+        city = rng.choice(CITIES)
+        start = rng.choice([8, 9, 10])
+        yield (
+            format_id("C", i), f"{city} Blood Drive {i}", f"Community Hall {rng.randrange(1, 50)}", city,
+            today + timedelta(days=rng.randrange(-180, 180)), f"{start:02d}:00:00", f"{start + 6:02d}:00:00",
+            f"{rng.choice(LAST_NAMES)} Foundation", rng.choice([50, 100, 200]), 0, *near(rng, city),
+        )
+
+
+def doctor_rows(rng, count):
+    for i in range(1, count + 1):
+        yield (
+            format_id("T", i), f"Dr. {person(rng)}", rng.choice(SPECIALTIES),
+            f"8{rng.randrange(10**9):09d}", f"doctor{i}@example.com", rng.choice(CITIES),
+        )
+
+
+def inventory_rows(rng, count, camps, today):
+    # A few blood banks per city, each with a fixed position, holding many lots
+    banks = [(f"{city} Blood Bank {n}", *near(rng, city)) for city in CITIES for n in range(1, 6)]
+    for i in range(1, count + 1):
+        location, lat, lon = rng.choice(banks)
+        yield (
+            format_id("I", i), rng.choices(BLOOD_GROUPS, BLOOD_GROUP_WEIGHTS)[0], rng.randrange(1, 20),
+            location, format_id("C", rng.randrange(1, camps + 1)) if camps else None,
+            today + timedelta(days=rng.randrange(-10, 42)), lat, lon,
+        )
+
+
+def request_rows(rng, count):
+    for i in range(1, count + 1):
+        yield (
+            format_id("R", i), f"{rng.choice(CITIES)} General Hospital", rng.choices(BLOOD_GROUPS, BLOOD_GROUP_WEIGHTS)[0],
+            rng.randrange(1, 10), rng.choice(CITIES), rng.choice(["pending", "pending", "fulfilled", "cancelled"]),
+            f"7{rng.randrange(10**9):09d}", f"er{i}@hospital.example.com",
+        )
+
+
+def appointment_rows(rng, count, doctors, today):
+    names = [f"Dr. {first} {last}" for first in FIRST_NAMES for last in LAST_NAMES]
+    for i in range(1, count + 1):
+        yield (
+            format_id("A", i), person(rng), rng.choice(names[:max(1, doctors)]), rng.choice(SPECIALTIES),
+            today + timedelta(days=rng.randrange(-30, 30)), f"{rng.randrange(9, 17):02d}:{rng.choice(['00', '30'])}:00",
+            rng.choice(["scheduled", "scheduled", "completed", "cancelled"]), "Routine check", f"6{rng.randrange(10**9):09d}",
+        )
+
+
+def insert(conn, table, rows, batch_size):
+    columns = TABLE_COLUMNS[table]
+    sql = f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join(['%s'] * len(columns))})"
+    cur = conn.cursor()
+    total = 0
+    batch = []
+    try:
+        for row in rows:
+            batch.append(row)
+            if len(batch) >= batch_size:
+                cur.executemany(sql, batch)
+                conn.commit()
+                total += len(batch)
+                batch.clear()
+        if batch:
+            cur.executemany(sql, batch)
+            conn.commit()
+            total += len(batch)
+    finally:
+        cur.close()
+    return total
+
+
+def seed_admin(conn, username, password):
+    """Create the benchmark admin account, or reset its password and role"""
+    cur = conn.cursor()
+    try:
+        cur.execute(
+            "INSERT INTO users (username, email, password, role) VALUES (%s, NULL, %s, 'admin') "
+            "ON DUPLICATE KEY UPDATE password = VALUES(password), role = 'admin'",
+            (username, auth.hash_password(password)),
+        )
+        conn.commit()
+    finally:
+        cur.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--donors", type=int, default=10_000)
+    parser.add_argument("--camps", type=int, help="default donors / 100")
+    parser.add_argument("--doctors", type=int, help="default max(50, donors / 1000)")
+    parser.add_argument("--inventory", type=int, help="default donors / 10")
+    parser.add_argument("--requests", type=int, help="default donors / 50")
+    parser.add_argument("--appointments", type=int, help="default donors / 10")
+    parser.add_argument("--batch-size", type=int, default=5000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--truncate", action="store_true", help="empty the tables first")
+    parser.add_argument("--user", default=os.getenv("BENCH_USER", DEFAULT_USER), help="admin account to create")
+    parser.add_argument("--password", default=os.getenv("BENCH_PASSWORD", DEFAULT_PASSWORD))
+    args = parser.parse_args()
+
+    counts = {
+        "donors": args.donors,
+        "camps": args.camps if args.camps is not None else max(1, args.donors // 100),
+        "doctors": args.doctors if args.doctors is not None else max(50, args.donors // 1000),
+        "blood_inventory": args.inventory if args.inventory is not None else args.donors // 10,
+        "emergency_requests": args.requests if args.requests is not None else args.donors // 50,
+        "appointments": args.appointments if args.appointments is not None else args.donors // 10,
+    }
+    rng = random.Random(args.seed)
+    today = date.today()
+
+    conn = schema.connect()
+    try:
+        schema.migrate(conn)
+        cur = conn.cursor()
+        try:
+            if args.truncate:
+                for table in TABLE_COLUMNS:
+                    cur.execute(f"TRUNCATE TABLE {table}")
+                cur.execute("DELETE FROM id_sequences")
+                conn.commit()
+        finally:
+            cur.close()
+
+        generators = {
+            "donors": donor_rows(rng, counts["donors"], today),
+            "camps": camp_rows(rng, counts["camps"], today),
+            "doctors": doctor_rows(rng, counts["doctors"]),
+            "blood_inventory": inventory_rows(rng, counts["blood_inventory"], counts["camps"], today),
+            "emergency_requests": request_rows(rng, counts["emergency_requests"]),
+            "appointments": appointment_rows(rng, counts["appointments"], counts["doctors"], today),
+        }
+        for table, rows in generators.items():
+            start = time.perf_counter()
+            total = insert(conn, table, rows, args.batch_size)
+            elapsed = time.perf_counter() - start
+            print(f"  {table:20} : {total:>10} rows in {elapsed:7.1f}s ({total / elapsed if elapsed else 0:,.0f} rows/s)")
+
+        # Point the ID sequences past the seeded rows so API inserts continue from there
+        cur = conn.cursor()
+        try:
+            for table in ID_SEQUENCES:
+                cur.execute(
+                    "REPLACE INTO id_sequences (name, next_value) VALUES (%s, %s)",
+                    (table, counts[table] + 1),
+                )
+            cur.execute("ANALYZE TABLE " + ", ".join(TABLE_COLUMNS))
+            cur.fetchall()
+            conn.commit()
+        finally:
+            cur.close()
+        # Rows were inserted directly, so recount the dashboard from the tables
+        schema.rebuild_dashboard(conn)
+        seed_admin(conn, args.user, args.password)
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    from dotenv import load_dotenv
+
+    load_dotenv()
+    main()
@@ -0,0 +1,105 @@
+"""Micro-benchmark: JSON encoding time and bytes on the wire for a large donor list.
+
+    python -m benchmarks.serialization --rows 100000
+
+Compares FastAPI's default path (jsonable_encoder + json.dumps) with the
+orjson-based encoder in responses.py, then gzip/brotli sizes of the body.
+"""
+
+import argparse
+import json
+import random
+import sys
+import time
+import zlib
+from datetime import date, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from ids import format_id  # noqa: E402
+from responses import brotli, dumps, orjson  # noqa: E402
+
+BLOOD_GROUPS = ["A+", "A-", "B+", "B-", "AB+", "AB-", "O+", "O-"]
+CITIES = ["Kolkata", "Pune", "Delhi", "Mumbai", "Chennai", "Bengaluru", "Hyderabad"]
+
+
+def make_donors(count):
+    """Rows shaped like list_donors output, with the same Python types MySQL returns"""
+    rng = random.Random(42)
+    today = date.today()
+    return [
+        {
+            "donor_id": format_id("D", i),
+            "name": f"Donor {i}",
+            "blood_group": rng.choice(BLOOD_GROUPS),
+            "phone": f"9{rng.randrange(10**9):09d}",
+            "email": f"donor{i}@example.com",
+            "city": rng.choice(CITIES),
+            "last_donation_date": today - timedelta(days=rng.randrange(720)),
+            "gender": rng.choice(["Male", "Female"]),
+            "age": rng.randrange(18, 65),
+        }
+        for i in range(1, count + 1)
+    ]
+
+
+def baseline_encode(rows):
+    try:
+        from fastapi.encoders import jsonable_encoder
+    except ImportError:
+        return json.dumps(rows, default=str).encode()
+    return json.dumps(jsonable_encoder(rows)).encode()
+
+
+def best_of(fn, arg, repeat):
+    timings = []
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn(arg)
+        timings.append(time.perf_counter() - start)
+    return min(timings), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--json", action="store_true", help="print machine-readable results")
+    args = parser.parse_args()
+
+    rows = make_donors(args.rows)
+    base_time, base_body = best_of(baseline_encode, rows, args.repeat)
+    fast_time, fast_body = best_of(dumps, rows, args.repeat)
+    gzip_time, gzip_body = best_of(lambda b: zlib.compress(b, 6), fast_body, args.repeat)
+    results = {
+        "rows": args.rows,
+        "encoder": "orjson" if orjson is not None else "json (orjson not installed)",
+        "baseline_encode_ms": round(base_time * 1000, 2),
+        "fast_encode_ms": round(fast_time * 1000, 2),
+        "speedup": round(base_time / fast_time, 2),
+        "raw_bytes": len(fast_body),
+        "baseline_raw_bytes": len(base_body),
+        "gzip_bytes": len(gzip_body),
+        "gzip_ms": round(gzip_time * 1000, 2),
+    }
+    if brotli is not None:
+        br_time, br_body = best_of(lambda b: brotli.compress(b, quality=4), fast_body, args.repeat)
+        results.update({"brotli_bytes": len(br_body), "brotli_ms": round(br_time * 1000, 2)})
+
+    if args.json:
+        print(json.dumps(results))
+        return
+    print(f"Serializing {args.rows} donors (best of {args.repeat})")
+    print("-" * 50)
+    print(f"  jsonable_encoder + json : {results['baseline_encode_ms']:>9} ms  {results['baseline_raw_bytes']:>11} bytes")
+    print(f"  {results['encoder']:23} : {results['fast_encode_ms']:>9} ms  {results['raw_bytes']:>11} bytes")
+    print(f"  speedup                 : {results['speedup']:>9}x")
+    print(f"  gzip (level 6)          : {results['gzip_ms']:>9} ms  {results['gzip_bytes']:>11} bytes")
+    if "brotli_bytes" in results:
+        print(f"  brotli (quality 4)      : {results['brotli_ms']:>9} ms  {results['brotli_bytes']:>11} bytes")
+
+
+if __name__ == "__main__":
+    main()
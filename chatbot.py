@@ -0,0 +1,143 @@
+import asyncio
+import logging
+import os
+import re
+
+from cache import TTLCache
+
+logger = logging.getLogger("donorconnect.chatbot")
+
+SYSTEM_PROMPT = (
+    "You are the DonorConnect assistant for a blood donation camp and inventory "
+    "management system. Answer briefly."
+)
+
+
+class ChatProvider:
+    """Interface for chat backends; ``complete`` returns the model's reply text"""
+
+    async def complete(self, prompt: str) -> str:
+        raise NotImplementedError
+
+    async def close(self):
+        pass
+
+
+class OpenAICompatibleProvider(ChatProvider):
+    """Calls any OpenAI-style /chat/completions endpoint (OpenAI, or a local stand-in server)"""
+
+    def __init__(self, base_url, api_key=None, model="gpt-3.5-turbo", max_tokens=150, temperature=0.7):
+        import httpx
+
+        headers = {"Authorization": f"Bearer {api_key}"} if api_key else {}
+        self.client = httpx.AsyncClient(base_url=base_url.rstrip("/"), headers=headers)
+        self.model = model
+        self.max_tokens = max_tokens
+        self.temperature = temperature
+
+    async def complete(self, prompt: str) -> str:
+        response = await self.client.post("/chat/completions", json={
+            "model": self.model,
+            "messages": [
+                {"role": "system", "content": SYSTEM_PROMPT},
+                {"role": "user", "content": prompt},
+            ],
+            "max_tokens": self.max_tokens,
+            "temperature": self.temperature,
+        })
+        response.raise_for_status()
+        return response.json()["choices"][0]["message"]["content"].strip()
+
+    async def close(self):
+        await self.client.aclose()
+
+
+class EchoProvider(ChatProvider):
+    """Offline provider used when no model is configured"""
+
+    async def complete(self, prompt: str) -> str:
+        return fallback_reply(prompt)
+
+
+def fallback_reply(message: str) -> str:
+    return f"I understood your request: {message[:50]}... Please check the DonorConnect system."
+
+
+def provider_from_env() -> ChatProvider:
+    """CHATBOT_BASE_URL points at OpenAI or any compatible server; without a key or URL, echo"""
+    base_url = os.getenv("CHATBOT_BASE_URL")
+    api_key = os.getenv("OPENAI_API_KEY")
+    if not base_url and not api_key:
+        return EchoProvider()
+    try:
+        return OpenAICompatibleProvider(
+            base_url or "https://api.openai.com/v1",
+            api_key=api_key,
+            model=os.getenv("CHATBOT_MODEL", "gpt-3.5-turbo"),
+        )
+    except ImportError:
+        logger.warning("httpx is not installed; chatbot falls back to canned replies")
+        return EchoProvider()
+
+
+def normalize_prompt(message: str) -> str:
+    """Cache key for a prompt: case, spacing and trailing punctuation don't matter"""
+    return re.sub(r"\s+", " ", message).strip().lower().rstrip("?!. ")
+
+
+class ChatService:
+    """Bounded, cached front door to a ChatProvider.
+
+    At most ``max_concurrency`` upstream calls run at once; a request that
+    can't get a slot within ``queue_timeout`` seconds, or whose call exceeds
+    ``timeout``, gets the canned fallback instead of holding resources.
+    Successful replies are cached by normalized prompt.
+    """
+
+    def __init__(self, provider: ChatProvider, timeout=8.0, max_concurrency=4, queue_timeout=0.5, cache=None):
+        self.provider = provider
+        self.timeout = timeout
+        self.queue_timeout = queue_timeout
+        self.cache = cache if cache is not None else TTLCache(maxsize=512, ttl=3600)
+        self._slots = asyncio.Semaphore(max_concurrency)
+
+    @classmethod
+    def from_env(cls):
+        return cls(
+            provider_from_env(),
+            timeout=float(os.getenv("CHATBOT_TIMEOUT", 8)),
+            max_concurrency=int(os.getenv("CHATBOT_MAX_CONCURRENCY", 4)),
+            queue_timeout=float(os.getenv("CHATBOT_QUEUE_TIMEOUT", 0.5)),
+            cache=TTLCache(
+                maxsize=int(os.getenv("CHATBOT_CACHE_SIZE", 512)),
+                ttl=float(os.getenv("CHATBOT_CACHE_TTL", 3600)),
+            ),
+        )
+
+    async def reply(self, message: str) -> str:
+        key = ("chat", normalize_prompt(message))
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached
+
+        try:
+            await asyncio.wait_for(self._slots.acquire(), self.queue_timeout)
+        except asyncio.TimeoutError:
+            logger.info("Chatbot busy, answering with fallback")
+            return fallback_reply(message)
+        try:
+            text = await asyncio.wait_for(self.provider.complete(message), self.timeout)
+        except asyncio.TimeoutError:
+            logger.warning("Chatbot provider timed out after %ss", self.timeout)
+            return fallback_reply(message)
+        except Exception as e:
+            logger.warning("Chatbot provider failed: %s", e)
+            return fallback_reply(message)
+        finally:
+            self._slots.release()
+
+        self.cache.set(key, text)
+        return text
+
+    async def close(self):
+        await self.provider.close()
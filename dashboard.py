@@ -0,0 +1,131 @@
+import random
+from collections import Counter
+from datetime import date
+
+BLOOD_GROUPS = ("A+", "A-", "B+", "B-", "AB+", "AB-", "O+", "O-")
+# Each writer adds to one of SHARDS rows per counter, so concurrent inserts
+# rarely wait on the same row lock; readers sum the shards
+SHARDS = 8
+DONATION_MONTHS = 6
+
+UPSERT_SQL = """
+    INSERT INTO dashboard_counters (metric, dim, shard, value) VALUES (%s, %s, %s, %s)
+    ON DUPLICATE KEY UPDATE value = value + VALUES(value)
+"""
+
+
+def bump(cur, deltas: Counter):
+    """Apply counter deltas inside the caller's transaction.
+
+    Rows are written in sorted order so two transactions on the same shard
+    always lock counters in the same sequence and cannot deadlock.
+    """
+    rows = sorted((metric, dim, value) for (metric, dim), value in deltas.items() if value)
+    if rows:
+        shard = random.randrange(SHARDS)
+        cur.executemany(UPSERT_SQL, [(metric, dim, shard, value) for metric, dim, value in rows])
+
+
+def donors_added(blood_groups) -> Counter:
+    deltas = Counter()
+    for group in blood_groups:
+        deltas["donors", ""] += 1
+        deltas["donors_by_group", group] += 1
+    return deltas
+
+
+def camps_added(dates) -> Counter:
+    return Counter(("camps_by_date", str(day)) for day in dates)
+
+
+def units_changed(lots) -> Counter:
+    """``lots`` is (blood_group, units) pairs; negative units remove stock"""
+    deltas = Counter()
+    for group, units in lots:
+        deltas["units_by_group", group] += units
+    return deltas
+
+
+def request_status_changed(old: str, new: str) -> Counter:
+    deltas = Counter()
+    if old:
+        deltas["requests_by_status", old] -= 1
+    deltas["requests_by_status", new] += 1
+    return deltas
+
+
+def appointment_status_changed(day, old: str, new: str) -> Counter:
+    deltas = Counter()
+    if old:
+        deltas["appointments_by_day", f"{day}/{old}"] -= 1
+    deltas["appointments_by_day", f"{day}/{new}"] += 1
+    return deltas
+
+
+def donations_added(dates) -> Counter:
+    return Counter(("donations_by_month", str(day)[:7]) for day in dates)
+
+
+def _month_offset(day: date, months: int) -> str:
+    index = day.year * 12 + day.month - 1 + months
+    return f"{index // 12:04d}-{index % 12 + 1:02d}"
+
+
+def snapshot(conn, today: date) -> dict:
+    """Every dashboard figure from one range read of dashboard_counters"""
+    first_month = _month_offset(today, 1 - DONATION_MONTHS)
+    cur = conn.cursor()
+    try:
+        cur.execute(
+            """
+            SELECT metric, dim, SUM(value) FROM dashboard_counters
+            WHERE metric IN ('donors', 'donors_by_group', 'units_by_group', 'requests_by_status')
+               OR (metric = 'camps_by_date' AND dim >= %s)
+               OR (metric = 'appointments_by_day' AND dim LIKE %s)
+               OR (metric = 'donations_by_month' AND dim >= %s)
+            GROUP BY metric, dim
+            """,
+            (today.isoformat(), f"{today.isoformat()}/%", first_month),
+        )
+        rows = cur.fetchall()
+    finally:
+        cur.close()
+
+    counters = {}
+    for metric, dim, value in rows:
+        counters.setdefault(metric, {})[dim] = int(value)
+    donors_by_group = counters.get("donors_by_group", {})
+    units_by_group = counters.get("units_by_group", {})
+    requests = counters.get("requests_by_status", {})
+    camps = counters.get("camps_by_date", {})
+    appointments = {dim.split("/", 1)[1]: n for dim, n in counters.get("appointments_by_day", {}).items() if n}
+    donations = counters.get("donations_by_month", {})
+    return {
+        "as_of": today.isoformat(),
+        "donors": {
+            "total": counters.get("donors", {}).get("", 0),
+            "by_blood_group": [{"blood_group": g, "donors": donors_by_group.get(g, 0)} for g in BLOOD_GROUPS],
+        },
+        "camps": {
+            "upcoming": sum(camps.values()),
+            "by_date": [{"date": d, "camps": n} for d, n in sorted(camps.items()) if n],
+        },
+        "inventory": {
+            "units_available": sum(units_by_group.values()),
+            "by_blood_group": [{"blood_group": g, "units": units_by_group.get(g, 0)} for g in BLOOD_GROUPS],
+        },
+        "emergency_requests": {
+            "pending": requests.get("pending", 0),
+            "fulfilled": requests.get("fulfilled", 0),
+            "by_status": {status: n for status, n in requests.items() if n},
+        },
+        "appointments_today": {
+            "total": sum(appointments.values()),
+            "scheduled": appointments.get("scheduled", 0),
+            "by_status": appointments,
+        },
+        "donations_by_month": [
+            {"month": month, "donations": donations.get(month, 0)}
+            for month in (_month_offset(today, i) for i in range(1 - DONATION_MONTHS, 1))
+        ],
+    }
@@ -0,0 +1,222 @@
+import logging
+import os
+import queue
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+
+import mysql.connector
+
+from metrics import DB_CONNECT, DB_POOL_WAIT, TimedCursor, add_phase
+
+logger = logging.getLogger("donorconnect.db")
+
+
+class PoolExhausted(Exception):
+    """Raised when no pooled connection frees up within the wait timeout"""
+
+
+class PooledConnection:
+    """Thin proxy around a MySQL connection that remembers its age in the pool.
+
+    It also keeps up to ``max_statements`` server-side prepared statements,
+    one prepared cursor per SQL string, so a statement is parsed once per
+    connection rather than once per request. The least recently used one is
+    closed (deallocated on the server) when the cache is full; all of them
+    go away with the connection.
+    """
+
+    def __init__(self, raw, max_statements=64):
+        self.raw = raw
+        self.created_at = time.monotonic()
+        self.last_used = self.created_at
+        self.max_statements = max_statements
+        self._statements = OrderedDict()
+
+    def __getattr__(self, name):
+        return getattr(self.raw, name)
+
+    def cursor(self, *args, **kwargs):
+        return TimedCursor(self.raw.cursor(*args, **kwargs))
+
+    @contextmanager
+    def statement(self, sql: str):
+        """Cursor for running ``sql``, prepared once and reused while cached.
+
+        The caller must read every row before leaving the block. A statement
+        that raises is dropped from the cache, since it may have left rows
+        unread. With caching disabled this is a plain, closed-after-use cursor.
+        """
+        if self.max_statements <= 0:
+            cursor = self.cursor()
+            try:
+                yield cursor
+            finally:
+                cursor.close()
+            return
+        cursor = self._statements.get(sql)
+        if cursor is None:
+            cursor = self._statements[sql] = self.cursor(prepared=True)
+            if len(self._statements) > self.max_statements:
+                self.forget(next(iter(self._statements)))
+        else:
+            self._statements.move_to_end(sql)
+        try:
+            yield cursor
+        except BaseException:
+            self.forget(sql)
+            raise
+
+    def forget(self, sql: str):
+        """Drop one cached statement, e.g. after it failed with rows left unread"""
+        cursor = self._statements.pop(sql, None)
+        if cursor is not None:
+            try:
+                cursor.close()
+            except mysql.connector.Error:
+                pass
+
+
+class ConnectionPool:
+    """Fixed-size MySQL connection pool with bounded waits, pre-ping and recycling.
+
+    Connections are opened lazily up to ``size`` and handed out LIFO so the
+    warmest connection is reused first. A connection idle for longer than
+    ``ping_interval`` seconds is pinged before it is handed out, and one older
+    than ``recycle`` seconds is closed and replaced.
+    """
+
+    def __init__(self, size=10, timeout=5.0, recycle=3600, ping_interval=30, warm=1, max_statements=64,
+                 **connect_kwargs):
+        self.size = size
+        self.max_statements = max_statements
+        self.timeout = timeout
+        self.recycle = recycle
+        self.ping_interval = ping_interval
+        self.warm = min(warm, size)
+        self.connect_kwargs = connect_kwargs
+        self._idle = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(size)
+        self._closed = False
+
+    @classmethod
+    def from_env(cls, **connect_kwargs):
+        """Build a pool sized from DB_POOL_* environment variables"""
+        return cls(
+            size=int(os.getenv("DB_POOL_SIZE", 10)),
+            timeout=float(os.getenv("DB_POOL_TIMEOUT", 5)),
+            recycle=int(os.getenv("DB_POOL_RECYCLE", 3600)),
+            ping_interval=int(os.getenv("DB_POOL_PING_INTERVAL", 30)),
+            warm=int(os.getenv("DB_POOL_WARM", 1)),
+            max_statements=int(os.getenv("DB_STATEMENT_CACHE_SIZE", 64)),
+            **connect_kwargs,
+        )
+
+    def _connect(self):
+        start = time.perf_counter()
+        conn = PooledConnection(mysql.connector.connect(**self.connect_kwargs), self.max_statements)
+        elapsed = time.perf_counter() - start
+        DB_CONNECT.observe(elapsed, kind="connect")
+        add_phase("connect", elapsed)
+        return conn
+
+    def open(self):
+        """Pre-open ``warm`` connections so the first requests skip the handshake"""
+        self._closed = False
+        for _ in range(self.warm):
+            try:
+                self._idle.put(self._connect())
+            except mysql.connector.Error as e:
+                logger.warning("Could not pre-open pooled connection: %s", e)
+                break
+
+    def close(self):
+        """Drain the pool, closing every idle connection"""
+        self._closed = True
+        while True:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            self._discard(conn)
+
+    def _discard(self, conn):
+        try:
+            conn.raw.close()
+        except Exception:
+            pass
+
+    def _is_healthy(self, conn):
+        now = time.monotonic()
+        if now - conn.created_at > self.recycle:
+            return False
+        if now - conn.last_used > self.ping_interval:
+            start = time.perf_counter()
+            try:
+                conn.raw.ping(reconnect=False)
+            except mysql.connector.Error:
+                return False
+            finally:
+                elapsed = time.perf_counter() - start
+                DB_CONNECT.observe(elapsed, kind="ping")
+                add_phase("connect", elapsed)
+        return True
+
+    def acquire(self, timeout=None):
+        """Borrow a connection, waiting at most ``timeout`` seconds for a free slot"""
+        if self._closed:
+            raise PoolExhausted("Connection pool is closed")
+        wait = self.timeout if timeout is None else timeout
+        start = time.perf_counter()
+        acquired = self._slots.acquire(timeout=wait)
+        waited = time.perf_counter() - start
+        DB_POOL_WAIT.observe(waited)
+        add_phase("pool_wait", waited)
+        if not acquired:
+            raise PoolExhausted(f"No database connection available within {wait}s")
+        try:
+            while True:
+                try:
+                    conn = self._idle.get_nowait()
+                except queue.Empty:
+                    conn = self._connect()
+                    break
+                if self._is_healthy(conn):
+                    break
+                self._discard(conn)
+        except Exception:
+            self._slots.release()
+            raise
+        conn.last_used = time.monotonic()
+        return conn
+
+    def release(self, conn, discard=False):
+        """Return a borrowed connection; broken ones are closed instead of reused"""
+        try:
+            if not discard:
+                try:
+                    if conn.raw.in_transaction:
+                        conn.raw.rollback()
+                except mysql.connector.Error:
+                    discard = True
+            if discard or self._closed:
+                self._discard(conn)
+            else:
+                conn.last_used = time.monotonic()
+                self._idle.put(conn)
+        finally:
+            self._slots.release()
+
+    @contextmanager
+    def connection(self, timeout=None):
+        """Context manager form of acquire/release"""
+        conn = self.acquire(timeout)
+        broken = False
+        try:
+            yield conn
+        except (mysql.connector.errors.OperationalError, mysql.connector.errors.InterfaceError):
+            broken = True
+            raise
+        finally:
+            self.release(conn, discard=broken)
@@ -0,0 +1,154 @@
+import asyncio
+import itertools
+import logging
+import threading
+from collections import deque
+
+from responses import dumps
+
+logger = logging.getLogger("donorconnect.events")
+
+HEARTBEAT_SECONDS = 15.0
+
+
+class TooManySubscribers(Exception):
+    """Raised when the hub is already serving its maximum number of streams"""
+
+
+class Subscription:
+    """One subscriber's bounded queue of pre-encoded SSE frames"""
+
+    def __init__(self, topics, queue_size):
+        self.topics = topics
+        self.queue = asyncio.Queue(maxsize=queue_size)
+        self.overflowed = False
+
+
+class EventHub:
+    """In-process broadcast of change events to Server-Sent Events subscribers.
+
+    Each event is encoded once into an SSE frame and the same bytes are put
+    on every matching subscriber's bounded queue, so fan-out to thousands of
+    streams costs one encode plus a queue put each. A subscriber whose queue
+    fills up is disconnected rather than slowing publishers down; the
+    browser reconnects with Last-Event-ID and replays what it missed from
+    the last ``history`` events. ``publish`` is safe to call from the
+    threadpool that runs the sync endpoints.
+
+    With a ``log`` (shared_cache.SharedEventLog) the hub spans every worker
+    process: ``publish`` appends to the shared log, which hands out global
+    event ids, and each worker polls the log every ``poll_interval`` seconds
+    and fans new events out to its own subscribers, in id order.
+    """
+
+    def __init__(self, queue_size=64, history=1024, max_subscribers=10000, log=None, poll_interval=0.05):
+        self.queue_size = queue_size
+        self.max_subscribers = max_subscribers
+        self.log = log
+        self.poll_interval = poll_interval
+        self._seen = 0
+        self._poller = None
+        self._history = deque(maxlen=history)  # (event id, topic, frame)
+        self._subscribers = set()
+        self._ids = itertools.count(1)
+        self._loop = None
+        self._lock = threading.Lock()
+
+    def bind(self, loop):
+        """Attach to the server's event loop; call once at startup"""
+        self._loop = loop
+        if self.log is not None:
+            # Seed the replay history from the shared log, then follow it
+            for event_id, topic, frame in self.log.read_since(max(0, self.log.latest() - self._history.maxlen)):
+                self._history.append((event_id, topic, frame))
+                self._seen = event_id
+            self._seen = max(self._seen, self.log.latest())
+            self._poller = loop.create_task(self._follow())
+
+    async def _follow(self):
+        while True:
+            await asyncio.sleep(self.poll_interval)
+            try:
+                if self.log.latest() > self._seen:
+                    for event_id, topic, frame in self.log.read_since(self._seen):
+                        self._fanout(event_id, topic, frame)
+                        self._seen = event_id
+            except Exception:
+                logger.exception("Could not read the shared event log")
+
+    def __len__(self):
+        return len(self._subscribers)
+
+    def publish(self, topic: str, event: str, data: dict):
+        """Queue ``data`` for every subscriber of ``topic``; callable from any thread"""
+        if self.log is not None:
+            body = b"event: %s\ndata: %s\n\n" % (event.encode(), dumps(data))
+            # Delivered to this worker's subscribers by _follow, like everyone else's
+            try:
+                self.log.append(topic, lambda event_id: b"id: %d\n" % event_id + body)
+            except ValueError as e:
+                logger.warning("Dropped %s event: %s", event, e)
+            return
+        if self._loop is None:
+            return
+        with self._lock:
+            event_id = next(self._ids)
+        frame = b"id: %d\nevent: %s\ndata: %s\n\n" % (event_id, event.encode(), dumps(data))
+        try:
+            self._loop.call_soon_threadsafe(self._fanout, event_id, topic, frame)
+        except RuntimeError:
+            # Loop already closed during shutdown
+            pass
+
+    def _fanout(self, event_id, topic, frame):
+        self._history.append((event_id, topic, frame))
+        for sub in self._subscribers:
+            if topic not in sub.topics or sub.overflowed:
+                continue
+            try:
+                sub.queue.put_nowait((event_id, frame))
+            except asyncio.QueueFull:
+                # Too slow to keep up: end its stream so it resumes from history
+                sub.overflowed = True
+
+    def subscribe(self, topics, last_event_id=None):
+        """Return an async iterator of SSE frames for ``topics``.
+
+        Events newer than ``last_event_id`` that are still in the history
+        are replayed first. Comment lines are sent as heartbeats so idle
+        connections survive proxies.
+        """
+        if len(self._subscribers) >= self.max_subscribers:
+            raise TooManySubscribers(f"Event stream limit of {self.max_subscribers} reached")
+        return self._stream(frozenset(topics), last_event_id)
+
+    async def _stream(self, topics, last_event_id):
+        sub = Subscription(topics, self.queue_size)
+        self._subscribers.add(sub)
+        try:
+            yield b"retry: 2000\n\n"
+            sent = 0
+            if self.log is not None:
+                # The shared log may be ahead of this worker's history by one poll
+                latest = self.log.latest()
+            else:
+                latest = self._history[-1][0] if self._history else 0
+            # An ID from before a server restart is newer than anything we have; start fresh
+            if last_event_id is not None and last_event_id <= latest:
+                sent = last_event_id
+                for event_id, topic, frame in list(self._history):
+                    if event_id > sent and topic in topics:
+                        sent = event_id
+                        yield frame
+            while not sub.overflowed or not sub.queue.empty():
+                try:
+                    event_id, frame = await asyncio.wait_for(sub.queue.get(), timeout=HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    yield b": keep-alive\n\n"
+                    continue
+                # Skip anything already replayed from history
+                if event_id > sent:
+                    sent = event_id
+                    yield frame
+        finally:
+            self._subscribers.discard(sub)
@@ -0,0 +1,190 @@
+import math
+import threading
+import time
+from datetime import date
+
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE = 111.32
+
+
+def haversine_km(lat1, lon1, lat2, lon2) -> float:
+    """Great-circle distance between two points in kilometres"""
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    dphi = phi2 - phi1
+    dlambda = math.radians(lon2 - lon1)
+    a = math.sin(dphi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlambda / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+class GeoGrid:
+    """Fixed-size lat/lon grid for nearest-neighbour lookups.
+
+    Points are bucketed into ``cell_deg`` square cells. ``nearby`` walks
+    rings of cells outwards from the query point, so a lookup touches only
+    the cells near it, and stops once every unvisited cell is further away
+    than the radius or than the k-th result already found.
+    """
+
+    def __init__(self, cell_deg=0.25):
+        self.cell_deg = cell_deg
+        self._lon_cells = int(round(360 / cell_deg))
+        self._cells = {}   # (lat cell, lon cell) -> {key: (lat, lon)}
+        self._points = {}  # key -> cell
+
+    def _cell(self, lat, lon):
+        return math.floor(lat / self.cell_deg), math.floor(lon / self.cell_deg) % self._lon_cells
+
+    def __len__(self):
+        return len(self._points)
+
+    def add(self, key, lat, lon):
+        self.remove(key)
+        cell = self._cell(lat, lon)
+        self._cells.setdefault(cell, {})[key] = (lat, lon)
+        self._points[key] = cell
+
+    def remove(self, key):
+        cell = self._points.pop(key, None)
+        if cell is not None:
+            points = self._cells[cell]
+            points.pop(key, None)
+            if not points:
+                del self._cells[cell]
+
+    def nearby(self, lat, lon, radius_km, k=None, accept=None):
+        """Return [(distance_km, key)] within ``radius_km``, closest first.
+
+        ``accept(key)`` filters candidates before they count towards ``k``.
+        """
+        center_lat, center_lon = self._cell(lat, lon)
+        # Narrowest cell dimension near the query point bounds how far each ring reaches
+        cos_lat = max(math.cos(math.radians(min(abs(lat) + self.cell_deg, 89.9))), 0.01)
+        ring_km = self.cell_deg * KM_PER_DEGREE * cos_lat
+        max_ring = min(int(radius_km / ring_km) + 1, self._lon_cells // 2)
+        found = []
+        for ring in range(max_ring + 1):
+            # Everything in this ring or beyond is at least (ring - 1) cells away
+            if k is not None and len(found) >= k and sorted(found)[k - 1][0] <= (ring - 1) * ring_km:
+                break
+            for dlat in range(-ring, ring + 1):
+                for dlon in range(-ring, ring + 1):
+                    if max(abs(dlat), abs(dlon)) != ring:
+                        continue
+                    cell = (center_lat + dlat, (center_lon + dlon) % self._lon_cells)
+                    for key, (plat, plon) in self._cells.get(cell, {}).items():
+                        distance = haversine_km(lat, lon, plat, plon)
+                        if distance <= radius_km and (accept is None or accept(key)):
+                            found.append((distance, key))
+        found.sort()
+        return found[:k] if k is not None else found
+
+
+class StockLocator:
+    """In-memory index of blood stock by location for nearest-bank queries.
+
+    Each inventory location with coordinates is a point in a GeoGrid and
+    carries its unexpired lots per blood group. ``load`` rebuilds from
+    MySQL; ``add_lot`` applies a new lot incrementally. The index is also
+    rebuilt every ``ttl`` seconds so issues, expiry and writes from other
+    processes are picked up.
+    """
+
+    def __init__(self, pool, ttl=300, cell_deg=0.25):
+        self.pool = pool
+        self.ttl = ttl
+        self.cell_deg = cell_deg
+        self._grid = GeoGrid(cell_deg)
+        self._stock = {}  # location -> {"latitude", "longitude", "lots": {blood_group: [(expiry, units)]}}
+        self._loaded = 0.0
+        self._lock = threading.Lock()
+        self._reload_lock = threading.Lock()
+
+    def stale(self) -> bool:
+        return time.monotonic() - self._loaded > self.ttl
+
+    def mark_stale(self):
+        """Force a rebuild on the next query (after bulk changes)"""
+        if self._loaded:
+            self._loaded = time.monotonic() - self.ttl - 1
+
+    def refresh(self):
+        """Rebuild when stale; other callers keep using the old index meanwhile"""
+        if not self.stale():
+            return
+        # Only the very first load makes callers wait
+        if not self._reload_lock.acquire(blocking=not self._loaded):
+            return
+        try:
+            if self.stale():
+                with self.pool.connection() as conn:
+                    self.load(conn)
+        finally:
+            self._reload_lock.release()
+
+    def load(self, conn):
+        """Rebuild from unexpired inventory; lots without coordinates use their camp's"""
+        cur = conn.cursor()
+        try:
+            cur.execute(
+                """
+                SELECT i.location, COALESCE(i.latitude, c.latitude), COALESCE(i.longitude, c.longitude),
+                       i.blood_group, i.expiry_date, i.units_available
+                FROM blood_inventory i
+                LEFT JOIN camps c ON c.camp_id = i.camp_id
+                WHERE i.expiry_date >= %s AND i.units_available > 0
+                """,
+                (date.today(),),
+            )
+            rows = cur.fetchall()
+        finally:
+            cur.close()
+        grid, stock = GeoGrid(self.cell_deg), {}
+        for location, lat, lon, blood_group, expiry, units in rows:
+            self._add(grid, stock, location, lat, lon, blood_group, expiry, units)
+        with self._lock:
+            self._grid, self._stock = grid, stock
+            self._loaded = time.monotonic()
+
+    @staticmethod
+    def _add(grid, stock, location, lat, lon, blood_group, expiry, units):
+        if not location:
+            return
+        if isinstance(expiry, str):
+            expiry = date.fromisoformat(expiry)
+        entry = stock.get(location)
+        if entry is None:
+            # A lot without coordinates can only join a location we already placed
+            if lat is None or lon is None:
+                return
+            entry = stock[location] = {"latitude": float(lat), "longitude": float(lon), "lots": {}}
+            grid.add(location, float(lat), float(lon))
+        entry["lots"].setdefault(blood_group, []).append((expiry, int(units)))
+
+    def add_lot(self, location, lat, lon, blood_group, expiry, units):
+        with self._lock:
+            self._add(self._grid, self._stock, location, lat, lon, blood_group, expiry, units)
+
+    def nearest(self, lat, lon, blood_group, units=1, k=5, radius_km=50.0):
+        """The ``k`` closest locations holding at least ``units`` unexpired units of ``blood_group``"""
+        self.refresh()
+        today = date.today()
+        with self._lock:
+            grid, stock = self._grid, self._stock
+
+            def available(location):
+                return sum(u for expiry, u in stock[location]["lots"].get(blood_group, ()) if expiry >= today)
+
+            hits = grid.nearby(lat, lon, radius_km, k, accept=lambda location: available(location) >= units)
+            results = []
+            for distance, location in hits:
+                lots = [(e, u) for e, u in stock[location]["lots"][blood_group] if e >= today]
+                results.append({
+                    "location": location,
+                    "latitude": stock[location]["latitude"],
+                    "longitude": stock[location]["longitude"],
+                    "distance_km": round(distance, 2),
+                    "blood_group": blood_group,
+                    "units_available": sum(u for _, u in lots),
+                    "earliest_expiry": min(e for e, _ in lots),
+                })
+        return results
@@ -0,0 +1,120 @@
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+import mysql.connector
+
+from metrics import GROUP_COMMIT_FLUSH, GROUP_COMMIT_ROWS
+
+logger = logging.getLogger("donorconnect.group_commit")
+
+
+class GroupCommitter:
+    """Coalesces single-row inserts into shared multi-row transactions.
+
+    Callers ``submit`` a parameter tuple and get a Future. A flusher thread
+    collects up to ``max_rows`` rows, or whatever arrived within
+    ``max_delay`` seconds of the first one, and writes them with one
+    executemany (sent as a single multi-row INSERT) and one commit. Futures
+    resolve only after that commit, so an acknowledged row is durable. If
+    MySQL rejects a batch, its rows are retried one by one so a single bad
+    row fails only its own caller. ``on_rows(cursor, rows)``, if given, runs
+    in each batch's transaction before the commit, e.g. to maintain
+    summary counters.
+    """
+
+    def __init__(self, pool, sql, max_rows=100, max_delay=0.005, queue_size=10000, on_rows=None):
+        self.pool = pool
+        self.sql = sql
+        self.on_rows = on_rows
+        self.max_rows = max_rows
+        self.max_delay = max_delay
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._thread = None
+        self._stopping = threading.Event()
+
+    def start(self):
+        self._stopping.clear()
+        self._thread = threading.Thread(target=self._run, name="group-commit", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=10.0):
+        """Flush everything already queued, then stop the flusher thread"""
+        self._stopping.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def submit(self, params) -> Future:
+        """Queue one row; raises queue.Full when the backlog is at capacity"""
+        if self._stopping.is_set():
+            raise RuntimeError("Group committer is stopped")
+        future = Future()
+        self._queue.put_nowait((params, future))
+        return future
+
+    def _collect(self):
+        """Block for the first row, then gather more until the batch is full or the window closes"""
+        try:
+            batch = [self._queue.get(timeout=0.1)]
+        except queue.Empty:
+            return []
+        deadline = time.monotonic() + self.max_delay
+        while len(batch) < self.max_rows:
+            remaining = deadline - time.monotonic()
+            try:
+                batch.append(self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while not (self._stopping.is_set() and self._queue.empty()):
+            batch = self._collect()
+            if batch:
+                self._flush(batch)
+
+    def _flush(self, batch):
+        start = time.perf_counter()
+        try:
+            with self.pool.connection() as conn:
+                try:
+                    self._insert(conn, [params for params, _ in batch])
+                except mysql.connector.errors.DatabaseError as e:
+                    if isinstance(e, mysql.connector.errors.OperationalError):
+                        raise
+                    # A row broke the batch: retry individually so the rest still land
+                    logger.warning("Group commit of %d rows failed (%s); retrying row by row", len(batch), e)
+                    for params, future in batch:
+                        try:
+                            self._insert(conn, [params])
+                        except mysql.connector.Error as row_error:
+                            future.set_exception(row_error)
+                        else:
+                            future.set_result(None)
+                    return
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        finally:
+            GROUP_COMMIT_FLUSH.observe(time.perf_counter() - start)
+            GROUP_COMMIT_ROWS.observe(len(batch))
+        for _, future in batch:
+            future.set_result(None)
+
+    def _insert(self, conn, rows):
+        cur = conn.cursor()
+        try:
+            cur.executemany(self.sql, rows)
+            if self.on_rows is not None:
+                self.on_rows(cur, rows)
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            cur.close()
@@ -0,0 +1,131 @@
+import threading
+
+import mysql.connector
+
+# table -> (id column, prefix)
+ID_SEQUENCES = {
+    "donors": ("donor_id", "D"),
+    "camps": ("camp_id", "C"),
+    "blood_inventory": ("inventory_id", "I"),
+    "doctors": ("doctor_id", "T"),
+    "emergency_requests": ("request_id", "R"),
+    "appointments": ("appointment_id", "A"),
+}
+
+
+# Digits after the prefix. A fixed width keeps string order (ORDER BY donor_id,
+# keyset pagination) the same as numeric order up to 10 million rows per table
+ID_DIGITS = 7
+
+
+def format_id(prefix: str, num: int) -> str:
+    """D1 -> D0000001"""
+    if num >= 10 ** ID_DIGITS:
+        raise ValueError(f"{prefix} IDs are exhausted at {ID_DIGITS} digits")
+    return f"{prefix}{num:0{ID_DIGITS}d}"
+
+
+def normalize_id(value: str) -> str:
+    """Canonical form of an ID typed with any padding: d42 and D042 -> D0000042"""
+    return format_id(value[0].upper(), int(value[1:]))
+
+
+class IdAllocator:
+    """Hands out prefixed IDs from the id_sequences table (see schema.py) in cached blocks.
+
+    Each refill reserves ``block_size`` numbers with a single atomic
+    ``UPDATE ... LAST_INSERT_ID(next_value + n)``, so concurrent workers and
+    processes never receive the same number. Numbers left in a block when
+    the process exits are skipped, never reused.
+    """
+
+    def __init__(self, connect, block_size=20):
+        self.connect = connect
+        self.block_size = block_size
+        self._conn = None
+        self._blocks = {}  # table -> [next number, end of block (exclusive)]
+        self._lock = threading.Lock()
+
+    def next_id(self, table: str) -> str:
+        return self.next_ids(table, 1)[0]
+
+    def next_ids(self, table: str, count: int) -> list:
+        """Allocate ``count`` IDs for ``table`` in ascending order"""
+        _, prefix = ID_SEQUENCES[table]
+        ids = []
+        with self._lock:
+            while len(ids) < count:
+                block = self._blocks.get(table)
+                if not block or block[0] >= block[1]:
+                    # Large batches reserve everything they need in one round trip
+                    block = self._reserve(table, max(self.block_size, count - len(ids)))
+                    self._blocks[table] = block
+                take = min(count - len(ids), block[1] - block[0])
+                ids.extend(format_id(prefix, n) for n in range(block[0], block[0] + take))
+                block[0] += take
+        return ids
+
+    def _reserve(self, table: str, size: int) -> list:
+        def reserve(cur):
+            cur.execute(
+                "UPDATE id_sequences SET next_value = LAST_INSERT_ID(next_value + %s) WHERE name = %s",
+                (size, table),
+            )
+            if cur.rowcount == 0:
+                self._seed(cur, table)
+                cur.execute(
+                    "UPDATE id_sequences SET next_value = LAST_INSERT_ID(next_value + %s) WHERE name = %s",
+                    (size, table),
+                )
+            cur.execute("SELECT LAST_INSERT_ID()")
+            return cur.fetchone()[0]
+
+        end = self._run(reserve)
+        return [end - size, end]
+
+    def _seed(self, cur, table: str):
+        """Start a sequence just past the highest ID already in the table (one-off scan)"""
+        column, _ = ID_SEQUENCES[table]
+        cur.execute(
+            f"""
+            INSERT IGNORE INTO id_sequences (name, next_value)
+            SELECT %s, COALESCE(MAX(CAST(SUBSTRING({column}, 2) AS UNSIGNED)), 0) + 1 FROM {table}
+            """,
+            (table,),
+        )
+
+    def _run(self, fn):
+        """Run ``fn(cursor)`` and commit on the allocator's own connection, reconnecting once"""
+        for attempt in (1, 2):
+            if self._conn is None:
+                self._conn = self.connect()
+            cur = self._conn.cursor()
+            try:
+                result = fn(cur)
+                self._conn.commit()
+                return result
+            except (mysql.connector.errors.OperationalError, mysql.connector.errors.InterfaceError):
+                try:
+                    self._conn.close()
+                except Exception:
+                    pass
+                self._conn = None
+                if attempt == 2:
+                    raise
+            except Exception:
+                self._conn.rollback()
+                raise
+            finally:
+                try:
+                    cur.close()
+                except Exception:
+                    pass
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                try:
+                    self._conn.close()
+                except Exception:
+                    pass
+                self._conn = None
@@ -0,0 +1,220 @@
+import json
+import logging
+import sqlite3
+import threading
+import time
+import uuid
+
+import mysql.connector
+
+import dashboard
+from db import PoolExhausted
+
+logger = logging.getLogger("donorconnect.intake")
+
+FIELDS = ("patient_name", "blood_type", "doctor_name", "date", "time", "blood_pressure",
+          "symptoms", "medical_history", "contact_number")
+INSERT_SQL = """
+    INSERT INTO donation_records
+    (patient_name, blood_type, doctor_name, date, time, blood_pressure, symptoms, medical_history, contact_number, intake_ref)
+    VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+"""
+
+QUEUED, COMMITTED, FAILED = "queued", "committed", "failed"
+# MySQL rejected the row itself; retrying will not help
+ROW_ERRORS = (mysql.connector.errors.DataError, mysql.connector.errors.IntegrityError)
+
+
+class IntakeQueue:
+    """Durable local queue between the intake form and MySQL.
+
+    ``submit`` appends the record to a SQLite file (WAL, synchronous=FULL)
+    and returns at once; a flusher thread sends queued records to MySQL in
+    batches of up to ``batch_size`` rows per transaction. While MySQL is
+    unreachable records stay queued and are retried every
+    ``retry_interval`` seconds, so a submission survives both a database
+    outage and a restart of the app.
+
+    Every record carries a random ``intake_ref`` that is unique in
+    donation_records. Refs already present are skipped, so a batch that was
+    committed in MySQL but not yet marked in SQLite is not inserted twice.
+    Rows MySQL rejects outright are marked failed and kept for inspection.
+    """
+
+    def __init__(self, path, pool, batch_size=100, retry_interval=5.0, keep_committed=7 * 86400):
+        self.path = path
+        self.pool = pool
+        self.batch_size = batch_size
+        self.retry_interval = retry_interval
+        self.keep_committed = keep_committed
+        self.last_error = None
+        self._failed_at = 0.0
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=FULL")
+        self._db.execute(
+            """
+            CREATE TABLE IF NOT EXISTS submissions (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                ref TEXT NOT NULL UNIQUE,
+                payload TEXT NOT NULL,
+                status TEXT NOT NULL DEFAULT 'queued',
+                last_error TEXT,
+                queued_at REAL NOT NULL,
+                committed_at REAL
+            )
+            """
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS idx_submissions_status ON submissions (status, id)")
+        self._lock = threading.Lock()
+        self._flushed = threading.Condition()
+        self._wake = threading.Event()
+        self._stopping = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._stopping.clear()
+        self._thread = threading.Thread(target=self._run, name="intake-flush", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=10.0):
+        """Stop the flusher after its current batch; queued records stay on disk"""
+        self._stopping.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def submit(self, record: dict) -> str:
+        """Queue one donation record durably; returns its intake ref"""
+        ref = uuid.uuid4().hex
+        payload = json.dumps({field: record.get(field) for field in FIELDS})
+        with self._lock:
+            self._db.execute(
+                "INSERT INTO submissions (ref, payload, queued_at) VALUES (?, ?, ?)",
+                (ref, payload, time.time()),
+            )
+        self._wake.set()
+        return ref
+
+    def status(self, ref: str):
+        """(status, last_error) for a submitted ref"""
+        with self._lock:
+            row = self._db.execute("SELECT status, last_error FROM submissions WHERE ref = ?", (ref,)).fetchone()
+        return row if row else (None, None)
+
+    def wait(self, ref: str, timeout: float) -> str:
+        """Wait up to ``timeout`` for the record to leave the queue.
+
+        Returns early with "queued" once a flush attempt fails after the
+        call started, i.e. the database is unreachable right now.
+        """
+        started = time.time()
+        deadline = time.monotonic() + timeout
+        with self._flushed:
+            while True:
+                status, _ = self.status(ref)
+                remaining = deadline - time.monotonic()
+                if status != QUEUED or remaining <= 0 or self._failed_at >= started:
+                    return status
+                self._flushed.wait(remaining)
+
+    def backlog(self) -> dict:
+        with self._lock:
+            counts = dict(self._db.execute("SELECT status, COUNT(*) FROM submissions GROUP BY status").fetchall())
+            oldest = self._db.execute("SELECT MIN(queued_at) FROM submissions WHERE status = 'queued'").fetchone()[0]
+        return {
+            "queued": counts.get(QUEUED, 0),
+            "failed": counts.get(FAILED, 0),
+            "oldest_queued_at": oldest,
+            "last_error": self.last_error,
+        }
+
+    def _pending(self):
+        with self._lock:
+            return self._db.execute(
+                "SELECT ref, payload FROM submissions WHERE status = 'queued' ORDER BY id LIMIT ?",
+                (self.batch_size,),
+            ).fetchall()
+
+    def _mark(self, refs, status, error=None):
+        now = time.time()
+        with self._lock:
+            self._db.execute("BEGIN")
+            self._db.executemany(
+                "UPDATE submissions SET status = ?, last_error = ?, "
+                "committed_at = CASE WHEN ? = 'committed' THEN ? END WHERE ref = ?",
+                [(status, error, status, now, ref) for ref in refs],
+            )
+            self._db.execute("COMMIT")
+
+    def _run(self):
+        while not self._stopping.is_set():
+            try:
+                while not self._stopping.is_set() and self.flush():
+                    pass
+                self.last_error = None
+                self._prune()
+                self._wake.wait()
+            except (mysql.connector.Error, PoolExhausted) as e:
+                self.last_error = str(e)
+                self._failed_at = time.time()
+                logger.warning("Intake flush failed, retrying in %ss: %s", self.retry_interval, e)
+                with self._flushed:
+                    self._flushed.notify_all()
+                self._wake.wait(self.retry_interval)
+            except Exception:
+                logger.exception("Intake flusher error")
+                self._wake.wait(self.retry_interval)
+            self._wake.clear()
+
+    def flush(self) -> int:
+        """Send one batch to MySQL; returns how many records it settled.
+
+        Connection and schema errors propagate and leave the batch queued.
+        """
+        rows = self._pending()
+        if not rows:
+            return 0
+        try:
+            self._insert(rows)
+        except ROW_ERRORS:
+            # Isolate the bad rows so the rest of the batch still goes through
+            for row in rows:
+                try:
+                    self._insert([row])
+                except ROW_ERRORS as e:
+                    logger.error("Intake record %s rejected: %s", row[0], e)
+                    self._mark([row[0]], FAILED, str(e))
+        with self._flushed:
+            self._flushed.notify_all()
+        return len(rows)
+
+    def _insert(self, rows):
+        refs = [ref for ref, _ in rows]
+        with self.pool.connection() as conn:
+            cur = conn.cursor()
+            try:
+                cur.execute(
+                    f"SELECT intake_ref FROM donation_records WHERE intake_ref IN ({', '.join(['%s'] * len(refs))})",
+                    refs,
+                )
+                done = {row[0] for row in cur.fetchall()}
+                fresh = [(ref, json.loads(payload)) for ref, payload in rows if ref not in done]
+                if fresh:
+                    cur.executemany(INSERT_SQL, [tuple(rec[f] for f in FIELDS) + (ref,) for ref, rec in fresh])
+                    dashboard.bump(cur, dashboard.donations_added([rec["date"] for _, rec in fresh]))
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+            finally:
+                cur.close()
+        self._mark(refs, COMMITTED)
+
+    def _prune(self):
+        with self._lock:
+            self._db.execute(
+                "DELETE FROM submissions WHERE status = 'committed' AND committed_at < ?",
+                (time.time() - self.keep_committed,),
+            )
@@ -0,0 +1,259 @@
+import logging
+import re
+import threading
+from datetime import date, timedelta
+
+import mysql.connector
+
+from db import PoolExhausted
+from ids import normalize_id
+
+logger = logging.getLogger("donorconnect.intents")
+
+DONATION_INTERVAL_DAYS = 90
+MIN_DONOR_AGE, MAX_DONOR_AGE = 18, 65
+
+BLOOD_GROUP_PATTERN = re.compile(
+    r"\b(ab|a|b|o)\s*(\+|-|\bpos(?:itive)?\b|\bneg(?:ative)?\b)", re.IGNORECASE
+)
+DONOR_ID_PATTERN = re.compile(r"\b(d\d{3,7})\b", re.IGNORECASE)
+DOCTOR_PATTERN = re.compile(r"\bdr\.?\s+([a-z][a-z .'-]*?)(?=\s+(?:on|today|tomorrow|in|at)\b|[?.!,]|$)", re.IGNORECASE)
+WORD_PATTERN = re.compile(r"[a-z]+")
+
+# intent -> keywords that vote for it; the intent with the most votes wins
+INTENT_KEYWORDS = {
+    "inventory": {"unit", "units", "stock", "inventory", "available", "availability", "bag", "bags", "blood"},
+    "camp": {"camp", "camps", "drive", "drives", "event"},
+    "appointment": {"appointment", "appointments", "booked", "booking", "slot", "slots", "doctor"},
+    "eligibility": {"eligible", "eligibility", "donate", "again", "qualify"},
+}
+# Build the keyword -> intents index once at import
+KEYWORD_INDEX = {}
+for _intent, _words in INTENT_KEYWORDS.items():
+    for _word in _words:
+        KEYWORD_INDEX.setdefault(_word, []).append(_intent)
+
+
+def parse_blood_group(message: str):
+    match = BLOOD_GROUP_PATTERN.search(message)
+    if not match:
+        return None
+    sign = match.group(2).lower()
+    return match.group(1).upper() + ("+" if sign in ("+", "pos", "positive") else "-")
+
+
+class IntentEngine:
+    """Answers common chatbot questions straight from MySQL, without a model call.
+
+    ``match`` is pure CPU: keywords vote through a prebuilt index, and blood
+    groups, donor IDs and place names are pulled out with precompiled
+    patterns. Place names come from the camps, donors and blood_inventory
+    tables. A background thread loads them at startup and reloads them
+    every ``places_ttl`` seconds or when ``refresh_soon`` is called; writes
+    in this process add their place with ``add_place`` straight away.
+    Chat requests never wait for the reload. ``respond`` runs one indexed
+    query for the matched intent.
+    """
+
+    def __init__(self, pool, places_ttl=600, retry_interval=30.0):
+        self.pool = pool
+        self.places_ttl = places_ttl
+        self.retry_interval = retry_interval
+        self._places = set()
+        self._places_pattern = None
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stopping = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._stopping.clear()
+        self._thread = threading.Thread(target=self._run, name="chatbot-places", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=5.0):
+        self._stopping.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def refresh_soon(self):
+        """Reload place names in the background, e.g. after a bulk import"""
+        self._wake.set()
+
+    def _run(self):
+        while not self._stopping.is_set():
+            wait = self.places_ttl
+            try:
+                with self.pool.connection() as conn:
+                    self.refresh_places(conn)
+            except (mysql.connector.Error, PoolExhausted) as e:
+                logger.warning("Could not load chatbot place names, retrying in %ss: %s", self.retry_interval, e)
+                wait = self.retry_interval
+            except Exception:
+                logger.exception("Chatbot place refresh failed")
+                wait = self.retry_interval
+            self._wake.wait(wait)
+            self._wake.clear()
+
+    def refresh_places(self, conn):
+        cur = conn.cursor()
+        try:
+            places = set()
+            for sql in (
+                "SELECT DISTINCT city FROM camps",
+                "SELECT DISTINCT location FROM blood_inventory",
+                "SELECT DISTINCT city FROM donors",
+            ):
+                cur.execute(sql)
+                places.update(row[0].strip() for row in cur.fetchall() if row[0] and row[0].strip())
+        finally:
+            cur.close()
+        self._set_places(places)
+
+    def add_place(self, name):
+        """Make a place from a write in this process matchable at once"""
+        name = (name or "").strip()
+        if not name:
+            return
+        with self._lock:
+            if name in self._places:
+                return
+            places = self._places | {name}
+        self._set_places(places)
+
+    def _set_places(self, places):
+        # Longest names first so "New Delhi" wins over "Delhi"
+        names = sorted(places, key=len, reverse=True)
+        pattern = re.compile(r"\b(" + "|".join(re.escape(n) for n in names) + r")\b", re.IGNORECASE) if names else None
+        with self._lock:
+            self._places = places
+            self._places_pattern = pattern
+
+    def match(self, message: str):
+        """Return (intent, slots) for a message, or None to defer to the model"""
+        votes = {}
+        for word in WORD_PATTERN.findall(message.lower()):
+            for intent in KEYWORD_INDEX.get(word, ()):
+                votes[intent] = votes.get(intent, 0) + 1
+        if not votes:
+            return None
+        ranked = sorted(votes.items(), key=lambda item: item[1], reverse=True)
+        if len(ranked) > 1 and ranked[0][1] == ranked[1][1]:
+            # "blood" alone shouldn't outvote a more specific keyword
+            ranked = [r for r in ranked if r[0] != "inventory"] or ranked
+            if len(ranked) > 1 and ranked[0][1] == ranked[1][1]:
+                return None
+        intent = ranked[0][0]
+
+        with self._lock:
+            places_pattern = self._places_pattern
+        place = places_pattern.search(message) if places_pattern else None
+        doctor = DOCTOR_PATTERN.search(message)
+        donor_id = DONOR_ID_PATTERN.search(message)
+        slots = {
+            "blood_group": parse_blood_group(message),
+            "place": place.group(1) if place else None,
+            "doctor": doctor.group(1).strip() if doctor else None,
+            "donor_id": normalize_id(donor_id.group(1)) if donor_id else None,
+            "tomorrow": "tomorrow" in message.lower(),
+        }
+        if intent == "inventory" and not (slots["blood_group"] or slots["place"]):
+            return None
+        return intent, slots
+
+    def respond(self, message: str):
+        """Match and answer in one go; returns None when the model should handle it"""
+        matched = self.match(message)
+        if matched is None:
+            return None
+        intent, slots = matched
+        with self.pool.connection() as conn:
+            return getattr(self, f"_answer_{intent}")(conn, slots)
+
+    def _answer_inventory(self, conn, slots):
+        where, params = ["status = 'available'", "expiry_date >= %s"], [date.today()]
+        if slots["blood_group"]:
+            where.append("blood_group = %s")
+            params.append(slots["blood_group"])
+        if slots["place"]:
+            where.append("location = %s")
+            params.append(slots["place"])
+        cur = conn.cursor()
+        try:
+            cur.execute(
+                f"SELECT COALESCE(SUM(units_available), 0), COUNT(*) FROM blood_inventory WHERE {' AND '.join(where)}",
+                params,
+            )
+            units, lots = cur.fetchone()
+        finally:
+            cur.close()
+        what = f"{slots['blood_group']} " if slots["blood_group"] else ""
+        where_text = f" in {slots['place']}" if slots["place"] else ""
+        if not units:
+            return f"There are no unexpired {what}units{where_text} right now."
+        return f"There are {int(units)} unexpired {what}units{where_text} across {lots} inventory lots."
+
+    def _answer_camp(self, conn, slots):
+        sql = "SELECT title, venue, city, date, start_time FROM camps WHERE date >= %s"
+        params = [date.today()]
+        if slots["place"]:
+            sql += " AND city = %s"
+            params.append(slots["place"])
+        sql += " ORDER BY date LIMIT 1"
+        cur = conn.cursor(dictionary=True)
+        try:
+            cur.execute(sql, params)
+            camp = cur.fetchone()
+        finally:
+            cur.close()
+        where_text = f" in {slots['place']}" if slots["place"] else ""
+        if not camp:
+            return f"No upcoming camps are scheduled{where_text}."
+        starts = f" starting {camp['start_time']}" if camp.get("start_time") is not None else ""
+        return f"The next camp{where_text} is \"{camp['title']}\" at {camp['venue']}, {camp['city']} on {camp['date']}{starts}."
+
+    def _answer_appointment(self, conn, slots):
+        day = date.today() + timedelta(days=1 if slots["tomorrow"] else 0)
+        sql = "SELECT COUNT(*) FROM appointments WHERE date = %s AND status = 'scheduled'"
+        params = [day]
+        if slots["doctor"]:
+            # Prefix match, with or without the title, so idx_appointments_doctor_date is a
+            # range scan; DOCTOR_PATTERN only captures letters, spaces and .'- (no wildcards)
+            sql += " AND (doctor_name LIKE %s OR doctor_name LIKE %s)"
+            params.extend([f"Dr. {slots['doctor']}%", f"{slots['doctor']}%"])
+        cur = conn.cursor()
+        try:
+            cur.execute(sql, params)
+            (count,) = cur.fetchone()
+        finally:
+            cur.close()
+        when = "tomorrow" if slots["tomorrow"] else "today"
+        who = f" with Dr. {slots['doctor']}" if slots["doctor"] else ""
+        return f"There are {count} scheduled appointments{who} {when}."
+
+    def _answer_eligibility(self, conn, slots):
+        rule = (f"Donors aged {MIN_DONOR_AGE}-{MAX_DONOR_AGE} can donate once "
+                f"{DONATION_INTERVAL_DAYS} days have passed since their last donation.")
+        if not slots["donor_id"]:
+            return rule + " Tell me your donor ID (e.g. D0000001) and I can check your next eligible date."
+        cur = conn.cursor(dictionary=True)
+        try:
+            cur.execute("SELECT name, age, last_donation_date FROM donors WHERE donor_id = %s", (slots["donor_id"],))
+            donor = cur.fetchone()
+        finally:
+            cur.close()
+        if not donor:
+            return f"I couldn't find donor {slots['donor_id']}."
+        if donor["age"] is not None and not MIN_DONOR_AGE <= donor["age"] <= MAX_DONOR_AGE:
+            return f"{donor['name']} is outside the {MIN_DONOR_AGE}-{MAX_DONOR_AGE} donor age range."
+        last = donor["last_donation_date"]
+        if isinstance(last, str):
+            last = date.fromisoformat(last)
+        if last is None:
+            return f"{donor['name']} has no recorded donation and is eligible to donate now."
+        next_date = last + timedelta(days=DONATION_INTERVAL_DAYS)
+        if next_date <= date.today():
+            return f"{donor['name']} last donated on {last} and is eligible to donate now."
+        return f"{donor['name']} last donated on {last} and can donate again from {next_date}."
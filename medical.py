@@ -1,56 +1,86 @@
 import streamlit as st
-import mysql.connector
-from mysql.connector import Error
 import os
 from dotenv import load_dotenv
 
+from db import ConnectionPool
+from intake_queue import COMMITTED, FAILED, IntakeQueue
+
 # Load environment variables from .env file
 load_dotenv()
 
-# Database connection function
-def create_connection():
+# Database connection pool, shared by every session and kept across reruns.
+# Idle connections are pinged before reuse and recycled when old.
+@st.cache_resource
+def get_pool():
+    # Get database port with error handling
     try:
-        # Get database port with error handling
-        try:
-            db_port = int(os.getenv('DB_PORT', 3306))
-        except ValueError:
-            invalid_port = os.getenv('DB_PORT')
-            st.warning(f"Invalid DB_PORT value '{invalid_port}'. Using default port 3306.")
-            db_port = 3306
-        
-        connection = mysql.connector.connect(
-            host=os.getenv('DB_HOST', 'localhost'),
-            port=db_port,
-            user=os.getenv('DB_USER', 'root'),
-            password=os.getenv('DB_PASSWORD', ''),
-            database=os.getenv('DB_NAME', 'patient')
-        )
-        return connection
-    except Error as e:
-        st.error(f"Error connecting to database: {e}")
-        st.info("Please ensure MySQL is running and database credentials are correctly configured in the .env file.")
-        st.info("Copy .env.example to .env and update with your database credentials.")
-        return None
+        db_port = int(os.getenv('DB_PORT', 3306))
+    except ValueError:
+        invalid_port = os.getenv('DB_PORT')
+        st.warning(f"Invalid DB_PORT value '{invalid_port}'. Using default port 3306.")
+        db_port = 3306
+
+    return ConnectionPool(
+        size=2,
+        timeout=float(os.getenv('DB_POOL_TIMEOUT', 5)),
+        recycle=int(os.getenv('DB_POOL_RECYCLE', 3600)),
+        ping_interval=int(os.getenv('DB_POOL_PING_INTERVAL', 30)),
+        host=os.getenv('DB_HOST', 'localhost'),
+        port=db_port,
+        user=os.getenv('DB_USER', 'root'),
+        password=os.getenv('DB_PASSWORD', ''),
+        database=os.getenv('DB_NAME', 'patient'),
+        connection_timeout=5,
+    )
+
+# Submissions are written to a local queue file first and sent to MySQL by a
+# background thread, so nothing is lost while the database is unreachable
+@st.cache_resource
+def get_intake_queue():
+    intake = IntakeQueue(
+        os.getenv('INTAKE_QUEUE_PATH', 'intake_queue.sqlite3'),
+        get_pool(),
+        batch_size=int(os.getenv('INTAKE_BATCH_SIZE', 100)),
+        retry_interval=float(os.getenv('INTAKE_RETRY_INTERVAL', 5)),
+    )
+    intake.start()
+    return intake
 
-# Function to insert data into database
+# Function to queue a donation record and report whether it reached the database
 def insert_donation_data(patient_name, blood_type, doctor_name, date, time, blood_pressure, symptoms, medical_history, contact_number):
-    connection = create_connection()
-    if connection:
-        try:
-            cursor = connection.cursor()
-            query = """
-            INSERT INTO donation_records 
-            (patient_name, blood_type, doctor_name, date, time, blood_pressure, symptoms, medical_history, contact_number)
-            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
-            """
-            cursor.execute(query, (patient_name, blood_type, doctor_name, date, time, blood_pressure, symptoms, medical_history, contact_number))
-            connection.commit()
-            st.success("Data submitted successfully!")
-            cursor.close()
-        except Error as e:
-            st.error(f"Error inserting data: {e}")
-        finally:
-            connection.close()
+    intake = get_intake_queue()
+    ref = intake.submit({
+        "patient_name": patient_name,
+        "blood_type": blood_type,
+        "doctor_name": doctor_name,
+        "date": date,
+        "time": time,
+        "blood_pressure": blood_pressure,
+        "symptoms": symptoms,
+        "medical_history": medical_history,
+        "contact_number": contact_number,
+    })
+    # Usually committed within milliseconds; don't hold the form if the database is down
+    status = intake.wait(ref, float(os.getenv('INTAKE_ACK_WAIT', 1)))
+    if status == COMMITTED:
+        st.success("Data submitted successfully!")
+    elif status == FAILED:
+        st.error(f"The database rejected this record: {intake.status(ref)[1]}")
+    else:
+        st.info("Data saved on this device and queued; it will be sent to the database automatically.")
+
+def show_sync_status():
+    backlog = get_intake_queue().backlog()
+    if backlog["queued"]:
+        message = f"{backlog['queued']} submission(s) waiting to be sent to the database."
+        if backlog["last_error"]:
+            message += f" Last error: {backlog['last_error']}"
+        st.warning(message)
+        if backlog["last_error"]:
+            st.info("Please ensure MySQL is running and database credentials are correctly configured in the .env file.")
+    if backlog["failed"]:
+        st.error(f"{backlog['failed']} submission(s) were rejected by the database; see {get_intake_queue().path}.")
+
 st.write("Blood Donation Camp Information")
 with st.form(key = "Blood_Donation_Camp_Information"):
     st.text_input("Patient Name", key="patient_name")
@@ -78,4 +108,6 @@ if submitted:
         st.session_state.symptoms,
         st.session_state.patient_medical_history,
         st.session_state.contact_number
-    )
\ No newline at end of file
+    )
+
+show_sync_status()
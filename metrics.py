@@ -0,0 +1,399 @@
+import bisect
+import contextvars
+import glob
+import logging
+import os
+import pickle
+import re
+import threading
+import time
+from functools import lru_cache
+
+logger = logging.getLogger("donorconnect.sql")
+
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names, values, extra=()):
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    pairs.extend(f'{n}="{_escape(v)}"' for n, v in extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value) -> str:
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+class Counter:
+    """Monotonic counter, optionally split by labels"""
+
+    kind = "counter"
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1, **labels):
+        key = tuple(labels[n] for n in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def state(self) -> dict:
+        with self._lock:
+            return dict(self._values)
+
+    @staticmethod
+    def merge(states) -> dict:
+        merged = {}
+        for state in states:
+            for key, value in state.items():
+                merged[key] = merged.get(key, 0) + value
+        return merged
+
+    def samples(self, state=None):
+        items = sorted((self.state() if state is None else state).items())
+        for key, value in items:
+            yield f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+
+
+class Histogram:
+    """Cumulative-bucket latency histogram, optionally split by labels"""
+
+    kind = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._series = {}  # labels -> [per-bucket counts (+Inf last), sum, count]
+        self._lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        key = tuple(labels[n] for n in self.labelnames)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def snapshot(self, **labels):
+        """(count, sum) for one label set"""
+        key = tuple(labels[n] for n in self.labelnames)
+        with self._lock:
+            series = self._series.get(key)
+            return (series[2], series[1]) if series else (0, 0.0)
+
+    def state(self) -> dict:
+        """labels -> (per-bucket counts, sum, count)"""
+        with self._lock:
+            return {key: (list(s[0]), s[1], s[2]) for key, s in self._series.items()}
+
+    @staticmethod
+    def merge(states) -> dict:
+        merged = {}
+        for state in states:
+            for key, (counts, total, count) in state.items():
+                if key in merged:
+                    acc = merged[key]
+                    merged[key] = ([a + b for a, b in zip(acc[0], counts)], acc[1] + total, acc[2] + count)
+                else:
+                    merged[key] = (list(counts), total, count)
+        return merged
+
+    def samples(self, state=None):
+        items = sorted((self.state() if state is None else state).items())
+        for key, (counts, total, count) in items:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += bucket_count
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                yield f"{self.name}_bucket{_format_labels(self.labelnames, key, [('le', le)])} {cumulative}"
+            labels = _format_labels(self.labelnames, key)
+            yield f"{self.name}_sum{labels} {repr(total)}"
+            yield f"{self.name}_count{labels} {count}"
+
+
+class Registry:
+    """Collects metrics and renders them in the Prometheus text exposition format"""
+
+    def __init__(self):
+        self._metrics = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def state(self) -> dict:
+        """Picklable copy of every metric's values, for merging across processes"""
+        return {metric.name: metric.state() for metric in self._metrics}
+
+    def merge(self, states) -> dict:
+        states = list(states)
+        return {metric.name: metric.merge(s.get(metric.name, {}) for s in states) for metric in self._metrics}
+
+    def render(self, state=None) -> str:
+        lines = []
+        for metric in self._metrics:
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.samples(None if state is None else state.get(metric.name, {})))
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+HTTP_REQUESTS = REGISTRY.register(Counter(
+    "http_requests_total", "HTTP requests by route template and status", ("method", "route", "status")))
+HTTP_LATENCY = REGISTRY.register(Histogram(
+    "http_request_duration_seconds", "End-to-end request latency by route template", ("method", "route")))
+HTTP_PHASES = REGISTRY.register(Histogram(
+    "http_request_phase_seconds",
+    "Time a request spent per phase: pool_wait, connect, query, fetch, serialize", ("route", "phase")))
+DB_CONNECT = REGISTRY.register(Histogram(
+    "db_connect_duration_seconds", "Time to open or validate a MySQL connection", ("kind",)))
+DB_POOL_WAIT = REGISTRY.register(Histogram(
+    "db_pool_wait_seconds", "Time spent waiting for a free pool slot"))
+DB_QUERY = REGISTRY.register(Histogram(
+    "db_query_duration_seconds", "Statement execution time by statement and table", ("statement",)))
+DB_FETCH = REGISTRY.register(Histogram(
+    "db_fetch_duration_seconds", "Time spent reading result rows by statement and table", ("statement",)))
+DB_ROWS = REGISTRY.register(Counter(
+    "db_rows_total", "Rows fetched or affected by statement and table", ("statement",)))
+DB_SLOW_QUERIES = REGISTRY.register(Counter(
+    "db_slow_queries_total", "Statements slower than the slow-query threshold", ("statement",)))
+GROUP_COMMIT_ROWS = REGISTRY.register(Histogram(
+    "db_group_commit_batch_rows", "Rows written per group-commit transaction",
+    buckets=(1, 2, 5, 10, 20, 50, 100, 200, 500, 1000)))
+GROUP_COMMIT_FLUSH = REGISTRY.register(Histogram(
+    "db_group_commit_flush_seconds", "Time to insert and commit one group-commit batch"))
+
+# Per-request phase totals; set by MetricsMiddleware and copied into worker threads
+_phases = contextvars.ContextVar("request_phases", default=None)
+slow_query_seconds = 0.5
+
+
+def set_slow_query_threshold(ms: float):
+    global slow_query_seconds
+    slow_query_seconds = ms / 1000
+
+
+def add_phase(phase: str, seconds: float):
+    """Charge ``seconds`` to ``phase`` of the current request, if there is one"""
+    phases = _phases.get()
+    if phases is not None:
+        phases[phase] = phases.get(phase, 0.0) + seconds
+
+
+STATEMENT_TABLE_PATTERN = re.compile(r"\b(?:FROM|INTO|TABLE|JOIN)\s+`?(\w+)", re.IGNORECASE)
+
+
+@lru_cache(maxsize=1024)
+def statement_label(sql: str) -> str:
+    """'SELECT ... FROM donors WHERE ...' -> 'select donors' (keeps label cardinality low)"""
+    words = sql.split(None, 2)
+    if not words:
+        return "unknown"
+    verb = words[0].lower()
+    if verb == "update" and len(words) > 1:
+        table = words[1].strip("`")
+    else:
+        match = STATEMENT_TABLE_PATTERN.search(sql)
+        table = match.group(1) if match else None
+    return f"{verb} {table}" if table else verb
+
+
+class TimedCursor:
+    """Cursor proxy that times execute and fetch calls and counts rows.
+
+    Statements slower than the slow-query threshold are logged without their
+    parameters, which may hold personal data.
+    """
+
+    def __init__(self, cursor):
+        self._cursor = cursor
+        self._statement = "unknown"
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+    def __iter__(self):
+        return iter(self._cursor)
+
+    def _executed(self, sql, elapsed):
+        DB_QUERY.observe(elapsed, statement=self._statement)
+        add_phase("query", elapsed)
+        rowcount = self._cursor.rowcount
+        if not self._statement.startswith("select") and rowcount and rowcount > 0:
+            DB_ROWS.inc(rowcount, statement=self._statement)
+        if elapsed >= slow_query_seconds:
+            DB_SLOW_QUERIES.inc(statement=self._statement)
+            logger.warning("Slow query (%.1f ms): %s", elapsed * 1000, " ".join(sql.split())[:500])
+
+    def execute(self, operation, params=None, *args, **kwargs):
+        self._statement = statement_label(operation)
+        start = time.perf_counter()
+        try:
+            return self._cursor.execute(operation, params, *args, **kwargs)
+        finally:
+            self._executed(operation, time.perf_counter() - start)
+
+    def executemany(self, operation, seq_params, *args, **kwargs):
+        self._statement = statement_label(operation)
+        start = time.perf_counter()
+        try:
+            return self._cursor.executemany(operation, seq_params, *args, **kwargs)
+        finally:
+            self._executed(operation, time.perf_counter() - start)
+
+    def _fetched(self, rows, elapsed):
+        DB_FETCH.observe(elapsed, statement=self._statement)
+        add_phase("fetch", elapsed)
+        if rows:
+            DB_ROWS.inc(rows, statement=self._statement)
+
+    def fetchone(self):
+        start = time.perf_counter()
+        row = self._cursor.fetchone()
+        self._fetched(1 if row is not None else 0, time.perf_counter() - start)
+        return row
+
+    def fetchmany(self, *args, **kwargs):
+        start = time.perf_counter()
+        rows = self._cursor.fetchmany(*args, **kwargs)
+        self._fetched(len(rows), time.perf_counter() - start)
+        return rows
+
+    def fetchall(self):
+        start = time.perf_counter()
+        rows = self._cursor.fetchall()
+        self._fetched(len(rows), time.perf_counter() - start)
+        return rows
+
+
+class MetricsMiddleware:
+    """ASGI middleware recording per-route latency, status counts and phase breakdowns.
+
+    Routes are labelled by their template (``/api/donors/{donor_id}``), not
+    the raw path, so label cardinality stays bounded. Streaming responses
+    are timed until their last chunk is sent.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        status = 500
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        phases = {}
+        token = _phases.set(phases)
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - start
+            _phases.reset(token)
+            route = getattr(scope.get("route"), "path", None) or "unmatched"
+            method = scope.get("method", "")
+            HTTP_LATENCY.observe(elapsed, method=method, route=route)
+            HTTP_REQUESTS.inc(method=method, route=route, status=str(status))
+            for phase, seconds in phases.items():
+                HTTP_PHASES.observe(seconds, route=route, phase=phase)
+
+
+RETIRED_STATE = "retired.pkl"
+
+
+def _read_state(path):
+    try:
+        with open(path, "rb") as f:
+            return pickle.load(f)
+    except (OSError, EOFError, pickle.UnpicklingError):
+        # Being replaced right now, or left half-written by a killed worker
+        return None
+
+
+def _write_state(path, state):
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as f:
+        pickle.dump(state, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp, path)
+
+
+class SharedMetrics:
+    """Sums a registry across the worker processes of one server.
+
+    Every worker writes its registry's state to ``<directory>/<pid>.pkl``
+    every ``interval`` seconds; a scrape writes the answering worker's file
+    fresh and renders the sum of all files, so other workers' figures are at
+    most ``interval`` seconds old. Files of exited workers are folded into
+    retired.pkl by the supervisor (``retire``), so counters never go back
+    when a worker is replaced. All metrics are counters or histograms, which
+    add up exactly.
+    """
+
+    def __init__(self, directory, registry=None, interval=5.0):
+        self.directory = directory
+        self.registry = registry or REGISTRY
+        self.interval = interval
+        self.path = os.path.join(directory, f"{os.getpid()}.pkl")
+        self._stopping = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._stopping.clear()
+        self._thread = threading.Thread(target=self._run, name="metrics-sync", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stopping.set()
+        if self._thread is not None:
+            self._thread.join(self.interval)
+            self._thread = None
+        self.write()
+
+    def _run(self):
+        while not self._stopping.wait(self.interval):
+            try:
+                self.write()
+            except OSError as e:
+                logger.warning("Could not write shared metrics: %s", e)
+
+    def write(self):
+        _write_state(self.path, self.registry.state())
+
+    def render(self) -> str:
+        self.write()
+        states = (_read_state(path) for path in glob.glob(os.path.join(self.directory, "*.pkl")))
+        return self.registry.render(self.registry.merge(s for s in states if s is not None))
+
+    def retire(self, pid):
+        """Fold an exited worker's last state into retired.pkl (supervisor only)"""
+        path = os.path.join(self.directory, f"{pid}.pkl")
+        state = _read_state(path)
+        if state is None:
+            return
+        retired_path = os.path.join(self.directory, RETIRED_STATE)
+        retired = _read_state(retired_path) or {}
+        _write_state(retired_path, self.registry.merge([retired, state]))
+        os.unlink(path)
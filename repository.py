@@ -0,0 +1,421 @@
+from datetime import date, timedelta
+from typing import List, Optional
+
+# How POST /api/donations writes a row: an inline INSERT (prepared once per
+# connection) or the sp_insert_donation stored procedure, which validates the
+# record server-side and reports rejections through its OUT parameters
+INLINE, PROCEDURE = "inline", "procedure"
+DONATION_INSERT_MODES = (INLINE, PROCEDURE)
+
+DONATION_INSERT_SQL = """
+    INSERT INTO donation_records
+    (patient_name, blood_type, doctor_name, date, time, blood_pressure, symptoms, medical_history, contact_number)
+    VALUES (%s,%s,%s,%s,%s,%s,%s,%s,%s)
+"""
+
+DONOR_INSERT_SQL = (
+    "INSERT INTO donors (donor_id, name, blood_group, phone, email, city, last_donation_date, gender, age) "
+    "VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)"
+)
+
+INVENTORY_INSERT_SQL = (
+    "INSERT INTO blood_inventory (inventory_id, blood_group, units_available, location, camp_id, "
+    "expiry_date, latitude, longitude) VALUES (%s, %s, %s, %s, %s, %s, %s, %s)"
+)
+
+# Inserts nothing when the donor does not exist
+REGISTRATION_INSERT_SQL = (
+    "INSERT INTO camp_registrations (camp_id, donor_id, status) "
+    "SELECT %s, donor_id, %s FROM donors WHERE donor_id = %s"
+)
+
+
+class DonationRejected(Exception):
+    """sp_insert_donation refused the record; the message is the procedure's"""
+
+
+class NotFound(Exception):
+    """A row the operation depends on does not exist; the message says which"""
+
+
+class Repository:
+    """Typed data access for the API, one instance per borrowed connection.
+
+    Every method runs a fixed SQL string through the connection's prepared
+    statement cache (``PooledConnection.statement``), so after a
+    connection's first request the server only binds and executes. Methods
+    never commit; the caller owns the transaction.
+    """
+
+    def __init__(self, conn):
+        self.conn = conn
+
+    def _rows(self, sql: str, params=()) -> List[dict]:
+        with self.conn.statement(sql) as cur:
+            cur.execute(sql, tuple(params))
+            rows = cur.fetchall()
+            names = cur.column_names
+        return [dict(zip(names, row)) for row in rows]
+
+    def _row(self, sql: str, params=()) -> Optional[dict]:
+        rows = self._rows(sql, params)
+        return rows[0] if rows else None
+
+    def _execute(self, sql: str, params=()) -> int:
+        """Run a write; returns the affected row count"""
+        with self.conn.statement(sql) as cur:
+            cur.execute(sql, tuple(params))
+            return cur.rowcount
+
+    # ---- lists ----
+    def page(self, table: str, key: str, columns: List[str], filters: dict,
+             date_column: Optional[str] = None, date_from: Optional[str] = None, date_to: Optional[str] = None,
+             after: Optional[str] = None, limit: int = 100) -> List[dict]:
+        """Keyset-paginated SELECT ordered by ``key``; only non-None filters are applied.
+
+        Table and column names come from the caller's whitelists, never from
+        the request. Each combination of filters is its own cached statement.
+        """
+        where, params = [], []
+        for column, value in filters.items():
+            if value is not None:
+                where.append(f"{column} = %s")
+                params.append(value)
+        if date_column and date_from:
+            where.append(f"{date_column} >= %s")
+            params.append(date_from)
+        if date_column and date_to:
+            # date_to is a calendar day and the column may be a TIMESTAMP: include all of that day
+            where.append(f"{date_column} < %s + INTERVAL 1 DAY")
+            params.append(date_to)
+        if after:
+            where.append(f"{key} > %s")
+            params.append(after)
+
+        sql = f"SELECT {', '.join(columns)} FROM {table}"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += f" ORDER BY {key} LIMIT %s"
+        params.append(limit)
+        return self._rows(sql, params)
+
+    # ---- users ----
+    def user_by_name(self, username: str) -> Optional[dict]:
+        return self._row("SELECT id, username, password, role FROM users WHERE username = %s", (username,))
+
+    def set_password_hash(self, user_id: int, password_hash: str) -> int:
+        return self._execute("UPDATE users SET password = %s WHERE id = %s", (password_hash, user_id))
+
+    def insert_user(self, username: str, email: Optional[str], password_hash: str) -> int:
+        return self._execute(
+            "INSERT INTO users (username, email, password, role) VALUES (%s, %s, %s, 'user')",
+            (username, email, password_hash),
+        )
+
+    # ---- donations ----
+    def insert_donation(self, params: tuple, mode: str = INLINE) -> Optional[int]:
+        """Insert one record (DONATION_INSERT_SQL params); returns its id.
+
+        In PROCEDURE mode a record the procedure rejects raises
+        DonationRejected.
+        """
+        if mode == PROCEDURE:
+            # CALL cannot be prepared through the binary protocol; the
+            # procedure's own statements are cached by the server instead
+            cur = self.conn.cursor()
+            try:
+                result = cur.callproc("sp_insert_donation", list(params) + [0, ""])
+                for extra in cur.stored_results():
+                    extra.fetchall()
+            finally:
+                cur.close()
+            donation_id, message = result[-2], result[-1]
+            if donation_id == -1:
+                raise DonationRejected(message)
+            return donation_id
+        with self.conn.statement(DONATION_INSERT_SQL) as cur:
+            cur.execute(DONATION_INSERT_SQL, params)
+            return cur.lastrowid
+
+    def _insert_many(self, sql: str, rows: List[tuple]) -> int:
+        # executemany rewrites a plain INSERT into one multi-row statement, which
+        # the prepared statement protocol cannot do, so bulk paths skip the cache
+        cur = self.conn.cursor()
+        try:
+            cur.executemany(sql, rows)
+            return cur.rowcount
+        finally:
+            cur.close()
+
+    def insert_donations(self, rows: List[tuple]) -> int:
+        """Bulk insert of DONATION_INSERT_SQL rows"""
+        return self._insert_many(DONATION_INSERT_SQL, rows)
+
+    def insert_donors(self, rows: List[tuple]) -> int:
+        """Bulk insert of DONOR_INSERT_SQL rows"""
+        return self._insert_many(DONOR_INSERT_SQL, rows)
+
+    def insert_inventory_lots(self, rows: List[tuple]) -> int:
+        """Bulk insert of INVENTORY_INSERT_SQL rows"""
+        return self._insert_many(INVENTORY_INSERT_SQL, rows)
+
+    # ---- donors, camps, inventory ----
+    def insert_donor(self, donor_id: str, name: str, blood_group: str, phone: Optional[str], email: Optional[str],
+                     city: Optional[str], last_donation_date: Optional[str], gender: Optional[str],
+                     age: Optional[int]) -> int:
+        return self._execute(
+            DONOR_INSERT_SQL, (donor_id, name, blood_group, phone, email, city, last_donation_date, gender, age)
+        )
+
+    def insert_camp(self, camp_id: str, title: str, venue: Optional[str], city: Optional[str], day: Optional[str],
+                    start_time: Optional[str], end_time: Optional[str], organizer: Optional[str], capacity: int,
+                    latitude: Optional[float], longitude: Optional[float]) -> int:
+        return self._execute(
+            "INSERT INTO camps (camp_id, title, venue, city, date, start_time, end_time, organizer, capacity, "
+            "registered, latitude, longitude) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, 0, %s, %s)",
+            (camp_id, title, venue, city, day, start_time, end_time, organizer, capacity, latitude, longitude),
+        )
+
+    def camp_location(self, camp_id: str) -> Optional[tuple]:
+        """(latitude, longitude) of a camp, or None when it does not exist"""
+        row = self._row("SELECT latitude, longitude FROM camps WHERE camp_id = %s", (camp_id,))
+        return (row["latitude"], row["longitude"]) if row else None
+
+    def insert_inventory(self, inventory_id: str, blood_group: str, units_available: int, location: Optional[str],
+                         camp_id: Optional[str], expiry_date: str, latitude: Optional[float],
+                         longitude: Optional[float]) -> int:
+        return self._execute(
+            INVENTORY_INSERT_SQL,
+            (inventory_id, blood_group, units_available, location, camp_id, expiry_date, latitude, longitude),
+        )
+
+    def inventory_buckets(self, today: date) -> List[dict]:
+        """Units per blood group and location split into expired / critical / warning / good"""
+        soon, later = today + timedelta(days=7), today + timedelta(days=14)
+        return self._rows(
+            """
+            SELECT blood_group, location, COUNT(*) AS lots,
+                   SUM(units_available) AS units,
+                   SUM(CASE WHEN expiry_date < %s THEN units_available ELSE 0 END) AS expired,
+                   SUM(CASE WHEN expiry_date >= %s AND expiry_date <= %s THEN units_available ELSE 0 END) AS critical,
+                   SUM(CASE WHEN expiry_date > %s AND expiry_date <= %s THEN units_available ELSE 0 END) AS warning,
+                   SUM(CASE WHEN expiry_date > %s THEN units_available ELSE 0 END) AS good
+            FROM blood_inventory
+            WHERE status = 'available'
+            GROUP BY blood_group, location
+            ORDER BY blood_group, location
+            """,
+            (today, today, soon, soon, later, later),
+        )
+
+    def stock_levels(self, blood_group: Optional[str] = None, low_stock: Optional[bool] = None) -> List[dict]:
+        """Rows of inventory_stock_levels, optionally for one group and/or only low (or not low) stock"""
+        where, params = [], []
+        if blood_group is not None:
+            where.append("blood_group = %s")
+            params.append(blood_group)
+        if low_stock is not None:
+            where.append("low_stock = %s")
+            params.append(low_stock)
+        sql = ("SELECT blood_group, location, lots, units_available, expiring_units, low_stock, updated_at "
+               "FROM inventory_stock_levels")
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        rows = self._rows(sql + " ORDER BY blood_group, location", params)
+        for row in rows:
+            row["low_stock"] = bool(row["low_stock"])
+        return rows
+
+    # ---- doctors and appointments ----
+    def insert_doctor(self, doctor_id: str, name: str, specialty: Optional[str], phone: Optional[str],
+                      email: Optional[str], city: Optional[str]) -> int:
+        return self._execute(
+            "INSERT INTO doctors (doctor_id, name, specialty, phone, email, city) VALUES (%s, %s, %s, %s, %s, %s)",
+            (doctor_id, name, specialty, phone, email, city),
+        )
+
+    def doctor_exists(self, doctor_id: str) -> bool:
+        return self._row("SELECT doctor_id FROM doctors WHERE doctor_id = %s", (doctor_id,)) is not None
+
+    def doctor_id_by_name(self, name: str) -> Optional[str]:
+        """ID of the only doctor called ``name``; None when there is none or the name is ambiguous"""
+        rows = self._rows("SELECT doctor_id FROM doctors WHERE name = %s LIMIT 2", (name,))
+        return rows[0]["doctor_id"] if len(rows) == 1 else None
+
+    def replace_schedule(self, doctor_id: str, blocks: List[tuple]) -> None:
+        """Swap the doctor's weekly hours for (weekday, start_time, end_time, slot_minutes) blocks"""
+        self._execute("DELETE FROM doctor_schedules WHERE doctor_id = %s", (doctor_id,))
+        for weekday, start_time, end_time, slot_minutes in blocks:
+            self._execute(
+                "INSERT INTO doctor_schedules (doctor_id, weekday, start_time, end_time, slot_minutes) "
+                "VALUES (%s, %s, %s, %s, %s)",
+                (doctor_id, weekday, start_time, end_time, slot_minutes),
+            )
+
+    def insert_appointment(self, appointment_id: str, patient_name: str, doctor_id: Optional[str],
+                           doctor_name: Optional[str], specialty: Optional[str], day: date, start_time: Optional[str],
+                           end_time: Optional[str], reason: Optional[str], phone: Optional[str]) -> int:
+        return self._execute(
+            "INSERT INTO appointments (appointment_id, patient_name, doctor_id, doctor_name, specialty, date, time, "
+            "end_time, status, reason, phone) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, 'scheduled', %s, %s)",
+            (appointment_id, patient_name, doctor_id, doctor_name, specialty, day, start_time, end_time, reason, phone),
+        )
+
+    def lock_appointment(self, appointment_id: str) -> Optional[dict]:
+        """doctor_id, date, status, time and end_time, locking the row until the transaction ends"""
+        return self._row(
+            "SELECT doctor_id, date, status, time, end_time FROM appointments WHERE appointment_id = %s FOR UPDATE",
+            (appointment_id,),
+        )
+
+    def set_appointment_status(self, appointment_id: str, status: str) -> int:
+        return self._execute("UPDATE appointments SET status = %s WHERE appointment_id = %s", (status, appointment_id))
+
+    # ---- exports ----
+    def stream_table(self, table: str, key: str, columns: List[str], fetch_size: int = 1000):
+        """Yield lists of up to ``fetch_size`` row tuples of a whole table, ordered by ``key``.
+
+        Reads through an unbuffered cursor, so memory stays flat whatever the
+        table size. Table and column names come from the caller's whitelist.
+        The connection cannot run anything else until the generator is
+        exhausted or closed.
+        """
+        cur = self.conn.cursor(buffered=False)
+        try:
+            cur.execute(f"SELECT {', '.join(columns)} FROM {table} ORDER BY {key}")
+            while True:
+                rows = cur.fetchmany(fetch_size)
+                if not rows:
+                    return
+                yield rows
+        finally:
+            cur.close()
+
+    # ---- camp registrations ----
+    def register(self, camp_id: str, donor_id: str) -> dict:
+        """Seat a donor at a camp, or waitlist them when it is full.
+
+        The seat is taken with one conditional UPDATE (registered <
+        capacity), so concurrent sign-ups can never oversell. A full camp's
+        row is locked instead, which orders the waitlist insert against a
+        cancellation freeing a seat. Raises NotFound for an unknown camp or
+        donor, and IntegrityError when the donor is already signed up.
+        """
+        seated = self._execute(
+            "UPDATE camps SET registered = registered + 1 WHERE camp_id = %s AND registered < capacity",
+            (camp_id,),
+        ) == 1
+        if not seated and self._row("SELECT 1 AS found FROM camps WHERE camp_id = %s FOR UPDATE", (camp_id,)) is None:
+            raise NotFound("Camp not found")
+        with self.conn.statement(REGISTRATION_INSERT_SQL) as cur:
+            cur.execute(REGISTRATION_INSERT_SQL, (camp_id, "registered" if seated else "waitlisted", donor_id))
+            if cur.rowcount == 0:
+                raise NotFound("Donor not found")
+            registration_id = cur.lastrowid
+        result = {"status": "registered" if seated else "waitlisted", "registration_id": registration_id}
+        if not seated:
+            result["waitlist_position"] = self.waitlist_position(camp_id, registration_id)
+        return result
+
+    def registration(self, camp_id: str, donor_id: str, lock: bool = False) -> Optional[dict]:
+        sql = "SELECT registration_id, status FROM camp_registrations WHERE camp_id = %s AND donor_id = %s"
+        return self._row(sql + " FOR UPDATE" if lock else sql, (camp_id, donor_id))
+
+    def waitlist_position(self, camp_id: str, registration_id: int) -> int:
+        row = self._row(
+            "SELECT COUNT(*) AS position FROM camp_registrations "
+            "WHERE camp_id = %s AND status = 'waitlisted' AND registration_id <= %s",
+            (camp_id, registration_id),
+        )
+        return row["position"]
+
+    def delete_cancelled_registration(self, registration_id: int) -> int:
+        return self._execute(
+            "DELETE FROM camp_registrations WHERE registration_id = %s AND status = 'cancelled'", (registration_id,)
+        )
+
+    def cancel_registration(self, camp_id: str, donor_id: str) -> Optional[str]:
+        """Cancel a live registration; returns the donor promoted from the waitlist, if any.
+
+        Locks the camp row, then the registration: the same order as
+        ``register``, so the two never deadlock. Raises NotFound when there
+        is nothing to cancel.
+        """
+        if self._row("SELECT 1 AS found FROM camps WHERE camp_id = %s FOR UPDATE", (camp_id,)) is None:
+            raise NotFound("Camp not found")
+        row = self.registration(camp_id, donor_id, lock=True)
+        if row is None or row["status"] == "cancelled":
+            raise NotFound("Registration not found")
+        self._execute("UPDATE camp_registrations SET status = 'cancelled' WHERE registration_id = %s",
+                      (row["registration_id"],))
+        return self.free_seat(camp_id) if row["status"] == "registered" else None
+
+    def free_seat(self, camp_id: str) -> Optional[str]:
+        """Give a freed seat to the head of the camp's waitlist; returns the promoted donor_id.
+
+        With nobody waiting, the camp's registered count drops instead. The
+        caller holds the camp row lock, so two cancellations cannot promote
+        the same donor.
+        """
+        head = self._row(
+            "SELECT registration_id, donor_id FROM camp_registrations "
+            "WHERE camp_id = %s AND status = 'waitlisted' ORDER BY registration_id LIMIT 1 FOR UPDATE",
+            (camp_id,),
+        )
+        if head is None:
+            self._execute("UPDATE camps SET registered = registered - 1 WHERE camp_id = %s AND registered > 0",
+                          (camp_id,))
+            return None
+        # The seat passes straight to the next donor; the registered count is unchanged
+        self._execute("UPDATE camp_registrations SET status = 'registered' WHERE registration_id = %s",
+                      (head["registration_id"],))
+        return head["donor_id"]
+
+    # ---- emergency requests ----
+    def insert_emergency_request(self, request_id: str, hospital_name: str, blood_group: str, units_needed: int,
+                                 city: Optional[str], contact_phone: Optional[str],
+                                 contact_email: Optional[str]) -> int:
+        return self._execute(
+            "INSERT INTO emergency_requests (request_id, hospital_name, blood_group, units_needed, city, status, "
+            "contact_phone, contact_email) VALUES (%s, %s, %s, %s, %s, 'pending', %s, %s)",
+            (request_id, hospital_name, blood_group, units_needed, city, contact_phone, contact_email),
+        )
+
+    def emergency_request(self, request_id: str) -> Optional[dict]:
+        return self._row("SELECT blood_group, city FROM emergency_requests WHERE request_id = %s", (request_id,))
+
+    def lock_emergency_status(self, request_id: str) -> Optional[str]:
+        """Current status, locking the row until the transaction ends"""
+        row = self._row("SELECT status FROM emergency_requests WHERE request_id = %s FOR UPDATE", (request_id,))
+        return row["status"] if row else None
+
+    def set_emergency_status(self, request_id: str, status: str) -> int:
+        return self._execute("UPDATE emergency_requests SET status = %s WHERE request_id = %s", (status, request_id))
+
+    def eligible_donors(self, columns: List[str], city: str, blood_group: str, cutoff: date, limit: int,
+                        after_date: Optional[str] = None, after_id: Optional[str] = None,
+                        resume: bool = False) -> List[dict]:
+        """Donors of one group in ``city`` who last gave on or before ``cutoff``.
+
+        Ordered by last_donation_date (never donated first), then donor_id.
+        With ``resume``, continue after the (``after_date``, ``after_id``)
+        cursor; a None ``after_date`` means the cursor is inside the
+        never-donated block.
+        """
+        sql = f"""
+            SELECT {', '.join(columns)} FROM donors
+            WHERE city = %s AND blood_group = %s
+              AND (last_donation_date IS NULL OR last_donation_date <= %s)
+        """
+        params = [city, blood_group, cutoff]
+        if resume:
+            # NULL (never donated) sorts first, so resume inside or after the NULL block
+            if after_date is None:
+                sql += " AND ((last_donation_date IS NULL AND donor_id > %s) OR last_donation_date IS NOT NULL)"
+                params.append(after_id)
+            else:
+                sql += " AND (last_donation_date > %s OR (last_donation_date = %s AND donor_id > %s))"
+                params.extend([after_date, after_date, after_id])
+        sql += " ORDER BY last_donation_date, donor_id LIMIT %s"
+        params.append(limit)
+        return self._rows(sql, params)
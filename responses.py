@@ -0,0 +1,170 @@
+import json
+import zlib
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+from time import perf_counter
+
+from fastapi.responses import JSONResponse
+
+from metrics import add_phase
+
+try:
+    import orjson
+except ImportError:  # fall back to the stdlib encoder
+    orjson = None
+
+try:
+    import brotli
+except ImportError:  # brotli is optional; gzip is always available
+    brotli = None
+
+
+def _default(value):
+    """Encode the MySQL types orjson doesn't know, matching FastAPI's encoder"""
+    if isinstance(value, timedelta):
+        # TIME columns come back as timedelta
+        return value.total_seconds()
+    if isinstance(value, Decimal):
+        return int(value) if value == value.to_integral_value() else float(value)
+    if isinstance(value, (bytes, bytearray)):
+        return value.decode("utf-8", errors="replace")
+    if isinstance(value, (set, frozenset)):
+        return list(value)
+    if isinstance(value, (date, datetime, time)):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps(data) -> bytes:
+    """Serialize rows from MySQL straight to JSON bytes"""
+    start = perf_counter()
+    if orjson is not None:
+        body = orjson.dumps(data, default=_default, option=orjson.OPT_NON_STR_KEYS)
+    else:
+        body = json.dumps(data, default=_default, separators=(",", ":")).encode()
+    add_phase("serialize", perf_counter() - start)
+    return body
+
+
+class FastJSONResponse(JSONResponse):
+    def render(self, content) -> bytes:
+        return dumps(content)
+
+
+COMPRESSIBLE_TYPES = ("application/json", "application/x-ndjson", "text/")
+# Event streams are long-lived and tiny per message; a compressor per
+# subscriber would cost far more memory than it saves
+UNCOMPRESSED_TYPES = ("text/event-stream",)
+
+
+def choose_encoding(accept_encoding: str):
+    """Pick br or gzip from an Accept-Encoding header, honouring q=0"""
+    accepted = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        q = 1.0
+        if params.strip().startswith("q="):
+            try:
+                q = float(params.strip()[2:])
+            except ValueError:
+                q = 0.0
+        accepted[name.strip().lower()] = q
+    if brotli is not None and accepted.get("br", 0) > 0:
+        return "br"
+    if accepted.get("gzip", 0) > 0:
+        return "gzip"
+    return None
+
+
+class _Compressor:
+    def __init__(self, encoding, gzip_level, brotli_quality):
+        if encoding == "br":
+            self._br = brotli.Compressor(quality=brotli_quality)
+            self._zlib = None
+        else:
+            self._br = None
+            self._zlib = zlib.compressobj(gzip_level, zlib.DEFLATED, 31)  # 31 = gzip container
+
+    def compress(self, data: bytes, final: bool) -> bytes:
+        if self._br is not None:
+            out = self._br.process(data)
+            return out + (self._br.finish() if final else self._br.flush())
+        out = self._zlib.compress(data)
+        return out + self._zlib.flush(zlib.Z_FINISH if final else zlib.Z_SYNC_FLUSH)
+
+
+class CompressionMiddleware:
+    """ASGI middleware applying negotiated brotli/gzip compression.
+
+    Complete bodies smaller than ``minimum_size`` are sent as-is. Streaming
+    responses are compressed chunk by chunk and flushed after every chunk,
+    so exports keep streaming.
+    """
+
+    def __init__(self, app, minimum_size=1024, gzip_level=6, brotli_quality=4):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        headers = dict(scope.get("headers") or [])
+        encoding = choose_encoding(headers.get(b"accept-encoding", b"").decode("latin-1"))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start = None
+        compressor = None
+        passthrough = False
+
+        async def send_wrapper(message):
+            nonlocal start, compressor, passthrough
+            if message["type"] == "http.response.start":
+                start = message
+                return
+            if message["type"] != "http.response.body" or passthrough:
+                await send(message)
+                return
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+
+            if compressor is None:
+                response_headers = dict(start.get("headers", []))
+                content_type = response_headers.get(b"content-type", b"").decode("latin-1")
+                compressible = (
+                    b"content-encoding" not in response_headers
+                    and any(content_type.startswith(t) for t in COMPRESSIBLE_TYPES)
+                    and not any(content_type.startswith(t) for t in UNCOMPRESSED_TYPES)
+                    and (more_body or len(body) >= self.minimum_size)
+                )
+                if not compressible:
+                    passthrough = True
+                    await send(start)
+                    await send(message)
+                    return
+                compressor = _Compressor(encoding, self.gzip_level, self.brotli_quality)
+                raw_headers = [(k, v) for k, v in start.get("headers", []) if k != b"content-length"]
+                raw_headers.append((b"content-encoding", encoding.encode()))
+                raw_headers.append((b"vary", b"Accept-Encoding"))
+                if more_body:
+                    start["headers"] = raw_headers
+                    await send(start)
+                else:
+                    compressed = compressor.compress(body, final=True)
+                    raw_headers.append((b"content-length", str(len(compressed)).encode()))
+                    start["headers"] = raw_headers
+                    await send(start)
+                    await send({"type": "http.response.body", "body": compressed})
+                    return
+
+            await send({
+                "type": "http.response.body",
+                "body": compressor.compress(body, final=not more_body),
+                "more_body": more_body,
+            })
+
+        await self.app(scope, receive, send_wrapper)
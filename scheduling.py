@@ -0,0 +1,238 @@
+import threading
+import time
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict
+from datetime import date, datetime, timedelta
+
+DEFAULT_SLOT_MINUTES = 30
+MAX_AVAILABILITY_DAYS = 62
+
+# Live appointments of a doctor overlapping [start, end) on a day. A locking
+# read, so it sees rows committed after this transaction's snapshot was taken
+OVERLAP_SQL = (
+    "SELECT appointment_id FROM appointments "
+    "WHERE doctor_id = %s AND date = %s AND status <> 'cancelled' AND appointment_id <> %s "
+    f"AND time < %s AND COALESCE(end_time, ADDTIME(time, '00:{DEFAULT_SLOT_MINUTES:02d}:00')) > %s "
+    "LIMIT 1 FOR UPDATE"
+)
+
+
+class SlotError(Exception):
+    """The requested time is not a bookable slot for the doctor"""
+
+
+class SlotConflict(Exception):
+    """The requested slot overlaps an existing appointment"""
+
+
+def to_minutes(value) -> int:
+    """Minutes since midnight for a MySQL TIME (timedelta), datetime.time or "HH:MM[:SS]" string"""
+    if isinstance(value, timedelta):
+        return int(value.total_seconds()) // 60
+    if isinstance(value, str):
+        parts = value.strip().split(":")
+        if len(parts) not in (2, 3):
+            raise ValueError(f"Invalid time: {value!r}")
+        return int(parts[0]) * 60 + int(parts[1])
+    return value.hour * 60 + value.minute
+
+
+def format_minutes(minutes: int) -> str:
+    return f"{minutes // 60:02d}:{minutes % 60:02d}"
+
+
+class IntervalIndex:
+    """Busy [start, end) intervals for one doctor on one day.
+
+    Intervals are merged on insert, so the starts and ends lists are both
+    sorted and an overlap check is two bisects. ``add`` swaps in new lists
+    rather than editing them, so readers never see a half-applied insert.
+    """
+
+    def __init__(self):
+        self._spans = ([], [])
+
+    def __len__(self):
+        return len(self._spans[0])
+
+    def conflicts(self, start, end) -> bool:
+        starts, ends = self._spans
+        # Last interval starting before ``end`` is the only one that can reach past ``start``
+        i = bisect_left(starts, end)
+        return i > 0 and ends[i - 1] > start
+
+    def add(self, start, end):
+        starts, ends = self._spans
+        first = bisect_right(ends, start)
+        last = bisect_left(starts, end)
+        if first < last:
+            start = min(start, starts[first])
+            end = max(end, ends[last - 1])
+        self._spans = (starts[:first] + [start] + starts[last:], ends[:first] + [end] + ends[last:])
+
+
+class SlotBook:
+    """Doctor working hours and booked time, cached per doctor and day.
+
+    Schedules come from doctor_schedules; busy time for a (doctor, day) is
+    loaded once from appointments over uq_appointments_doctor_slot and
+    kept as an IntervalIndex, so conflict checks and availability queries
+    do not touch the appointments table again until the entry is older
+    than ``ttl`` (which picks up bookings made by other worker processes).
+    At most ``max_days`` (doctor, day) entries are kept, least recently
+    used first out.
+
+    The cache only rejects early. ``check`` ends with ``claim``, which locks
+    the doctor's row and re-checks overlap in MySQL, so bookings of one
+    doctor are serialised across every worker process until the caller's
+    transaction ends; slots with different start times cannot overlap.
+    """
+
+    def __init__(self, ttl=30, max_days=4096):
+        self.ttl = ttl
+        self.max_days = max_days
+        self._schedules = {}  # doctor_id -> (loaded, {weekday: [(start, end, slot_minutes)]})
+        self._days = OrderedDict()  # (doctor_id, date) -> (loaded, IntervalIndex), oldest use first
+        self._locks = {}
+        self._guard = threading.Lock()
+
+    def lock(self, doctor_id) -> threading.Lock:
+        with self._guard:
+            lock = self._locks.get(doctor_id)
+            if lock is None:
+                lock = self._locks[doctor_id] = threading.Lock()
+            return lock
+
+    def _fresh(self, loaded) -> bool:
+        return time.monotonic() - loaded <= self.ttl
+
+    def schedule(self, conn, doctor_id) -> dict:
+        entry = self._schedules.get(doctor_id)
+        if entry is not None and self._fresh(entry[0]):
+            return entry[1]
+        cur = conn.cursor()
+        try:
+            cur.execute(
+                "SELECT weekday, start_time, end_time, slot_minutes FROM doctor_schedules "
+                "WHERE doctor_id = %s ORDER BY weekday, start_time",
+                (doctor_id,),
+            )
+            rows = cur.fetchall()
+        finally:
+            cur.close()
+        hours = {}
+        for weekday, start, end, slot_minutes in rows:
+            hours.setdefault(int(weekday), []).append((to_minutes(start), to_minutes(end), int(slot_minutes)))
+        self._schedules[doctor_id] = (time.monotonic(), hours)
+        return hours
+
+    def busy(self, conn, doctor_id, first: date, last: date) -> dict:
+        """IntervalIndex for each day from ``first`` to ``last``, loading missing days in one query"""
+        days = [first + timedelta(days=i) for i in range((last - first).days + 1)]
+        with self._guard:
+            cached = {d: self._days.get((doctor_id, d)) for d in days}
+            for d, entry in cached.items():
+                if entry is not None:
+                    self._days.move_to_end((doctor_id, d))
+        missing = [d for d, entry in cached.items() if entry is None or not self._fresh(entry[0])]
+        if missing:
+            loaded_at = time.monotonic()
+            cur = conn.cursor()
+            try:
+                cur.execute(
+                    "SELECT date, time, end_time FROM appointments "
+                    "WHERE doctor_id = %s AND date BETWEEN %s AND %s AND status <> 'cancelled'",
+                    (doctor_id, missing[0], missing[-1]),
+                )
+                rows = cur.fetchall()
+            finally:
+                cur.close()
+            loaded = {d: IntervalIndex() for d in missing}
+            for day, start, end in rows:
+                if isinstance(day, str):
+                    day = date.fromisoformat(day)
+                if day in loaded and start is not None:
+                    start = to_minutes(start)
+                    loaded[day].add(start, to_minutes(end) if end is not None else start + DEFAULT_SLOT_MINUTES)
+            with self._guard:
+                for day, index in loaded.items():
+                    cached[day] = self._days[(doctor_id, day)] = (loaded_at, index)
+                    self._days.move_to_end((doctor_id, day))
+                while len(self._days) > self.max_days:
+                    self._days.popitem(last=False)
+        return {d: entry[1] for d, entry in cached.items()}
+
+    def slot_for(self, conn, doctor_id, day: date, start: int):
+        """The (start, end) slot beginning at ``start``, or SlotError when outside working hours.
+
+        Doctors without a schedule take bookings at any time in slots of
+        DEFAULT_SLOT_MINUTES.
+        """
+        hours = self.schedule(conn, doctor_id)
+        if not hours:
+            return start, start + DEFAULT_SLOT_MINUTES
+        for block_start, block_end, slot_minutes in hours.get(day.weekday(), ()):
+            if block_start <= start and start + slot_minutes <= block_end \
+                    and (start - block_start) % slot_minutes == 0:
+                return start, start + slot_minutes
+        raise SlotError(f"{format_minutes(start)} on {day.isoformat()} is not a bookable slot")
+
+    def check(self, conn, doctor_id, day: date, start: int):
+        """Validate a booking; return its (start, end) or raise SlotError / SlotConflict"""
+        start, end = self.slot_for(conn, doctor_id, day, start)
+        if self.busy(conn, doctor_id, day, day)[day].conflicts(start, end):
+            raise SlotConflict(f"Doctor {doctor_id} is already booked at {format_minutes(start)} on {day.isoformat()}")
+        self.claim(conn, doctor_id, day, start, end)
+        return start, end
+
+    def claim(self, conn, doctor_id, day: date, start: int, end: int, exclude: str = ""):
+        """Lock the doctor for the rest of the transaction and re-check [start, end) in MySQL.
+
+        ``exclude`` is an appointment_id to ignore, e.g. the one being
+        reinstated. Raises SlotConflict and drops the cached day when the
+        cache missed a booking from another process.
+        """
+        cur = conn.cursor()
+        try:
+            cur.execute("SELECT doctor_id FROM doctors WHERE doctor_id = %s FOR UPDATE", (doctor_id,))
+            cur.fetchall()
+            cur.execute(OVERLAP_SQL, (doctor_id, day, exclude, format_minutes(end), format_minutes(start)))
+            taken = cur.fetchall()
+        finally:
+            cur.close()
+        if taken:
+            self.invalidate_day(doctor_id, day)
+            raise SlotConflict(f"Doctor {doctor_id} is already booked at {format_minutes(start)} on {day.isoformat()}")
+
+    def book(self, doctor_id, day: date, start: int, end: int):
+        with self._guard:
+            entry = self._days.get((doctor_id, day))
+        if entry is not None:
+            entry[1].add(start, end)
+
+    def invalidate_schedule(self, doctor_id):
+        self._schedules.pop(doctor_id, None)
+
+    def invalidate_day(self, doctor_id, day: date):
+        """Drop cached busy time, e.g. after a cancellation or a booking race"""
+        with self._guard:
+            self._days.pop((doctor_id, day), None)
+
+    def availability(self, conn, doctor_id, first: date, last: date, now: datetime = None):
+        """Free slots per day between ``first`` and ``last`` inclusive"""
+        now = now or datetime.now()
+        first = max(first, now.date())
+        if first > last:
+            return []
+        hours = self.schedule(conn, doctor_id)
+        busy = self.busy(conn, doctor_id, first, last)
+        days = []
+        for day, index in busy.items():
+            earliest = now.hour * 60 + now.minute if day == now.date() else 0
+            slots = []
+            for block_start, block_end, slot_minutes in hours.get(day.weekday(), ()):
+                for start in range(block_start, block_end - slot_minutes + 1, slot_minutes):
+                    if start >= earliest and not index.conflicts(start, start + slot_minutes):
+                        slots.append({"time": format_minutes(start), "end_time": format_minutes(start + slot_minutes)})
+            days.append({"date": day.isoformat(), "slots": slots})
+        return days
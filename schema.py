@@ -0,0 +1,652 @@
+"""Versioned schema for the DonorConnect database, plus a query-plan check.
+
+    python schema.py migrate   # create/upgrade tables and indexes
+    python schema.py status    # list applied and pending migrations
+    python schema.py check     # EXPLAIN every catalogued API query, fail on scans and large sorts
+    python schema.py rebuild-dashboard  # recompute dashboard_counters from the base tables
+
+Migrations are applied in version order and recorded in schema_migrations.
+Tables use CREATE TABLE IF NOT EXISTS, so an existing hand-made 'patient'
+database is adopted rather than rebuilt.
+"""
+
+import logging
+import os
+import sys
+from datetime import date, timedelta
+
+import mysql.connector
+
+from ids import ID_DIGITS
+from repository import REGISTRATION_INSERT_SQL
+from scheduling import OVERLAP_SQL
+
+logger = logging.getLogger("donorconnect.schema")
+
+# Recomputes dashboard_counters from the base tables (migration 7, rebuild-dashboard)
+DASHBOARD_BACKFILL = [
+    "INSERT INTO dashboard_counters (metric, dim, shard, value) SELECT 'donors', '', 0, COUNT(*) FROM donors",
+    "INSERT INTO dashboard_counters (metric, dim, shard, value) "
+    "SELECT 'donors_by_group', blood_group, 0, COUNT(*) FROM donors WHERE blood_group IS NOT NULL GROUP BY blood_group",
+    "INSERT INTO dashboard_counters (metric, dim, shard, value) "
+    "SELECT 'camps_by_date', DATE_FORMAT(date, '%Y-%m-%d'), 0, COUNT(*) FROM camps WHERE date IS NOT NULL GROUP BY date",
+    "INSERT INTO dashboard_counters (metric, dim, shard, value) "
+    "SELECT 'units_by_group', blood_group, 0, SUM(units_available) FROM blood_inventory "
+    "WHERE status = 'available' AND blood_group IS NOT NULL GROUP BY blood_group",
+    "INSERT INTO dashboard_counters (metric, dim, shard, value) "
+    "SELECT 'requests_by_status', status, 0, COUNT(*) FROM emergency_requests GROUP BY status",
+    "INSERT INTO dashboard_counters (metric, dim, shard, value) "
+    "SELECT 'appointments_by_day', CONCAT(DATE_FORMAT(date, '%Y-%m-%d'), '/', status), 0, COUNT(*) FROM appointments "
+    "WHERE date IS NOT NULL GROUP BY date, status",
+    "INSERT INTO dashboard_counters (metric, dim, shard, value) "
+    "SELECT 'donations_by_month', DATE_FORMAT(date, '%Y-%m'), 0, COUNT(*) FROM donation_records "
+    "WHERE date IS NOT NULL GROUP BY DATE_FORMAT(date, '%Y-%m')",
+]
+
+# Every column holding a prefixed ID from ids.py, primary keys and references alike
+ID_COLUMNS = [
+    ("donors", "donor_id"),
+    ("camp_registrations", "donor_id"),
+    ("camps", "camp_id"),
+    ("camp_registrations", "camp_id"),
+    ("blood_inventory", "camp_id"),
+    ("blood_inventory", "inventory_id"),
+    ("doctors", "doctor_id"),
+    ("doctor_schedules", "doctor_id"),
+    ("appointments", "doctor_id"),
+    ("emergency_requests", "request_id"),
+    ("appointments", "appointment_id"),
+]
+
+
+
+def check_id_references(cur):
+    """Refuse to rewrite IDs that a foreign key outside ID_COLUMNS points at or from.
+
+    The shipped schema has no foreign keys; a deployment that added its own
+    must drop them (or make them ON UPDATE CASCADE) before migration 11.
+    """
+    pairs = " OR ".join("(%s, %s) IN ((table_name, column_name), (referenced_table_name, referenced_column_name))"
+                        for _ in ID_COLUMNS)
+    cur.execute(
+        "SELECT table_name, column_name, referenced_table_name, referenced_column_name "
+        "FROM information_schema.key_column_usage "
+        f"WHERE table_schema = DATABASE() AND referenced_table_name IS NOT NULL AND ({pairs})",
+        [value for pair in ID_COLUMNS for value in pair],
+    )
+    references = cur.fetchall()
+    if references:
+        raise RuntimeError(
+            "Foreign keys reference prefixed IDs and would break when they are re-padded: "
+            + ", ".join(f"{t}.{c} -> {rt}.{rc}" for t, c, rt, rc in references)
+        )
+
+
+# (version, description, statements); a statement may be a callable taking the cursor
+MIGRATIONS = [
+    (1, "core tables", [
+        """
+        CREATE TABLE IF NOT EXISTS users (
+            id INT AUTO_INCREMENT PRIMARY KEY,
+            username VARCHAR(100) NOT NULL UNIQUE,
+            email VARCHAR(255),
+            password VARCHAR(255) NOT NULL,
+            role VARCHAR(20) NOT NULL DEFAULT 'user',
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS donation_records (
+            id INT AUTO_INCREMENT PRIMARY KEY,
+            patient_name VARCHAR(255),
+            blood_type VARCHAR(10),
+            doctor_name VARCHAR(255),
+            date DATE,
+            time TIME,
+            blood_pressure INT,
+            symptoms TEXT,
+            medical_history TEXT,
+            contact_number VARCHAR(20),
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS donors (
+            donor_id VARCHAR(16) PRIMARY KEY,
+            name VARCHAR(255) NOT NULL,
+            blood_group VARCHAR(5) NOT NULL,
+            phone VARCHAR(20),
+            email VARCHAR(255),
+            city VARCHAR(100),
+            last_donation_date DATE NULL,
+            gender VARCHAR(20),
+            age INT
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS camps (
+            camp_id VARCHAR(16) PRIMARY KEY,
+            title VARCHAR(255) NOT NULL,
+            venue VARCHAR(255),
+            city VARCHAR(100),
+            date DATE,
+            start_time TIME,
+            end_time TIME,
+            organizer VARCHAR(255),
+            capacity INT NOT NULL DEFAULT 0,
+            registered INT NOT NULL DEFAULT 0
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS blood_inventory (
+            inventory_id VARCHAR(16) PRIMARY KEY,
+            blood_group VARCHAR(5) NOT NULL,
+            units_available INT NOT NULL,
+            location VARCHAR(255),
+            camp_id VARCHAR(16) NULL,
+            expiry_date DATE NOT NULL
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS emergency_requests (
+            request_id VARCHAR(16) PRIMARY KEY,
+            hospital_name VARCHAR(255) NOT NULL,
+            blood_group VARCHAR(5) NOT NULL,
+            units_needed INT NOT NULL,
+            city VARCHAR(100),
+            status VARCHAR(20) NOT NULL DEFAULT 'pending',
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            contact_phone VARCHAR(20),
+            contact_email VARCHAR(255)
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS doctors (
+            doctor_id VARCHAR(16) PRIMARY KEY,
+            name VARCHAR(255) NOT NULL,
+            specialty VARCHAR(100),
+            phone VARCHAR(20),
+            email VARCHAR(255),
+            city VARCHAR(100)
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS appointments (
+            appointment_id VARCHAR(16) PRIMARY KEY,
+            patient_name VARCHAR(255) NOT NULL,
+            doctor_name VARCHAR(255),
+            specialty VARCHAR(100),
+            date DATE,
+            time TIME,
+            status VARCHAR(20) NOT NULL DEFAULT 'scheduled',
+            reason TEXT,
+            phone VARCHAR(20)
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS id_sequences (
+            name VARCHAR(64) PRIMARY KEY,
+            next_value BIGINT UNSIGNED NOT NULL
+        )
+        """,
+    ]),
+    (2, "hot-path indexes", [
+        "CREATE INDEX idx_donors_city_group_last_donation ON donors (city, blood_group, last_donation_date, donor_id)",
+        "CREATE INDEX idx_donors_blood_group ON donors (blood_group, donor_id)",
+        "CREATE INDEX idx_inventory_group_expiry ON blood_inventory (blood_group, expiry_date)",
+        "CREATE INDEX idx_inventory_summary ON blood_inventory (blood_group, location, expiry_date, units_available)",
+        "CREATE INDEX idx_emergency_status_created ON emergency_requests (status, created_at)",
+        "CREATE INDEX idx_appointments_doctor_date ON appointments (doctor_name, date)",
+        "CREATE INDEX idx_appointments_date ON appointments (date, status)",
+        "CREATE INDEX idx_camps_city_date ON camps (city, date)",
+        "CREATE INDEX idx_camps_date ON camps (date)",
+        "CREATE INDEX idx_doctors_specialty ON doctors (specialty, doctor_id)",
+    ]),
+    (3, "coordinates for inventory locations and camps", [
+        "ALTER TABLE blood_inventory ADD COLUMN latitude DOUBLE NULL, ADD COLUMN longitude DOUBLE NULL",
+        "ALTER TABLE camps ADD COLUMN latitude DOUBLE NULL, ADD COLUMN longitude DOUBLE NULL",
+    ]),
+    (4, "inventory status and stock levels", [
+        "ALTER TABLE blood_inventory ADD COLUMN status VARCHAR(16) NOT NULL DEFAULT 'available'",
+        # Expiry sweep ranges over (status, expiry_date); list reads page by ID within a status
+        "CREATE INDEX idx_inventory_status_expiry ON blood_inventory (status, expiry_date)",
+        "CREATE INDEX idx_inventory_status_id ON blood_inventory (status, inventory_id)",
+        "CREATE INDEX idx_inventory_status_group ON blood_inventory (status, blood_group, inventory_id)",
+        """
+        CREATE TABLE IF NOT EXISTS inventory_stock_levels (
+            blood_group VARCHAR(5) NOT NULL,
+            location VARCHAR(255) NOT NULL,
+            lots INT NOT NULL,
+            units_available INT NOT NULL,
+            expiring_units INT NOT NULL,
+            low_stock BOOLEAN NOT NULL,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY (blood_group, location)
+        )
+        """,
+    ]),
+    (5, "camp registrations and waitlist", [
+        """
+        CREATE TABLE IF NOT EXISTS camp_registrations (
+            registration_id BIGINT AUTO_INCREMENT PRIMARY KEY,
+            camp_id VARCHAR(16) NOT NULL,
+            donor_id VARCHAR(16) NOT NULL,
+            status VARCHAR(16) NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+            UNIQUE KEY uq_camp_registrations_donor (camp_id, donor_id),
+            -- Waitlist order is registration_id within (camp, status)
+            KEY idx_camp_registrations_status (camp_id, status, registration_id)
+        )
+        """,
+    ]),
+    (6, "doctor schedules and appointment slots", [
+        """
+        CREATE TABLE IF NOT EXISTS doctor_schedules (
+            doctor_id VARCHAR(16) NOT NULL,
+            weekday TINYINT NOT NULL,  -- 0 = Monday
+            start_time TIME NOT NULL,
+            end_time TIME NOT NULL,
+            slot_minutes SMALLINT NOT NULL DEFAULT 30,
+            PRIMARY KEY (doctor_id, weekday, start_time)
+        )
+        """,
+        "ALTER TABLE appointments ADD COLUMN doctor_id VARCHAR(16) NULL, ADD COLUMN end_time TIME NULL, "
+        "ADD COLUMN active_slot TINYINT AS (IF(status = 'cancelled', NULL, 1)) STORED",
+        # One live booking per doctor and slot start; cancelled rows have a NULL active_slot and never collide
+        "CREATE UNIQUE INDEX uq_appointments_doctor_slot ON appointments (doctor_id, date, time, active_slot)",
+        "CREATE INDEX idx_doctors_name ON doctors (name, doctor_id)",
+        # Link existing appointments to doctors with an unambiguous name; rows that
+        # would double-book a slot stay unlinked
+        """
+        UPDATE IGNORE appointments a
+        JOIN (SELECT name, MIN(doctor_id) AS doctor_id FROM doctors GROUP BY name HAVING COUNT(*) = 1) d
+          ON d.name = a.doctor_name
+        SET a.doctor_id = d.doctor_id
+        WHERE a.doctor_id IS NULL
+        """,
+    ]),
+    (7, "dashboard counters", [
+        """
+        CREATE TABLE IF NOT EXISTS dashboard_counters (
+            metric VARCHAR(32) NOT NULL,
+            dim VARCHAR(64) NOT NULL,
+            shard TINYINT NOT NULL,
+            value BIGINT NOT NULL,
+            PRIMARY KEY (metric, dim, shard)
+        )
+        """,
+        # Seed from the base tables once; the write endpoints keep them current afterwards
+        "DELETE FROM dashboard_counters",
+    ] + DASHBOARD_BACKFILL),
+    (8, "idempotent intake form submissions", [
+        # NULL for rows not written by the Streamlit intake queue; UNIQUE allows any number of NULLs
+        "ALTER TABLE donation_records ADD COLUMN intake_ref CHAR(32) NULL",
+        "CREATE UNIQUE INDEX uq_donation_records_intake_ref ON donation_records (intake_ref)",
+    ]),
+    (9, "indexes for sorted list filters", [
+        # City filter with keyset order on donor_id, without sorting every donor in the city
+        "CREATE INDEX idx_donors_city_id ON donors (city, donor_id)",
+        "CREATE INDEX idx_emergency_created ON emergency_requests (created_at)",
+    ]),
+    (10, "donation insert procedure", [
+        # Called by Repository.insert_donation with DONATION_INSERT_MODE=procedure: the
+        # nine DONATION_INSERT_SQL values in, the new id (-1 when rejected) and a message out.
+        # It does not commit; the caller's transaction also bumps the dashboard counters.
+        # A procedure of that name the deployment already has is left alone
+        """
+        CREATE PROCEDURE sp_insert_donation(
+            IN p_patient_name VARCHAR(255), IN p_blood_type VARCHAR(10), IN p_doctor_name VARCHAR(255),
+            IN p_date DATE, IN p_time TIME, IN p_blood_pressure INT, IN p_symptoms TEXT,
+            IN p_medical_history TEXT, IN p_contact_number VARCHAR(20),
+            OUT p_id INT, OUT p_message VARCHAR(255)
+        )
+        BEGIN
+            IF p_patient_name IS NULL OR TRIM(p_patient_name) = '' THEN
+                SET p_id = -1, p_message = 'Patient name is required';
+            ELSEIF p_blood_type IS NULL OR p_blood_type NOT IN ('A+', 'A-', 'B+', 'B-', 'AB+', 'AB-', 'O+', 'O-') THEN
+                SET p_id = -1, p_message = CONCAT('Unknown blood type: ', COALESCE(p_blood_type, 'NULL'));
+            ELSEIF p_blood_pressure IS NOT NULL AND p_blood_pressure <= 0 THEN
+                SET p_id = -1, p_message = 'Blood pressure must be positive';
+            ELSE
+                INSERT INTO donation_records
+                (patient_name, blood_type, doctor_name, date, time, blood_pressure, symptoms, medical_history, contact_number)
+                VALUES (p_patient_name, p_blood_type, p_doctor_name, p_date, p_time, p_blood_pressure,
+                        p_symptoms, p_medical_history, p_contact_number);
+                SET p_id = LAST_INSERT_ID(), p_message = 'Donation record created';
+            END IF;
+        END
+        """,
+    ]),
+    # Pad IDs issued as D001 .. D999 to the fixed width, so they sort with the ones issued from now on.
+    # Row updates only, no DDL, so the whole rewrite commits or rolls back as one transaction
+    (11, "fixed-width prefixed IDs", [
+        check_id_references,
+    ] + [
+        f"UPDATE {table} SET {column} = CONCAT(LEFT({column}, 1), LPAD(SUBSTRING({column}, 2), {ID_DIGITS}, '0')) "
+        f"WHERE {column} REGEXP '^[A-Z][0-9]{{1,{ID_DIGITS - 1}}}$'"
+        for table, column in ID_COLUMNS
+    ]),
+    (12, "covering index for available-stock summaries", [
+        # The inventory summary and chat stock answers count available lots only
+        "CREATE INDEX idx_inventory_status_summary "
+        "ON blood_inventory (status, blood_group, location, expiry_date, units_available)",
+    ]),
+]
+
+# MySQL errors that mean "already done" when re-running idempotent DDL
+ALREADY_APPLIED_ERRORS = {
+    1050,  # table exists
+    1060,  # duplicate column name
+    1061,  # duplicate key name
+    1304,  # procedure exists
+}
+
+
+def connect():
+    return mysql.connector.connect(
+        host=os.getenv("DB_HOST", "localhost"),
+        user=os.getenv("DB_USER", "root"),
+        password=os.getenv("DB_PASS", ""),
+        database=os.getenv("DB_NAME", "patient"),
+    )
+
+
+def applied_versions(cur) -> set:
+    cur.execute(
+        """
+        CREATE TABLE IF NOT EXISTS schema_migrations (
+            version INT PRIMARY KEY,
+            description VARCHAR(255) NOT NULL,
+            applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+        """
+    )
+    cur.execute("SELECT version FROM schema_migrations")
+    return {row[0] for row in cur.fetchall()}
+
+
+def migrate(conn) -> list:
+    """Apply every pending migration in order; returns the versions applied.
+
+    A named lock serialises concurrent callers, e.g. several API workers
+    starting at once.
+    """
+    cur = conn.cursor()
+    try:
+        cur.execute("SELECT GET_LOCK('donorconnect_schema', 60)")
+        if cur.fetchone()[0] != 1:
+            raise RuntimeError("Timed out waiting for the schema migration lock")
+        try:
+            done = applied_versions(cur)
+            applied = []
+            for version, description, statements in MIGRATIONS:
+                if version in done:
+                    continue
+                logger.info("Applying schema migration %s: %s", version, description)
+                try:
+                    for statement in statements:
+                        if callable(statement):
+                            statement(cur)
+                            continue
+                        try:
+                            cur.execute(statement)
+                        except mysql.connector.Error as e:
+                            if e.errno not in ALREADY_APPLIED_ERRORS:
+                                raise
+                    cur.execute(
+                        "INSERT INTO schema_migrations (version, description) VALUES (%s, %s)",
+                        (version, description),
+                    )
+                    conn.commit()
+                except Exception:
+                    # Undoes a migration's row changes; DDL has already committed implicitly
+                    conn.rollback()
+                    raise
+                applied.append(version)
+            return applied
+        finally:
+            cur.execute("SELECT RELEASE_LOCK('donorconnect_schema')")
+            cur.fetchone()
+    finally:
+        cur.close()
+
+
+# ============ QUERY PLAN CHECK ============
+# Representative form of every query the API issues: (name, sql, params, full scan allowed).
+# tests/test_query_catalog.py fails when a query in the code has no entry here;
+# plain INSERT ... VALUES and SELECTs of no table have no plan to check
+_today = date.today()
+QUERY_CATALOG = [
+    ("list_donors", "SELECT donor_id, name FROM donors ORDER BY donor_id LIMIT %s", (101,), False),
+    ("list_donors_by_group", "SELECT donor_id, name FROM donors WHERE blood_group = %s ORDER BY donor_id LIMIT %s", ("O+", 101), False),
+    ("list_donors_by_city", "SELECT donor_id, name FROM donors WHERE city = %s AND donor_id > %s ORDER BY donor_id LIMIT %s", ("Kolkata", "D0000001", 101), False),
+    ("list_camps", "SELECT camp_id, title FROM camps ORDER BY camp_id LIMIT %s", (101,), False),
+    ("list_camps_by_city", "SELECT camp_id, title FROM camps WHERE city = %s ORDER BY camp_id LIMIT %s", ("Pune", 101), False),
+    ("list_inventory", "SELECT inventory_id, units_available FROM blood_inventory WHERE status = %s ORDER BY inventory_id LIMIT %s", ("available", 101), False),
+    ("list_inventory_by_group", "SELECT inventory_id, units_available FROM blood_inventory WHERE status = %s AND blood_group = %s ORDER BY inventory_id LIMIT %s", ("available", "A+", 101), False),
+    ("expire_lots",
+     "SELECT inventory_id, blood_group, units_available FROM blood_inventory "
+     "WHERE status = 'available' AND expiry_date < %s ORDER BY expiry_date LIMIT %s FOR UPDATE",
+     (_today, 5000), False),
+    ("expire_lots_mark", "UPDATE blood_inventory SET status = 'expired' WHERE inventory_id IN (%s, %s)",
+     ("I0000001", "I0000002"), False),
+    ("dashboard",
+     "SELECT metric, dim, SUM(value) FROM dashboard_counters "
+     "WHERE metric IN ('donors', 'donors_by_group', 'units_by_group', 'requests_by_status') "
+     "OR (metric = 'camps_by_date' AND dim >= %s) OR (metric = 'appointments_by_day' AND dim LIKE %s) "
+     "OR (metric = 'donations_by_month' AND dim >= %s) GROUP BY metric, dim",
+     (_today.isoformat(), f"{_today.isoformat()}/%", _today.strftime("%Y-%m")), False),
+    ("list_doctors", "SELECT doctor_id, name FROM doctors ORDER BY doctor_id LIMIT %s", (101,), False),
+    ("list_doctors_by_specialty", "SELECT doctor_id, name FROM doctors WHERE specialty = %s ORDER BY doctor_id LIMIT %s", ("Hematology", 101), False),
+    ("list_emergency_requests", "SELECT request_id, status FROM emergency_requests ORDER BY request_id LIMIT %s", (101,), False),
+    ("list_emergency_requests_by_status", "SELECT request_id, status FROM emergency_requests WHERE status = %s ORDER BY request_id LIMIT %s", ("pending", 101), False),
+    ("list_appointments", "SELECT appointment_id, status FROM appointments ORDER BY appointment_id LIMIT %s", (101,), False),
+    ("list_appointments_by_doctor", "SELECT appointment_id, status FROM appointments WHERE doctor_name = %s ORDER BY appointment_id LIMIT %s", ("Dr. Rao", 101), False),
+    ("list_emergency_requests_by_date",
+     "SELECT request_id, status FROM emergency_requests WHERE created_at >= %s AND created_at < %s "
+     "ORDER BY request_id LIMIT %s",
+     (_today - timedelta(days=30), _today + timedelta(days=1), 101), False),
+    # fields= narrows the select list, which can tempt MySQL onto a covering index plus a sort
+    ("list_donors_fields", "SELECT donor_id, blood_group, city FROM donors WHERE city = %s ORDER BY donor_id LIMIT %s", ("Kolkata", 101), False),
+    ("list_inventory_fields", "SELECT inventory_id, blood_group, expiry_date FROM blood_inventory WHERE status = %s ORDER BY inventory_id LIMIT %s", ("available", 101), False),
+    ("stock_levels",
+     "SELECT blood_group, location, lots, units_available, expiring_units, low_stock, updated_at "
+     "FROM inventory_stock_levels ORDER BY blood_group, location",
+     (), True),
+    ("stock_levels_by_group",
+     "SELECT blood_group, location, lots, units_available, expiring_units, low_stock, updated_at "
+     "FROM inventory_stock_levels WHERE blood_group = %s ORDER BY blood_group, location",
+     ("O-",), False),
+    ("stock_levels_low",
+     "SELECT blood_group, location, lots, units_available, expiring_units, low_stock, updated_at "
+     "FROM inventory_stock_levels WHERE low_stock = %s ORDER BY blood_group, location",
+     (True,), True),
+    ("match_request", "SELECT blood_group, city FROM emergency_requests WHERE request_id = %s", ("R0000001",), False),
+    ("match_donors",
+     "SELECT donor_id, name FROM donors WHERE city = %s AND blood_group = %s "
+     "AND (last_donation_date IS NULL OR last_donation_date <= %s) ORDER BY last_donation_date, donor_id LIMIT %s",
+     ("Kolkata", "O-", _today - timedelta(days=90), 51), False),
+    ("inventory_summary",
+     "SELECT blood_group, location, COUNT(*) AS lots, SUM(units_available) AS units, "
+     "SUM(CASE WHEN expiry_date < %s THEN units_available ELSE 0 END) AS expired, "
+     "SUM(CASE WHEN expiry_date >= %s AND expiry_date <= %s THEN units_available ELSE 0 END) AS critical, "
+     "SUM(CASE WHEN expiry_date > %s AND expiry_date <= %s THEN units_available ELSE 0 END) AS warning, "
+     "SUM(CASE WHEN expiry_date > %s THEN units_available ELSE 0 END) AS good "
+     "FROM blood_inventory WHERE status = 'available' GROUP BY blood_group, location ORDER BY blood_group, location",
+     (_today, _today, _today + timedelta(days=7), _today + timedelta(days=7),
+      _today + timedelta(days=14), _today + timedelta(days=14)), False),
+    ("id_sequence", "UPDATE id_sequences SET next_value = LAST_INSERT_ID(next_value + %s) WHERE name = %s", (20, "donors"), False),
+    ("id_sequence_seed",
+     "INSERT IGNORE INTO id_sequences (name, next_value) "
+     "SELECT %s, COALESCE(MAX(CAST(SUBSTRING(donor_id, 2) AS UNSIGNED)), 0) + 1 FROM donors",
+     ("donors",), True),
+    ("update_emergency_status", "UPDATE emergency_requests SET status = %s WHERE request_id = %s", ("fulfilled", "R0000001"), False),
+    ("update_appointment_status", "UPDATE appointments SET status = %s WHERE appointment_id = %s", ("completed", "A0000001"), False),
+    ("intake_refs", "SELECT intake_ref FROM donation_records WHERE intake_ref IN (%s, %s)",
+     ("0" * 32, "f" * 32), False),
+    ("login", "SELECT id, username, password, role FROM users WHERE username = %s", ("admin",), False),
+    ("login_rehash", "UPDATE users SET password = %s WHERE id = %s", ("x", 1), False),
+    ("emergency_status_lock", "SELECT status FROM emergency_requests WHERE request_id = %s FOR UPDATE", ("R0000001",), False),
+    ("appointment_lock",
+     "SELECT doctor_id, date, status, time, end_time FROM appointments WHERE appointment_id = %s FOR UPDATE",
+     ("A0000001",), False),
+    ("chat_inventory",
+     "SELECT COALESCE(SUM(units_available), 0), COUNT(*) FROM blood_inventory "
+     "WHERE status = 'available' AND expiry_date >= %s AND blood_group = %s AND location = %s",
+     (_today, "O-", "Kolkata"), False),
+    ("chat_next_camp",
+     "SELECT title, venue, city, date, start_time FROM camps WHERE date >= %s AND city = %s ORDER BY date LIMIT 1",
+     (_today, "Pune"), False),
+    ("chat_next_camp_anywhere",
+     "SELECT title, venue, city, date, start_time FROM camps WHERE date >= %s ORDER BY date LIMIT 1",
+     (_today,), False),
+    ("chat_appointments", "SELECT COUNT(*) FROM appointments WHERE date = %s AND status = 'scheduled'", (_today,), False),
+    ("chat_appointments_by_doctor",
+     "SELECT COUNT(*) FROM appointments WHERE date = %s AND status = 'scheduled' "
+     "AND (doctor_name LIKE %s OR doctor_name LIKE %s)",
+     (_today, "Dr. Rao%", "Rao%"), False),
+    ("chat_eligibility", "SELECT name, age, last_donation_date FROM donors WHERE donor_id = %s", ("D0000001",), False),
+    ("camp_seat", "UPDATE camps SET registered = registered + 1 WHERE camp_id = %s AND registered < capacity", ("C0000001",), False),
+    ("camp_lock", "SELECT 1 AS found FROM camps WHERE camp_id = %s FOR UPDATE", ("C0000001",), False),
+    ("camp_register", REGISTRATION_INSERT_SQL, ("C0000001", "registered", "D0000001"), False),
+    ("camp_free_seat", "UPDATE camps SET registered = registered - 1 WHERE camp_id = %s AND registered > 0", ("C0000001",), False),
+    ("camp_waitlist_head",
+     "SELECT registration_id, donor_id FROM camp_registrations WHERE camp_id = %s AND status = 'waitlisted' "
+     "ORDER BY registration_id LIMIT 1 FOR UPDATE",
+     ("C0000001",), False),
+    ("camp_promote", "UPDATE camp_registrations SET status = 'registered' WHERE registration_id = %s", (1,), False),
+    ("camp_coordinates", "SELECT latitude, longitude FROM camps WHERE camp_id = %s", ("C0000001",), False),
+    ("camp_registration",
+     "SELECT registration_id, status FROM camp_registrations WHERE camp_id = %s AND donor_id = %s FOR UPDATE",
+     ("C0000001", "D0000001"), False),
+    ("camp_waitlist_position",
+     "SELECT COUNT(*) AS position FROM camp_registrations WHERE camp_id = %s AND status = 'waitlisted' AND registration_id <= %s",
+     ("C0000001", 1000), False),
+    ("camp_registration_status", "UPDATE camp_registrations SET status = 'cancelled' WHERE registration_id = %s", (1,), False),
+    ("camp_registration_delete",
+     "DELETE FROM camp_registrations WHERE registration_id = %s AND status = 'cancelled'", (1,), False),
+    ("doctor_schedule",
+     "SELECT weekday, start_time, end_time, slot_minutes FROM doctor_schedules WHERE doctor_id = %s ORDER BY weekday, start_time",
+     ("T0000001",), False),
+    ("doctor_busy_slots",
+     "SELECT date, time, end_time FROM appointments WHERE doctor_id = %s AND date BETWEEN %s AND %s AND status <> 'cancelled'",
+     ("T0000001", _today, _today + timedelta(days=6)), False),
+    ("doctor_schedule_clear", "DELETE FROM doctor_schedules WHERE doctor_id = %s", ("T0000001",), False),
+    ("doctor_by_name", "SELECT doctor_id FROM doctors WHERE name = %s LIMIT 2", ("Dr. Rao",), False),
+    ("doctor_lock", "SELECT doctor_id FROM doctors WHERE doctor_id = %s FOR UPDATE", ("T0000001",), False),
+    ("doctor_slot_overlap", OVERLAP_SQL, ("T0000001", _today, "", "10:30", "10:00"), False),
+    ("refresh_stock_levels",
+     "SELECT blood_group, location, COUNT(*), SUM(units_available), "
+     "SUM(CASE WHEN expiry_date <= %s THEN units_available ELSE 0 END) FROM blood_inventory "
+     "WHERE status = 'available' AND expiry_date >= %s GROUP BY blood_group, location",
+     (_today + timedelta(days=7), _today), False),
+    # Streaming exports and the periodic nearest-stock rebuild read whole tables by
+    # design, but an export must still stream in key order without a filesort
+    ("stock_levels_previous", "SELECT blood_group, location, units_available FROM inventory_stock_levels", (), True),
+    ("stock_levels_clear", "DELETE FROM inventory_stock_levels", (), True),
+    # The chat intent parser's place names, reloaded now and then
+    ("chat_places_camps", "SELECT DISTINCT city FROM camps", (), True),
+    ("chat_places_inventory", "SELECT DISTINCT location FROM blood_inventory", (), True),
+    ("chat_places_donors", "SELECT DISTINCT city FROM donors", (), True),
+    ("nearest_stock_rebuild",
+     "SELECT i.location, COALESCE(i.latitude, c.latitude), COALESCE(i.longitude, c.longitude), "
+     "i.blood_group, i.expiry_date, i.units_available FROM blood_inventory i LEFT JOIN camps c ON c.camp_id = i.camp_id "
+     "WHERE i.expiry_date >= %s AND i.units_available > 0",
+     (_today,), True),
+    ("export_donors", "SELECT donor_id, name, blood_group, city, last_donation_date FROM donors ORDER BY donor_id", (), True),
+    ("export_donors_fields", "SELECT donor_id, blood_group, city FROM donors ORDER BY donor_id", (), True),
+    ("export_camps", "SELECT camp_id, title, city, date FROM camps ORDER BY camp_id", (), True),
+    ("export_inventory", "SELECT inventory_id, blood_group, units_available, expiry_date FROM blood_inventory ORDER BY inventory_id", (), True),
+    ("export_inventory_fields", "SELECT inventory_id, blood_group, expiry_date FROM blood_inventory ORDER BY inventory_id", (), True),
+    ("export_doctors", "SELECT doctor_id, name, specialty FROM doctors ORDER BY doctor_id", (), True),
+    ("export_emergency_requests", "SELECT request_id, blood_group, status, created_at FROM emergency_requests ORDER BY request_id", (), True),
+    ("export_appointments", "SELECT appointment_id, doctor_name, date, status FROM appointments ORDER BY appointment_id", (), True),
+]
+
+# Estimated rows above which an index scan or a filesort is reported
+LARGE_SCAN_ROWS = 10000
+
+
+def check_query_plans(conn, catalog=None, large_rows=LARGE_SCAN_ROWS) -> list:
+    """EXPLAIN each catalogued query; return (name, table, problem, plan row) for bad plans.
+
+    Problems are a "full scan" (type ALL), an "index scan" (type index, a
+    walk over a whole index) over ``large_rows`` or more estimated rows, and
+    a "filesort" of that many rows. Queries marked full-scan-allowed may
+    scan, but never filesort. Run this against a seeded database: on
+    near-empty tables MySQL may prefer a scan even when a usable index exists.
+    """
+    problems = []
+    cur = conn.cursor(dictionary=True)
+    try:
+        for name, sql, params, full_scan_ok in catalog or QUERY_CATALOG:
+            cur.execute("EXPLAIN " + sql, params)
+            for row in cur.fetchall():
+                large = (row.get("rows") or 0) >= large_rows
+                if row.get("type") == "ALL" and not full_scan_ok:
+                    problems.append((name, row.get("table"), "full scan", row))
+                elif row.get("type") == "index" and large and not full_scan_ok:
+                    problems.append((name, row.get("table"), "index scan", row))
+                if "Using filesort" in (row.get("Extra") or "") and large:
+                    problems.append((name, row.get("table"), "filesort", row))
+    finally:
+        cur.close()
+    return problems
+
+
+def rebuild_dashboard(conn):
+    """Recompute dashboard_counters in one transaction; run with writes paused"""
+    cur = conn.cursor()
+    try:
+        cur.execute("DELETE FROM dashboard_counters")
+        for statement in DASHBOARD_BACKFILL:
+            cur.execute(statement)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cur.close()
+
+
+def main(argv):
+    command = argv[1] if len(argv) > 1 else "status"
+    conn = connect()
+    try:
+        if command == "migrate":
+            applied = migrate(conn)
+            print(f"Applied migrations: {applied}" if applied else "Schema is up to date")
+        elif command == "status":
+            cur = conn.cursor()
+            try:
+                done = applied_versions(cur)
+            finally:
+                cur.close()
+            for version, description, _ in MIGRATIONS:
+                print(f"  {version:3} {'applied' if version in done else 'PENDING':8} {description}")
+        elif command == "check":
+            problems = check_query_plans(conn)
+            for name, table, problem, row in problems:
+                print(f"  {problem.upper():10} {name:35} table={table} rows={row.get('rows')} key={row.get('key')}")
+            if problems:
+                print(f"{len({p[0] for p in problems})} of {len(QUERY_CATALOG)} queries scan or sort large tables")
+                return 1
+            print(f"All {len(QUERY_CATALOG)} catalogued queries use an index")
+        elif command == "rebuild-dashboard":
+            rebuild_dashboard(conn)
+            print("Dashboard counters rebuilt")
+        else:
+            print(__doc__)
+            return 2
+    finally:
+        conn.close()
+    return 0
+
+
+if __name__ == "__main__":
+    from dotenv import load_dotenv
+
+    load_dotenv()
+    logging.basicConfig(level=logging.INFO)
+    sys.exit(main(sys.argv))
@@ -0,0 +1,315 @@
+"""Production entry point: pre-forked uvicorn workers on one shared socket.
+
+    python serve.py                       # one worker per available core
+    python serve.py --workers 8 --port 8000 --db-connections 120
+
+The supervisor binds the listening socket, creates the shared cache
+segment (see shared_cache.py) and forks the workers. It never imports the
+app itself, so every worker loads the code that is on disk when it starts.
+
+Signals to the supervisor:
+    SIGHUP           rolling reload: start a new worker, wait until it is
+                     serving, then gracefully stop one old worker, and so on
+    SIGTERM, SIGINT  graceful shutdown: workers finish in-flight requests
+    SIGTTIN/SIGTTOU  add / remove one worker
+
+The MySQL connection budget (--db-connections, DB_MAX_CONNECTIONS) is split
+evenly: each worker's pool gets budget / (workers + 1) connections, the
+spare share covering the extra worker that runs during a rolling reload.
+SIGTTIN reloads the existing workers onto the smaller share before adding one.
+
+Workers share more than the socket. The response cache and the live event
+log (/api/events) are segments under /dev/shm, so every worker serves the
+same cached pages, event ids and event history. /metrics sums the figures
+of all workers from the state files they write every few seconds.
+"""
+
+import argparse
+import logging
+import os
+import secrets
+import select
+import shutil
+import signal
+import socket
+import sys
+import tempfile
+import time
+
+from metrics import SharedMetrics
+from shared_cache import SharedCache, SharedEventLog
+
+logger = logging.getLogger("donorconnect.serve")
+
+SUPERVISOR_SIGNALS = (signal.SIGHUP, signal.SIGTERM, signal.SIGINT, signal.SIGTTIN, signal.SIGTTOU, signal.SIGCHLD)
+
+
+def available_cores() -> int:
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+def bind_socket(host, port, backlog) -> socket.socket:
+    sock = socket.socket(socket.AF_INET6 if ":" in host else socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(backlog)
+    sock.set_inheritable(True)
+    return sock
+
+
+def run_worker(sock, args, ready_fd):
+    """Body of a forked worker; imports the app and serves until told to stop"""
+    import uvicorn
+
+    class Server(uvicorn.Server):
+        async def startup(self, sockets=None):
+            try:
+                await super().startup(sockets=sockets)
+                # Tell the supervisor this worker is accepting connections; a failed
+                # lifespan startup sets should_exit and only closes the pipe
+                if not self.should_exit:
+                    os.write(ready_fd, b"1")
+            finally:
+                os.close(ready_fd)
+
+    config = uvicorn.Config(
+        "api:app",
+        lifespan="on",
+        log_level=args.log_level,
+        access_log=args.access_log,
+        proxy_headers=True,
+        timeout_keep_alive=args.keep_alive,
+        timeout_graceful_shutdown=args.graceful_timeout,
+    )
+    Server(config).run(sockets=[sock])
+
+
+def pool_size(db_connections, workers) -> int:
+    """Per-worker pool size; one spare share for the overlap during a rolling reload"""
+    return max(2, db_connections // (workers + 1))
+
+
+class Supervisor:
+    def __init__(self, args, sock, metrics_dir):
+        self.args = args
+        self.sock = sock
+        self.metrics = SharedMetrics(metrics_dir)
+        self.target = args.workers
+        self.workers = {}  # pid -> start time
+        self._pending = []
+        self._stopping = False
+        self._wakeup_r, self._wakeup_w = os.pipe()
+        os.set_blocking(self._wakeup_r, False)
+        os.set_blocking(self._wakeup_w, False)
+
+    def _on_signal(self, signum, frame):
+        self._pending.append(signum)
+        try:
+            os.write(self._wakeup_w, b"\0")
+        except BlockingIOError:
+            pass
+
+    def spawn(self):
+        """Fork one worker; returns (pid, fd that becomes readable once it is serving)"""
+        ready_r, ready_w = os.pipe()
+        pid = os.fork()
+        if pid == 0:
+            os.close(ready_r)
+            os.close(self._wakeup_r)
+            os.close(self._wakeup_w)
+            for signum in SUPERVISOR_SIGNALS:
+                signal.signal(signum, signal.SIG_DFL)
+            code = 0
+            try:
+                run_worker(self.sock, self.args, ready_w)
+            except BaseException:
+                logger.exception("Worker %s crashed", os.getpid())
+                code = 1
+            finally:
+                os._exit(code)
+        os.close(ready_w)
+        self.workers[pid] = time.monotonic()
+        logger.info("Started worker %s", pid)
+        return pid, ready_r
+
+    def wait_ready(self, pid, ready_fd, timeout) -> bool:
+        try:
+            readable, _, _ = select.select([ready_fd], [], [], timeout)
+            return bool(readable) and os.read(ready_fd, 1) == b"1"
+        finally:
+            os.close(ready_fd)
+
+    def reap(self):
+        """Collect exited workers; returns how many exited"""
+        exited = 0
+        while self.workers:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                break
+            if pid == 0:
+                break
+            started = self.workers.pop(pid, None)
+            if started is not None:
+                exited += 1
+                self.metrics.retire(pid)
+                if not self._stopping:
+                    logger.warning("Worker %s exited with status %s after %.0fs", pid,
+                                   os.waitstatus_to_exitcode(status), time.monotonic() - started)
+        return exited
+
+    def stop_worker(self, pid, timeout):
+        """SIGTERM one worker and wait for it to drain, killing it after ``timeout``"""
+        try:
+            os.kill(pid, signal.SIGTERM)
+        except ProcessLookupError:
+            self.workers.pop(pid, None)
+            return
+        deadline = time.monotonic() + timeout
+        while pid in self.workers and time.monotonic() < deadline:
+            time.sleep(0.05)
+            self.reap()
+        if pid in self.workers:
+            logger.warning("Worker %s did not stop in %.0fs; killing it", pid, timeout)
+            os.kill(pid, signal.SIGKILL)
+            os.waitpid(pid, 0)
+            self.workers.pop(pid, None)
+            self.metrics.retire(pid)
+
+    def resize(self, target):
+        """Change the worker count, keeping the sum of all pools within the DB budget"""
+        grow = target > self.target
+        self.target = target
+        size = pool_size(self.args.db_connections, target)
+        os.environ["DB_POOL_SIZE"] = str(size)
+        os.environ["DB_POOL_WARM"] = str(min(int(os.environ["DB_POOL_WARM"]), size))
+        logger.info("Resizing to %d workers, %d DB connections each", target, size)
+        if grow:
+            # Running workers hold the larger share; replace them before adding one
+            self.reload()
+
+    def reload(self):
+        """Replace workers one at a time so capacity never drops below target - 1"""
+        logger.info("Reloading %d workers", len(self.workers))
+        for old in list(self.workers):
+            pid, ready = self.spawn()
+            if not self.wait_ready(pid, ready, self.args.startup_timeout):
+                logger.error("New worker %s failed to start; keeping the remaining old workers", pid)
+                self.stop_worker(pid, 1)
+                return
+            self.stop_worker(old, self.args.graceful_timeout + 5)
+
+    def run(self):
+        for signum in SUPERVISOR_SIGNALS:
+            signal.signal(signum, self._on_signal)
+        failures = 0
+        while True:
+            while self._pending:
+                signum = self._pending.pop(0)
+                if signum in (signal.SIGTERM, signal.SIGINT):
+                    return self.shutdown()
+                if signum == signal.SIGHUP:
+                    self.reload()
+                elif signum == signal.SIGTTIN:
+                    self.resize(self.target + 1)
+                elif signum == signal.SIGTTOU and self.target > 1:
+                    self.resize(self.target - 1)
+            self.reap()
+            while len(self.workers) < self.target:
+                pid, ready = self.spawn()
+                if self.wait_ready(pid, ready, self.args.startup_timeout):
+                    failures = 0
+                    continue
+                # Back off instead of fork-looping when workers cannot start (bad config, DB down)
+                failures += 1
+                self.stop_worker(pid, 1)
+                time.sleep(min(30, 2 ** failures))
+                break
+            while len(self.workers) > self.target:
+                self.stop_worker(max(self.workers, key=self.workers.get), self.args.graceful_timeout + 5)
+            # Sleep until a signal arrives (SIGCHLD included) or a second passes
+            select.select([self._wakeup_r], [], [], 1.0)
+            try:
+                while os.read(self._wakeup_r, 64):
+                    pass
+            except BlockingIOError:
+                pass
+
+    def shutdown(self):
+        self._stopping = True
+        logger.info("Stopping %d workers", len(self.workers))
+        for pid in list(self.workers):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+        deadline = time.monotonic() + self.args.graceful_timeout + 5
+        while self.workers and time.monotonic() < deadline:
+            time.sleep(0.05)
+            self.reap()
+        for pid in list(self.workers):
+            os.kill(pid, signal.SIGKILL)
+            os.waitpid(pid, 0)
+            self.workers.pop(pid, None)
+        return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default=os.getenv("HOST", "0.0.0.0"))
+    parser.add_argument("--port", type=int, default=int(os.getenv("PORT", 8000)))
+    parser.add_argument("--workers", type=int, default=int(os.getenv("WEB_WORKERS", 0)) or available_cores())
+    parser.add_argument("--db-connections", type=int, default=int(os.getenv("DB_MAX_CONNECTIONS", 100)),
+                        help="MySQL connections shared by all workers")
+    parser.add_argument("--backlog", type=int, default=2048)
+    parser.add_argument("--keep-alive", type=int, default=5)
+    parser.add_argument("--graceful-timeout", type=int, default=30)
+    parser.add_argument("--startup-timeout", type=float, default=60)
+    parser.add_argument("--log-level", default="info")
+    parser.add_argument("--access-log", action="store_true")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=args.log_level.upper(), format="%(asctime)s %(process)d %(name)s %(message)s")
+
+    # Workers read these when they import api
+    size = pool_size(args.db_connections, args.workers)
+    os.environ["DB_POOL_SIZE"] = str(size)
+    os.environ["DB_POOL_WARM"] = str(min(int(os.getenv("DB_POOL_WARM", 1)), size))
+    if not os.getenv("AUTH_SECRET"):
+        # Tokens must verify in every worker, so they cannot each pick their own key
+        logger.warning("AUTH_SECRET is not set; generated one for this run (tokens will not survive a restart)")
+        os.environ["AUTH_SECRET"] = secrets.token_hex(32)
+    segment_dir = "/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir()
+    segment = os.path.join(segment_dir, f"donorconnect-{os.getpid()}.cache")
+    SharedCache.create(
+        segment,
+        slots=int(os.getenv("SHARED_CACHE_SLOTS", 1024)),
+        slot_size=int(os.getenv("SHARED_CACHE_SLOT_KB", 256)) * 1024,
+    )
+    os.environ["SHARED_CACHE_PATH"] = segment
+    events = os.path.join(segment_dir, f"donorconnect-{os.getpid()}.events")
+    SharedEventLog.create(events, slots=int(os.getenv("SHARED_EVENTS_SLOTS", 4096)))
+    os.environ["SHARED_EVENTS_PATH"] = events
+    metrics_dir = os.path.join(segment_dir, f"donorconnect-{os.getpid()}.metrics")
+    os.makedirs(metrics_dir, exist_ok=True)
+    os.environ["SHARED_METRICS_DIR"] = metrics_dir
+
+    sock = bind_socket(args.host, args.port, args.backlog)
+    logger.info("Listening on %s:%s with %d workers, %d DB connections each",
+                args.host, args.port, args.workers, size)
+    try:
+        return Supervisor(args, sock, metrics_dir).run()
+    finally:
+        sock.close()
+        os.unlink(segment)
+        os.unlink(events)
+        shutil.rmtree(metrics_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    from dotenv import load_dotenv
+
+    load_dotenv()
+    sys.exit(main())
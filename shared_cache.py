@@ -0,0 +1,255 @@
+import fcntl
+import hashlib
+import mmap
+import os
+import pickle
+import struct
+import threading
+import time
+from contextlib import contextmanager
+
+from cache import TTLCache
+
+MAGIC = b"DCSCACHE"
+# magic, namespace slots, entry slots, bytes per entry slot
+HEADER = struct.Struct("<8sIII")
+HEADER_SIZE = 64
+# namespace name, generation
+NAMESPACE = struct.Struct("<48sQ")
+# key digest, expiry (epoch seconds), payload length
+ENTRY = struct.Struct("<16sdI")
+
+
+class SharedCache:
+    """TTLCache-compatible cache in a shared memory file, one segment for all workers.
+
+    The file holds a table of namespace generations followed by fixed-size
+    entry slots; a key's digest picks its slot (direct-mapped, so a
+    colliding key simply replaces the old entry). Because generations live
+    in the segment, ``invalidate`` in one worker makes every worker's keys
+    for that namespace unreachable at once. Values too large for a slot are
+    kept in a per-process TTLCache instead, still keyed by the shared
+    generations.
+
+    Cross-process access is guarded by fcntl record locks on the byte
+    range being read or written; a process-local lock serialises threads,
+    since record locks are held per process rather than per thread.
+    """
+
+    def __init__(self, path, ttl=300, local_maxsize=256):
+        self.path = path
+        self.ttl = ttl
+        self._fd = os.open(path, os.O_RDWR)
+        with self._flock(fcntl.LOCK_SH, 0, HEADER_SIZE):
+            magic, self.namespace_slots, self.slots, self.slot_size = HEADER.unpack_from(os.pread(self._fd, HEADER.size, 0))
+        if magic != MAGIC:
+            os.close(self._fd)
+            raise ValueError(f"{path} is not a shared cache segment")
+        self._namespaces_at = HEADER_SIZE
+        self._entries_at = HEADER_SIZE + self.namespace_slots * NAMESPACE.size
+        self._mm = mmap.mmap(self._fd, self._entries_at + self.slots * self.slot_size)
+        self._lock = threading.Lock()
+        self._namespace_index = {}
+        self._local = TTLCache(maxsize=local_maxsize, ttl=ttl)
+        self.hits = 0
+        self.misses = 0
+
+    @classmethod
+    def create(cls, path, slots=1024, slot_size=256 * 1024, namespace_slots=256):
+        """Create (or reset) the segment file; call once in the supervising process"""
+        fd = os.open(path, os.O_RDWR | os.O_CREAT | os.O_TRUNC, 0o600)
+        try:
+            # Sparse on tmpfs: pages are only allocated once a slot is written
+            os.ftruncate(fd, HEADER_SIZE + namespace_slots * NAMESPACE.size + slots * slot_size)
+            os.pwrite(fd, HEADER.pack(MAGIC, namespace_slots, slots, slot_size), 0)
+        finally:
+            os.close(fd)
+        return path
+
+    def close(self):
+        self._mm.close()
+        os.close(self._fd)
+
+    @contextmanager
+    def _flock(self, kind, start, length):
+        fcntl.lockf(self._fd, kind, length, start)
+        try:
+            yield
+        finally:
+            fcntl.lockf(self._fd, fcntl.LOCK_UN, length, start)
+
+    def _namespace_offset(self, namespace) -> int:
+        """Offset of the namespace's generation record, registering the name on first use"""
+        index = self._namespace_index.get(namespace)
+        if index is None:
+            name = namespace.encode()[:NAMESPACE.size - 8].ljust(NAMESPACE.size - 8, b"\0")
+            table = self.namespace_slots * NAMESPACE.size
+            with self._flock(fcntl.LOCK_EX, self._namespaces_at, table):
+                for i in range(self.namespace_slots):
+                    stored, _ = NAMESPACE.unpack_from(self._mm, self._namespaces_at + i * NAMESPACE.size)
+                    if stored == name:
+                        break
+                    if not stored.strip(b"\0"):
+                        NAMESPACE.pack_into(self._mm, self._namespaces_at + i * NAMESPACE.size, name, 0)
+                        break
+                else:
+                    raise RuntimeError(f"Shared cache namespace table is full ({self.namespace_slots})")
+            index = self._namespace_index[namespace] = i
+        return self._namespaces_at + index * NAMESPACE.size
+
+    def generation(self, namespace) -> int:
+        index = self._namespace_index.get(namespace)
+        if index is None:
+            with self._lock:
+                offset = self._namespace_offset(namespace)
+        else:
+            offset = self._namespaces_at + index * NAMESPACE.size
+        # Generations are 8-byte aligned words only ever incremented under the
+        # record lock, so reading one needs no lock (and no syscall)
+        return NAMESPACE.unpack_from(self._mm, offset)[1]
+
+    def key(self, namespaces, *parts) -> tuple:
+        """Build a key tied to the current shared generation of each namespace"""
+        return tuple((ns, self.generation(ns)) for ns in namespaces) + parts
+
+    def invalidate(self, *namespaces):
+        with self._lock:
+            for ns in namespaces:
+                offset = self._namespace_offset(ns)
+                with self._flock(fcntl.LOCK_EX, offset, NAMESPACE.size):
+                    name, generation = NAMESPACE.unpack_from(self._mm, offset)
+                    NAMESPACE.pack_into(self._mm, offset, name, generation + 1)
+
+    def _slot(self, key):
+        digest = hashlib.blake2b(repr(key).encode(), digest_size=16).digest()
+        return digest, self._entries_at + int.from_bytes(digest[:8], "little") % self.slots * self.slot_size
+
+    def get(self, key, default=None):
+        digest, offset = self._slot(key)
+        payload = None
+        with self._lock, self._flock(fcntl.LOCK_SH, offset, self.slot_size):
+            stored, expires, length = ENTRY.unpack_from(self._mm, offset)
+            if stored == digest and length and expires >= time.time():
+                payload = self._mm[offset + ENTRY.size:offset + ENTRY.size + length]
+        if payload is None:
+            value = self._local.get(key, default)
+            if value is default:
+                self.misses += 1
+            else:
+                self.hits += 1
+            return value
+        self.hits += 1
+        return pickle.loads(payload)
+
+    def set(self, key, value, ttl=None):
+        payload = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        if len(payload) > self.slot_size - ENTRY.size:
+            self._local.set(key, value, ttl)
+            return
+        digest, offset = self._slot(key)
+        expires = time.time() + (self.ttl if ttl is None else ttl)
+        with self._lock, self._flock(fcntl.LOCK_EX, offset, self.slot_size):
+            self._mm[offset + ENTRY.size:offset + ENTRY.size + len(payload)] = payload
+            ENTRY.pack_into(self._mm, offset, digest, expires, len(payload))
+
+    def clear(self):
+        with self._lock, self._flock(fcntl.LOCK_EX, self._entries_at, self.slots * self.slot_size):
+            for slot in range(self.slots):
+                ENTRY.pack_into(self._mm, self._entries_at + slot * self.slot_size, b"", 0.0, 0)
+        self._local.clear()
+
+    def __len__(self):
+        now = time.time()
+        with self._lock:
+            live = sum(1 for slot in range(self.slots)
+                       if ENTRY.unpack_from(self._mm, self._entries_at + slot * self.slot_size)[1] >= now)
+        return live + len(self._local)
+
+
+EVENTS_MAGIC = b"DCEVENTS"
+# magic, entry slots, bytes per slot, next event id (8-byte aligned at offset 16)
+EVENTS_HEADER = struct.Struct("<8sIIQ")
+# event id, topic length, frame length
+EVENT = struct.Struct("<QHI")
+
+
+class SharedEventLog:
+    """Ring buffer of encoded events shared by every worker process.
+
+    Event ids come from one counter in the segment, so they are global: a
+    browser reconnecting to another worker resumes with the same
+    Last-Event-ID. Event ``n`` lives in slot ``n % slots`` until it is
+    overwritten ``slots`` events later. Appends take a record lock on the
+    header; readers only lock the slot they copy.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._fd = os.open(path, os.O_RDWR)
+        magic, self.slots, self.slot_size, _ = EVENTS_HEADER.unpack_from(os.pread(self._fd, EVENTS_HEADER.size, 0))
+        if magic != EVENTS_MAGIC:
+            os.close(self._fd)
+            raise ValueError(f"{path} is not a shared event log")
+        self._mm = mmap.mmap(self._fd, HEADER_SIZE + self.slots * self.slot_size)
+        self._lock = threading.Lock()
+
+    @classmethod
+    def create(cls, path, slots=4096, slot_size=4096):
+        fd = os.open(path, os.O_RDWR | os.O_CREAT | os.O_TRUNC, 0o600)
+        try:
+            os.ftruncate(fd, HEADER_SIZE + slots * slot_size)
+            os.pwrite(fd, EVENTS_HEADER.pack(EVENTS_MAGIC, slots, slot_size, 1), 0)
+        finally:
+            os.close(fd)
+        return path
+
+    def close(self):
+        self._mm.close()
+        os.close(self._fd)
+
+    @contextmanager
+    def _flock(self, kind, start, length):
+        fcntl.lockf(self._fd, kind, length, start)
+        try:
+            yield
+        finally:
+            fcntl.lockf(self._fd, fcntl.LOCK_UN, length, start)
+
+    def latest(self) -> int:
+        """Id of the newest event, 0 when there is none (lock-free aligned read)"""
+        return EVENTS_HEADER.unpack_from(self._mm, 0)[3] - 1
+
+    def append(self, topic: str, build) -> int:
+        """Store the frame ``build(event_id)`` returns under the next event id"""
+        topic_bytes = topic.encode()
+        with self._lock, self._flock(fcntl.LOCK_EX, 0, HEADER_SIZE):
+            magic, slots, slot_size, event_id = EVENTS_HEADER.unpack_from(self._mm, 0)
+            frame = build(event_id)
+            if EVENT.size + len(topic_bytes) + len(frame) > slot_size:
+                raise ValueError(f"Event of {len(frame)} bytes does not fit a {slot_size} byte slot")
+            offset = HEADER_SIZE + event_id % slots * slot_size
+            with self._flock(fcntl.LOCK_EX, offset, slot_size):
+                EVENT.pack_into(self._mm, offset, event_id, len(topic_bytes), len(frame))
+                start = offset + EVENT.size
+                self._mm[start:start + len(topic_bytes)] = topic_bytes
+                self._mm[start + len(topic_bytes):start + len(topic_bytes) + len(frame)] = frame
+            # Publish the id only once the slot is complete
+            EVENTS_HEADER.pack_into(self._mm, 0, magic, slots, slot_size, event_id + 1)
+        return event_id
+
+    def read_since(self, after: int) -> list:
+        """(event id, topic, frame) for events newer than ``after`` still in the ring"""
+        latest = self.latest()
+        events = []
+        with self._lock:
+            for event_id in range(max(after + 1, latest - self.slots + 1, 1), latest + 1):
+                offset = HEADER_SIZE + event_id % self.slots * self.slot_size
+                with self._flock(fcntl.LOCK_SH, offset, self.slot_size):
+                    stored, topic_len, frame_len = EVENT.unpack_from(self._mm, offset)
+                    if stored != event_id:
+                        continue  # overwritten by a newer event
+                    start = offset + EVENT.size
+                    topic = self._mm[start:start + topic_len].decode()
+                    frame = self._mm[start + topic_len:start + topic_len + frame_len]
+                events.append((event_id, topic, frame))
+        return events
@@ -88,12 +88,13 @@ export default function App() {
           api.fetchDoctors(),
         ]);
         
-        setDonors(donorsData);
-        setCamps(campsData);
-        setInventory(inventoryData);
-        setRequests(requestsData);
-        setAppointments(appointmentsData);
-        setDoctors(doctorsData);
+        // List endpoints are paged; this older screen shows the first page only
+        setDonors(donorsData.items);
+        setCamps(campsData.items);
+        setInventory(inventoryData.items);
+        setRequests(requestsData.items);
+        setAppointments(appointmentsData.items);
+        setDoctors(doctorsData.items);
       } catch (error) {
         console.error("Error fetching data:", error);
         toast.error("Failed to load data from server");
@@ -16,6 +16,27 @@ import { Droplets, LayoutDashboard, Users, Calendar, Package, AlertCircle, Steth
 import { Button } from "@/app/components/ui/button";
 import * as api from "@/services/api";
 
+// Insert a row, or merge into the existing one with the same ID
+function upsertById<T>(rows: T[], key: keyof T, row: Partial<T>): T[] {
+  const index = rows.findIndex((r) => r[key] === row[key]);
+  if (index === -1) return [...rows, row as T];
+  const next = rows.slice();
+  next[index] = { ...rows[index], ...row };
+  return next;
+}
+
+type ListName = "donors" | "camps" | "inventory" | "requests" | "appointments" | "doctors";
+
+// Next page of a list; shown only while the server reports more rows
+function LoadMore({ cursor, loading, onClick }: { cursor: string | null; loading: boolean; onClick: () => void }) {
+  if (!cursor) return null;
+  return (
+    <Button variant="outline" className="w-full mt-4" disabled={loading} onClick={onClick}>
+      {loading ? "Loading..." : "Load more"}
+    </Button>
+  );
+}
+
 export default function App() {
   const [isAuthenticated, setIsAuthenticated] = useState(false);
   const [currentUser, setCurrentUser] = useState<{ username: string; role: string } | null>(null);
@@ -25,8 +46,14 @@ export default function App() {
   const [requests, setRequests] = useState<EmergencyRequest[]>([]);
   const [appointments, setAppointments] = useState<Appointment[]>([]);
   const [doctors, setDoctors] = useState<Doctor[]>([]);
+  const [summary, setSummary] = useState<api.DashboardSummary | null>(null);
   const [activeTab, setActiveTab] = useState("dashboard");
   const [loading, setLoading] = useState(true);
+  // X-Next-Cursor of each list's last loaded page (null once everything is shown)
+  const [cursors, setCursors] = useState<Record<ListName, string | null>>({
+    donors: null, camps: null, inventory: null, requests: null, appointments: null, doctors: null,
+  });
+  const [loadingMore, setLoadingMore] = useState<ListName | null>(null);
 
   // Check if user is already logged in
   useEffect(() => {
@@ -72,14 +99,14 @@ export default function App() {
     return <Login onLoginSuccess={handleLoginSuccess} />;
   }*/
 
-  // Fetch all data from API on component mount (only after authenticated)
+  // Fetch the first page of each list on mount (only after authenticated)
   useEffect(() => {
     if (!isAuthenticated) return;
     
     const fetchAllData = async () => {
       try {
         setLoading(true);
-        const [donorsData, campsData, inventoryData, requestsData, appointmentsData, doctorsData] = await Promise.all([
+        const [donorsPage, campsPage, inventoryPage, requestsPage, appointmentsPage, doctorsPage] = await Promise.all([
           api.fetchDonors(),
           api.fetchCamps(),
           api.fetchInventory(),
@@ -88,12 +115,20 @@ export default function App() {
           api.fetchDoctors(),
         ]);
         
-        setDonors(donorsData);
-        setCamps(campsData);
-        setInventory(inventoryData);
-        setRequests(requestsData);
-        setAppointments(appointmentsData);
-        setDoctors(doctorsData);
+        setDonors(donorsPage.items);
+        setCamps(campsPage.items);
+        setInventory(inventoryPage.items);
+        setRequests(requestsPage.items);
+        setAppointments(appointmentsPage.items);
+        setDoctors(doctorsPage.items);
+        setCursors({
+          donors: donorsPage.nextCursor,
+          camps: campsPage.nextCursor,
+          inventory: inventoryPage.nextCursor,
+          requests: requestsPage.nextCursor,
+          appointments: appointmentsPage.nextCursor,
+          doctors: doctorsPage.nextCursor,
+        });
       } catch (error) {
         console.error("Error fetching data:", error);
         toast.error("Failed to load data from server");
@@ -105,6 +140,68 @@ export default function App() {
     fetchAllData();
   }, [isAuthenticated]);
 
+  // Append the next page of one list
+  type Page = { items: any[]; nextCursor: string | null };
+  const loaders: Record<ListName, [(params: api.QueryParams) => Promise<Page>, (update: (rows: any[]) => any[]) => void]> = {
+    donors: [api.fetchDonors, setDonors],
+    camps: [api.fetchCamps, setCamps],
+    inventory: [api.fetchInventory, setInventory],
+    requests: [api.fetchEmergencyRequests, setRequests],
+    appointments: [api.fetchAppointments, setAppointments],
+    doctors: [api.fetchDoctors, setDoctors],
+  };
+
+  const loadMore = async (list: ListName) => {
+    const after = cursors[list];
+    if (!after) return;
+    const [fetchList, setRows] = loaders[list];
+    setLoadingMore(list);
+    try {
+      const page = await fetchList({ after });
+      setRows((rows) => [...rows, ...page.items]);
+      setCursors((current) => ({ ...current, [list]: page.nextCursor }));
+    } catch (error) {
+      console.error(`Error loading more ${list}:`, error);
+      toast.error("Failed to load more rows");
+    } finally {
+      setLoadingMore(null);
+    }
+  };
+
+  const moreOf = (list: ListName) => (
+    <LoadMore cursor={cursors[list]} loading={loadingMore === list} onClick={() => loadMore(list)} />
+  );
+
+  // Dashboard figures come from server-side counters; refresh whenever the tab is shown
+  useEffect(() => {
+    if (!isAuthenticated || activeTab !== "dashboard") return;
+    api.fetchDashboard()
+      .then(setSummary)
+      .catch((error) => console.error("Error fetching dashboard:", error));
+  }, [isAuthenticated, activeTab]);
+
+  // Apply pushed changes instead of re-fetching whole lists
+  useEffect(() => {
+    if (!isAuthenticated) return;
+    return api.subscribeToEvents(["emergency_requests", "appointments", "inventory"], ({ type, data }) => {
+      if (type === "emergency_request.created") {
+        setRequests((rows) => upsertById(rows, "request_id", data));
+        if (data.status === "pending") toast.warning(`New ${data.blood_group} request from ${data.hospital_name}`);
+      } else if (type === "emergency_request.status") {
+        setRequests((rows) => rows.map((r) => (r.request_id === data.request_id ? { ...r, status: data.status } : r)));
+      } else if (type === "appointment.created") {
+        setAppointments((rows) => upsertById(rows, "appointment_id", data));
+      } else if (type === "appointment.status") {
+        setAppointments((rows) =>
+          rows.map((a) => (a.appointment_id === data.appointment_id ? { ...a, status: data.status } : a))
+        );
+      } else if (type === "inventory.low_stock") {
+        const where = data.location ? ` at ${data.location}` : "";
+        toast.warning(`Low stock: ${data.units_available} ${data.blood_group} units${where}`);
+      }
+    });
+  }, [isAuthenticated]);
+
   // Handlers for adding new items
   const handleAddDonor = async (donor: Omit<Donor, 'donor_id'>) => {
     try {
@@ -151,7 +248,7 @@ export default function App() {
         created_at: new Date().toISOString(),
         status: "pending" as const,
       };
-      setRequests([...requests, newRequest]);
+      setRequests((rows) => upsertById(rows, "request_id", newRequest));
       toast.success("Emergency request created");
     } catch (error) {
       console.error("Error adding request:", error);
@@ -162,7 +259,7 @@ export default function App() {
   const handleUpdateRequestStatus = async (requestId: string, status: "fulfilled" | "cancelled") => {
     try {
       await api.updateEmergencyRequestStatus(requestId, status);
-      setRequests(requests.map(req => 
+      setRequests((rows) => rows.map(req =>
         req.request_id === requestId ? { ...req, status } : req
       ));
       toast.success(`Request ${status}`);
@@ -180,11 +277,11 @@ export default function App() {
         appointment_id: result.appointment_id,
         status: "scheduled" as const,
       };
-      setAppointments([...appointments, newAppointment]);
+      setAppointments((rows) => upsertById(rows, "appointment_id", newAppointment));
       toast.success("Appointment scheduled");
     } catch (error) {
       console.error("Error adding appointment:", error);
-      toast.error("Failed to schedule appointment");
+      toast.error(error instanceof Error ? error.message : "Failed to schedule appointment");
     }
   };
 
@@ -203,7 +300,7 @@ export default function App() {
   const handleUpdateAppointmentStatus = async (appointmentId: string, status: "completed" | "cancelled") => {
     try {
       await api.updateAppointmentStatus(appointmentId, status);
-      setAppointments(appointments.map(apt => 
+      setAppointments((rows) => rows.map(apt =>
         apt.appointment_id === appointmentId ? { ...apt, status } : apt
       ));
       toast.success(`Appointment ${status}`);
@@ -213,23 +310,27 @@ export default function App() {
     }
   };
 
-  // Calculate dashboard data
-  const totalUnits = inventory.reduce((sum, item) => sum + item.units_available, 0);
-  const urgentRequests = requests.filter(r => r.status === "pending").length;
+  // Dashboard data, falling back to the loaded lists until the summary arrives
+  const totalDonors = summary ? summary.donors.total : donors.length;
+  const totalCamps = summary ? summary.camps.upcoming : camps.length;
+  const totalUnits = summary
+    ? summary.inventory.units_available
+    : inventory.reduce((sum, item) => sum + item.units_available, 0);
+  const urgentRequests = summary
+    ? summary.emergency_requests.pending
+    : requests.filter(r => r.status === "pending").length;
 
-  const bloodGroupData = ["A+", "A-", "B+", "B-", "AB+", "AB-", "O+", "O-"].map(bg => ({
-    name: bg,
-    units: inventory.filter(i => i.blood_group === bg).reduce((sum, i) => sum + i.units_available, 0),
-  }));
+  const bloodGroupData = summary
+    ? summary.inventory.by_blood_group.map(g => ({ name: g.blood_group, units: g.units }))
+    : ["A+", "A-", "B+", "B-", "AB+", "AB-", "O+", "O-"].map(bg => ({
+        name: bg,
+        units: inventory.filter(i => i.blood_group === bg).reduce((sum, i) => sum + i.units_available, 0),
+      }));
 
-  const monthlyData = [
-    { month: "Aug", units: 145 },
-    { month: "Sep", units: 178 },
-    { month: "Oct", units: 162 },
-    { month: "Nov", units: 195 },
-    { month: "Dec", units: 210 },
-    { month: "Jan", units: 187 },
-  ];
+  const monthlyData = (summary?.donations_by_month ?? []).map(m => ({
+    month: new Date(`${m.month}-01T00:00:00`).toLocaleString("en", { month: "short" }),
+    units: m.donations,
+  }));
 
   return (
     <div className="min-h-screen bg-gray-50">
@@ -345,26 +446,30 @@ export default function App() {
                     onAddRequest={handleAddRequest}
                     onUpdateStatus={handleUpdateRequestStatus}
                   />
+                  {moreOf("requests")}
                 </TabsContent>
               </>
             ) : currentUser?.role === "staff" ? (
               <>
                 <TabsContent value="donors">
                   <DonorManagement donors={donors} onAddDonor={handleAddDonor} />
+                  {moreOf("donors")}
                 </TabsContent>
                 <TabsContent value="inventory">
                   <BloodInventoryComponent inventory={inventory} onAddInventory={handleAddInventory} />
+                  {moreOf("inventory")}
                 </TabsContent>
                 <TabsContent value="doctors">
                   <DoctorMaster doctors={doctors} onAddDoctor={handleAddDoctor} />
+                  {moreOf("doctors")}
                 </TabsContent>
               </>
             ) : (
               <>
                 <TabsContent value="dashboard">
                   <Dashboard
-                    totalDonors={donors.length}
-                    totalCamps={camps.length}
+                    totalDonors={totalDonors}
+                    totalCamps={totalCamps}
                     totalUnits={totalUnits}
                     urgentRequests={urgentRequests}
                     bloodGroupData={bloodGroupData}
@@ -373,12 +478,15 @@ export default function App() {
                 </TabsContent>
                 <TabsContent value="donors">
                   <DonorManagement donors={donors} onAddDonor={handleAddDonor} />
+                  {moreOf("donors")}
                 </TabsContent>
                 <TabsContent value="camps">
                   <CampManagement camps={camps} onAddCamp={handleAddCamp} />
+                  {moreOf("camps")}
                 </TabsContent>
                 <TabsContent value="inventory">
                   <BloodInventoryComponent inventory={inventory} onAddInventory={handleAddInventory} />
+                  {moreOf("inventory")}
                 </TabsContent>
                 <TabsContent value="emergency">
                   <EmergencyRequests
@@ -387,13 +495,16 @@ export default function App() {
                     onAddRequest={handleAddRequest}
                     onUpdateStatus={handleUpdateRequestStatus}
                   />
+                  {moreOf("requests")}
                 </TabsContent>
                 <TabsContent value="appointments">
                   <DoctorAppointments
                     appointments={appointments}
+                    doctors={doctors}
                     onAddAppointment={handleAddAppointment}
                     onUpdateStatus={handleUpdateAppointmentStatus}
                   />
+                  {moreOf("appointments")}
                 </TabsContent>
               </>
             )}
@@ -1,4 +1,4 @@
-import { useState } from "react";
+import { useState, useEffect } from "react";
 import { Card, CardContent, CardHeader, CardTitle } from "@/app/components/ui/card";
 import { Button } from "@/app/components/ui/button";
 import { Input } from "@/app/components/ui/input";
@@ -9,6 +9,7 @@ import { Dialog, DialogContent, DialogHeader, DialogTitle, DialogTrigger } from
 import { Badge } from "@/app/components/ui/badge";
 import { Progress } from "@/app/components/ui/progress";
 import { Droplets, Plus, AlertTriangle } from "lucide-react";
+import { fetchInventorySummary } from "@/services/api";
 
 export interface BloodInventory {
   inventory_id: string;
@@ -19,6 +20,14 @@ export interface BloodInventory {
   expiry_date: string;
 }
 
+interface GroupSummary {
+  blood_group: string;
+  units: number;
+  lots: number;
+  expired: number;
+  critical: number;
+}
+
 interface BloodInventoryProps {
   inventory: BloodInventory[];
   onAddInventory: (item: Omit<BloodInventory, 'inventory_id'>) => void;
@@ -35,6 +44,14 @@ export function BloodInventoryComponent({ inventory, onAddInventory }: BloodInve
   });
 
   const bloodGroups = ["A+", "A-", "B+", "B-", "AB+", "AB-", "O+", "O-"];
+  const [groupSummary, setGroupSummary] = useState<GroupSummary[]>([]);
+
+  // Totals are aggregated server-side; refresh them whenever the inventory list changes
+  useEffect(() => {
+    fetchInventorySummary()
+      .then((summary) => setGroupSummary(summary.by_blood_group))
+      .catch((error) => console.error("Error fetching inventory summary:", error));
+  }, [inventory]);
 
   const handleSubmit = (e: React.FormEvent) => {
     e.preventDefault();
@@ -66,18 +83,12 @@ export function BloodInventoryComponent({ inventory, onAddInventory }: BloodInve
 
   // Aggregate inventory by blood group
   const aggregatedInventory = bloodGroups.map(bg => {
-    const items = inventory.filter(item => item.blood_group === bg);
-    const totalUnits = items.reduce((sum, item) => sum + item.units_available, 0);
-    const criticalUnits = items.filter(item => {
-      const status = getExpiryStatus(item.expiry_date);
-      return status.status === "critical" || status.status === "expired";
-    }).reduce((sum, item) => sum + item.units_available, 0);
-    
+    const group = groupSummary.find(item => item.blood_group === bg);
     return {
       blood_group: bg,
-      totalUnits,
-      criticalUnits,
-      locations: items.length,
+      totalUnits: group?.units ?? 0,
+      criticalUnits: (group?.critical ?? 0) + (group?.expired ?? 0),
+      locations: group?.lots ?? 0,
     };
   });
 
@@ -1,4 +1,4 @@
-import { useState } from "react";
+import { useEffect, useState } from "react";
 import { Card, CardContent, CardHeader, CardTitle } from "@/app/components/ui/card";
 import { Button } from "@/app/components/ui/button";
 import { Input } from "@/app/components/ui/input";
@@ -8,10 +8,13 @@ import { Dialog, DialogContent, DialogHeader, DialogTitle, DialogTrigger } from
 import { Badge } from "@/app/components/ui/badge";
 import { Table, TableBody, TableCell, TableHead, TableHeader, TableRow } from "@/app/components/ui/table";
 import { Calendar, Clock, User, Plus, Stethoscope } from "lucide-react";
+import { Doctor } from "@/app/components/doctor-master";
+import * as api from "@/services/api";
 
 export interface Appointment {
   appointment_id: string;
   patient_name: string;
+  doctor_id?: string | null;
   doctor_name: string;
   specialty: string;
   date: string;
@@ -19,18 +22,21 @@ export interface Appointment {
   status: "scheduled" | "completed" | "cancelled";
   reason: string;
   phone: string;
+  end_time?: string | null;
 }
 
 interface DoctorAppointmentsProps {
   appointments: Appointment[];
+  doctors: Doctor[];
   onAddAppointment: (appointment: Omit<Appointment, 'appointment_id' | 'status'>) => void;
   onUpdateStatus: (appointmentId: string, status: "completed" | "cancelled") => void;
 }
 
-export function DoctorAppointments({ appointments, onAddAppointment, onUpdateStatus }: DoctorAppointmentsProps) {
+export function DoctorAppointments({ appointments, doctors, onAddAppointment, onUpdateStatus }: DoctorAppointmentsProps) {
   const [isDialogOpen, setIsDialogOpen] = useState(false);
   const [formData, setFormData] = useState({
     patient_name: "",
+    doctor_id: "",
     doctor_name: "",
     specialty: "",
     date: "",
@@ -48,11 +54,42 @@ export function DoctorAppointments({ appointments, onAddAppointment, onUpdateSta
     "Blood Bank Physician",
   ];
 
+  // Free slots for the chosen doctor and day; null means any time can be entered
+  const [slots, setSlots] = useState<api.AvailabilityDay["slots"] | null>(null);
+
+  useEffect(() => {
+    setSlots(null);
+    if (!formData.doctor_id || !formData.date) return;
+    let cancelled = false;
+    api.fetchDoctorAvailability(formData.doctor_id, formData.date, formData.date)
+      .then((availability) => {
+        if (!cancelled && availability.has_schedule) setSlots(availability.days[0]?.slots ?? []);
+      })
+      .catch(() => {});
+    return () => {
+      cancelled = true;
+    };
+  }, [formData.doctor_id, formData.date]);
+
+  const handleDoctorChange = (doctorId: string) => {
+    const doctor = doctors.find((d) => d.doctor_id === doctorId);
+    setFormData({
+      ...formData,
+      doctor_id: doctorId,
+      doctor_name: doctor?.name ?? "",
+      specialty: doctor?.specialty ?? formData.specialty,
+      time: "",
+    });
+  };
+
   const handleSubmit = (e: React.FormEvent) => {
     e.preventDefault();
+    // Selects are not covered by the browser's required-field check
+    if (!formData.doctor_name || !formData.time) return;
     onAddAppointment(formData);
     setFormData({
       patient_name: "",
+      doctor_id: "",
       doctor_name: "",
       specialty: "",
       date: "",
@@ -111,12 +148,27 @@ export function DoctorAppointments({ appointments, onAddAppointment, onUpdateSta
                 </div>
                 <div className="space-y-2">
                   <Label htmlFor="doctor_name">Doctor Name</Label>
-                  <Input
-                    id="doctor_name"
-                    value={formData.doctor_name}
-                    onChange={(e) => setFormData({ ...formData, doctor_name: e.target.value })}
-                    required
-                  />
+                  {doctors.length > 0 ? (
+                    <Select value={formData.doctor_id} onValueChange={handleDoctorChange}>
+                      <SelectTrigger id="doctor_name">
+                        <SelectValue placeholder="Select doctor" />
+                      </SelectTrigger>
+                      <SelectContent>
+                        {doctors.map((doctor) => (
+                          <SelectItem key={doctor.doctor_id} value={doctor.doctor_id}>
+                            {doctor.name} ({doctor.specialty})
+                          </SelectItem>
+                        ))}
+                      </SelectContent>
+                    </Select>
+                  ) : (
+                    <Input
+                      id="doctor_name"
+                      value={formData.doctor_name}
+                      onChange={(e) => setFormData({ ...formData, doctor_name: e.target.value })}
+                      required
+                    />
+                  )}
                 </div>
                 <div className="space-y-2">
                   <Label htmlFor="specialty">Specialty</Label>
@@ -143,13 +195,32 @@ export function DoctorAppointments({ appointments, onAddAppointment, onUpdateSta
                 </div>
                 <div className="space-y-2">
                   <Label htmlFor="time">Appointment Time</Label>
-                  <Input
-                    id="time"
-                    type="time"
-                    value={formData.time}
-                    onChange={(e) => setFormData({ ...formData, time: e.target.value })}
-                    required
-                  />
+                  {slots === null ? (
+                    <Input
+                      id="time"
+                      type="time"
+                      value={formData.time}
+                      onChange={(e) => setFormData({ ...formData, time: e.target.value })}
+                      required
+                    />
+                  ) : (
+                    <Select
+                      value={formData.time}
+                      onValueChange={(value) => setFormData({ ...formData, time: value })}
+                      disabled={slots.length === 0}
+                    >
+                      <SelectTrigger id="time">
+                        <SelectValue placeholder={slots.length ? "Select a free slot" : "No free slots this day"} />
+                      </SelectTrigger>
+                      <SelectContent>
+                        {slots.map((slot) => (
+                          <SelectItem key={slot.time} value={slot.time}>
+                            {slot.time} - {slot.end_time}
+                          </SelectItem>
+                        ))}
+                      </SelectContent>
+                    </Select>
+                  )}
                 </div>
               </div>
               <div className="space-y-2">
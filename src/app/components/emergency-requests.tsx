@@ -1,4 +1,4 @@
-import { useState, useMemo } from "react";
+import { useState, useEffect } from "react";
 import { Card, CardContent, CardHeader, CardTitle } from "@/app/components/ui/card";
 import { Button } from "@/app/components/ui/button";
 import { Input } from "@/app/components/ui/input";
@@ -9,6 +9,7 @@ import { Badge } from "@/app/components/ui/badge";
 import { Alert, AlertDescription, AlertTitle } from "@/app/components/ui/alert";
 import { AlertCircle, Bell, CheckCircle, Clock, Phone, Mail } from "lucide-react";
 import { Donor } from "./donor-management";
+import { fetchEmergencyMatches } from "@/services/api";
 
 export interface EmergencyRequest {
   request_id: string;
@@ -24,12 +25,12 @@ export interface EmergencyRequest {
 
 interface EmergencyRequestsProps {
   requests: EmergencyRequest[];
-  donors: Donor[];
+  donors?: Donor[];
   onAddRequest: (request: Omit<EmergencyRequest, 'request_id' | 'created_at' | 'status'>) => void;
   onUpdateStatus: (requestId: string, status: "fulfilled" | "cancelled") => void;
 }
 
-export function EmergencyRequests({ requests, donors, onAddRequest, onUpdateStatus }: EmergencyRequestsProps) {
+export function EmergencyRequests({ requests, onAddRequest, onUpdateStatus }: EmergencyRequestsProps) {
   const [isDialogOpen, setIsDialogOpen] = useState(false);
   const [selectedRequest, setSelectedRequest] = useState<EmergencyRequest | null>(null);
   const [formData, setFormData] = useState({
@@ -60,29 +61,29 @@ export function EmergencyRequests({ requests, donors, onAddRequest, onUpdateStat
     setIsDialogOpen(false);
   };
 
-  // Memoize donor matching logic - recomputes when donors array changes
-  const findMatchingDonors = useMemo(() => {
-    return (bloodGroup: string, city: string) => {
-      return donors.filter(donor => {
-        // Check blood group compatibility
-        const isBloodGroupMatch = donor.blood_group === bloodGroup || 
-          (bloodGroup === "AB+" ? true : false) || // AB+ can receive from all
-          (bloodGroup === "AB-" && donor.blood_group.endsWith("-")) || // AB- can receive from all negative
-          (donor.blood_group === "O-"); // O- is universal donor
-        
-        // Check city match
-        const isCityMatch = donor.city.toLowerCase() === city.toLowerCase();
-        
-        // Check eligibility (90 days since last donation)
-        const lastDonation = new Date(donor.last_donation_date);
-        const today = new Date();
-        const daysSince = Math.ceil((today.getTime() - lastDonation.getTime()) / (1000 * 60 * 60 * 24));
-        const isEligible = daysSince >= 90;
-        
-        return isBloodGroupMatch && isCityMatch && isEligible;
-      });
-    };
-  }, [donors]);
+  // Matching runs on the server (compatibility table + indexed lookup); load pages on demand
+  const [matches, setMatches] = useState<Donor[]>([]);
+  const [matchCursor, setMatchCursor] = useState<string | null>(null);
+  const [loadingMatches, setLoadingMatches] = useState(false);
+
+  const loadMatches = async (requestId: string, after?: string) => {
+    setLoadingMatches(true);
+    try {
+      const page = await fetchEmergencyMatches(requestId, { limit: 50, after });
+      setMatches(prev => (after ? [...prev, ...page.items] : page.items));
+      setMatchCursor(page.nextCursor);
+    } catch (error) {
+      console.error("Error fetching matching donors:", error);
+    } finally {
+      setLoadingMatches(false);
+    }
+  };
+
+  useEffect(() => {
+    setMatches([]);
+    setMatchCursor(null);
+    if (selectedRequest) loadMatches(selectedRequest.request_id);
+  }, [selectedRequest]);
 
   const pendingRequests = requests.filter(r => r.status === "pending");
   const fulfilledRequests = requests.filter(r => r.status === "fulfilled");
@@ -182,7 +183,6 @@ export function EmergencyRequests({ requests, donors, onAddRequest, onUpdateStat
           </h3>
           <div className="grid grid-cols-1 md:grid-cols-2 gap-4">
             {pendingRequests.map((request) => {
-              const matchingDonors = findMatchingDonors(request.blood_group, request.city);
               const timeAgo = Math.floor((new Date().getTime() - new Date(request.created_at).getTime()) / (1000 * 60));
               
               return (
@@ -223,19 +223,15 @@ export function EmergencyRequests({ requests, donors, onAddRequest, onUpdateStat
 
                     <Alert>
                       <AlertCircle className="h-4 w-4" />
-                      <AlertTitle>Matching Donors: {matchingDonors.length}</AlertTitle>
+                      <AlertTitle>Matching Donors</AlertTitle>
                       <AlertDescription>
-                        {matchingDonors.length > 0 ? (
-                          <Button
-                            variant="link"
-                            className="p-0 h-auto"
-                            onClick={() => setSelectedRequest(request)}
-                          >
-                            View matching donors
-                          </Button>
-                        ) : (
-                          "No eligible donors found in this city"
-                        )}
+                        <Button
+                          variant="link"
+                          className="p-0 h-auto"
+                          onClick={() => setSelectedRequest(request)}
+                        >
+                          View matching donors
+                        </Button>
                       </AlertDescription>
                     </Alert>
 
@@ -274,7 +270,10 @@ export function EmergencyRequests({ requests, donors, onAddRequest, onUpdateStat
               </DialogTitle>
             </DialogHeader>
             <div className="space-y-3 max-h-96 overflow-y-auto">
-              {findMatchingDonors(selectedRequest.blood_group, selectedRequest.city).map((donor) => (
+              {!loadingMatches && matches.length === 0 && (
+                <p className="text-sm text-muted-foreground">No eligible donors found in this city</p>
+              )}
+              {matches.map((donor) => (
                 <Card key={donor.donor_id}>
                   <CardContent className="pt-4">
                     <div className="flex items-center justify-between">
@@ -299,6 +298,16 @@ export function EmergencyRequests({ requests, donors, onAddRequest, onUpdateStat
                   </CardContent>
                 </Card>
               ))}
+              {matchCursor && (
+                <Button
+                  variant="outline"
+                  className="w-full"
+                  disabled={loadingMatches}
+                  onClick={() => loadMatches(selectedRequest.request_id, matchCursor)}
+                >
+                  Load more donors
+                </Button>
+              )}
             </div>
           </DialogContent>
         </Dialog>
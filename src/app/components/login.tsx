@@ -75,12 +75,14 @@ export function Login({ onLoginSuccess }: LoginProps) {
   };
 
   const handleDemoLogin = () => {
-    // Demo login without API call
+    // Demo login without API call. There is no signed token, so writes go out
+    // anonymously (accepted unless the server sets AUTH_REQUIRED=1), and
+    // import, export and status changes need a real admin login
     const demoUser = {
       username: "admin",
       role: "admin",
     };
-    localStorage.setItem("authToken", "demo-token");
+    localStorage.removeItem("authToken");
     localStorage.setItem("username", demoUser.username);
     localStorage.setItem("userRole", demoUser.role);
     onLoginSuccess(demoUser);
@@ -1,11 +1,20 @@
-import { useMemo, useState } from "react";
+import { useEffect, useMemo, useState } from "react";
 import { Card, CardContent, CardHeader, CardTitle } from "@/app/components/ui/card";
 import { Input } from "@/app/components/ui/input";
 import { Label } from "@/app/components/ui/label";
 import { Button } from "@/app/components/ui/button";
 import { Select, SelectContent, SelectItem, SelectTrigger, SelectValue } from "@/app/components/ui/select";
 import { Alert, AlertDescription } from "@/app/components/ui/alert";
-import { MapPin, Droplets } from "lucide-react";
+import { MapPin, Droplets, LocateFixed } from "lucide-react";
+import * as api from "@/services/api";
+
+interface NearestResult {
+  location: string;
+  distance_km: number;
+  blood_group: string;
+  units_available: number;
+  earliest_expiry: string;
+}
 
 export interface NearestBloodBankProps {
   inventory: Array<{
@@ -37,8 +46,45 @@ export function NearestBloodBank({ inventory, onAddRequest }: NearestBloodBankPr
     contact_email: "",
   });
 
+  const [position, setPosition] = useState<{ lat: number; lon: number } | null>(null);
+  const [nearest, setNearest] = useState<NearestResult[] | null>(null);
+  const [locating, setLocating] = useState(false);
+
   const bloodGroups = ["A+", "A-", "B+", "B-", "AB+", "AB-", "O+", "O-"];
 
+  const locate = () => {
+    if (!navigator.geolocation) return;
+    setLocating(true);
+    navigator.geolocation.getCurrentPosition(
+      (pos) => {
+        setPosition({ lat: pos.coords.latitude, lon: pos.coords.longitude });
+        setLocating(false);
+      },
+      () => setLocating(false)
+    );
+  };
+
+  // With a position and a blood group, rank banks by distance on the server
+  useEffect(() => {
+    if (!position || !form.blood_group) {
+      setNearest(null);
+      return;
+    }
+    let cancelled = false;
+    api
+      .fetchNearestInventory({
+        ...position,
+        blood_group: form.blood_group,
+        units: parseInt(form.units_needed) || 1,
+        k: 10,
+      })
+      .then((rows) => !cancelled && setNearest(rows))
+      .catch(() => !cancelled && setNearest(null));
+    return () => {
+      cancelled = true;
+    };
+  }, [position, form.blood_group, form.units_needed]);
+
   const filteredInventory = useMemo(() => {
     const c = city.trim().toLowerCase();
     // We only have `location` field; treat it as city/center name
@@ -104,6 +150,38 @@ export function NearestBloodBank({ inventory, onAddRequest }: NearestBloodBankPr
             </div>
           </div>
 
+          <Button type="button" variant="outline" onClick={locate} disabled={locating}>
+            <LocateFixed className="h-4 w-4 mr-2" />
+            {position ? "Location set" : locating ? "Locating..." : "Use my location"}
+          </Button>
+
+          {nearest && (
+            <div className="grid grid-cols-1 md:grid-cols-2 gap-4 mt-2">
+              {nearest.map((item) => (
+                <Card key={item.location} className="border-red-200">
+                  <CardContent className="pt-4">
+                    <div className="flex items-center justify-between">
+                      <div>
+                        <div className="font-semibold">{item.location}</div>
+                        <div className="text-sm text-muted-foreground">Units Available: {item.units_available}</div>
+                      </div>
+                      <div className="text-sm font-mono">{item.distance_km} km</div>
+                    </div>
+                    <div className="text-xs text-muted-foreground mt-2">Earliest expiry: {item.earliest_expiry}</div>
+                  </CardContent>
+                </Card>
+              ))}
+              {nearest.length === 0 && (
+                <Alert className="md:col-span-2">
+                  <AlertDescription>
+                    No blood bank nearby has enough {form.blood_group} units.
+                  </AlertDescription>
+                </Alert>
+              )}
+            </div>
+          )}
+
+          {!nearest && (
           <div className="grid grid-cols-1 md:grid-cols-2 gap-4 mt-2">
             {filteredInventory
               .filter((i) => !form.blood_group || i.blood_group === form.blood_group)
@@ -129,6 +207,7 @@ export function NearestBloodBank({ inventory, onAddRequest }: NearestBloodBankPr
               </Alert>
             )}
           </div>
+          )}
         </CardContent>
       </Card>
 
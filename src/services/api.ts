@@ -2,46 +2,134 @@
 
 const API_BASE_URL = "http://localhost:8000/api";
 
-// Fetch all donors
-export async function fetchDonors() {
-  const response = await fetch(`${API_BASE_URL}/donors`);
-  if (!response.ok) throw new Error("Failed to fetch donors");
-  return response.json();
+// Signed bearer token issued by /api/auth/login, required by write endpoints
+function authHeaders(headers: Record<string, string> = {}) {
+  const token = localStorage.getItem("authToken");
+  return token ? { ...headers, Authorization: `Bearer ${token}` } : headers;
+}
+
+export type QueryParams = Record<string, string | number | undefined>;
+
+function buildUrl(path: string, params: QueryParams = {}) {
+  const query = new URLSearchParams();
+  Object.entries(params).forEach(([key, value]) => {
+    if (value !== undefined && value !== "") query.set(key, String(value));
+  });
+  const qs = query.toString();
+  return `${API_BASE_URL}${path}${qs ? `?${qs}` : ""}`;
+}
+
+// Fetch a single keyset page; nextCursor is passed back as `after` for the next page
+export async function fetchPage(path: string, params: QueryParams = {}) {
+  const response = await fetch(buildUrl(path, params));
+  if (!response.ok) throw new Error(`Failed to fetch ${path}`);
+  return {
+    items: await response.json(),
+    nextCursor: response.headers.get("X-Next-Cursor"),
+  };
+}
+
+// Rows per list page; screens show the first page and load more on request
+export const LIST_PAGE_SIZE = 100;
+
+// First page of a list endpoint; pass `after: nextCursor` for the following one
+function fetchListPage(path: string, params: QueryParams = {}) {
+  return fetchPage(path, { limit: LIST_PAGE_SIZE, ...params });
+}
+
+// Fetch a page of donors
+export async function fetchDonors(params: QueryParams = {}) {
+  return fetchListPage("/donors", params);
 }
 
 // Add a new donor
 export async function addDonor(donor: any) {
   const response = await fetch(`${API_BASE_URL}/donors`, {
     method: "POST",
-    headers: { "Content-Type": "application/json" },
+    headers: authHeaders({ "Content-Type": "application/json" }),
     body: JSON.stringify(donor),
   });
   if (!response.ok) throw new Error("Failed to add donor");
   return response.json();
 }
 
-// Fetch all camps
-export async function fetchCamps() {
-  const response = await fetch(`${API_BASE_URL}/camps`);
-  if (!response.ok) throw new Error("Failed to fetch camps");
-  return response.json();
+export type DashboardSummary = {
+  as_of: string;
+  donors: { total: number; by_blood_group: { blood_group: string; donors: number }[] };
+  camps: { upcoming: number; by_date: { date: string; camps: number }[] };
+  inventory: { units_available: number; by_blood_group: { blood_group: string; units: number }[] };
+  emergency_requests: { pending: number; fulfilled: number; by_status: Record<string, number> };
+  appointments_today: { total: number; scheduled: number; by_status: Record<string, number> };
+  donations_by_month: { month: string; donations: number }[];
+};
+
+// Every dashboard figure in one request, served from maintained counters
+export async function fetchDashboard() {
+  const response = await fetch(`${API_BASE_URL}/dashboard`);
+  if (!response.ok) throw new Error("Failed to fetch dashboard");
+  return response.json() as Promise<DashboardSummary>;
+}
+
+// Fetch a page of camps
+export async function fetchCamps(params: QueryParams = {}) {
+  return fetchListPage("/camps", params);
 }
 
 // Add a new camp
 export async function addCamp(camp: any) {
   const response = await fetch(`${API_BASE_URL}/camps`, {
     method: "POST",
-    headers: { "Content-Type": "application/json" },
+    headers: authHeaders({ "Content-Type": "application/json" }),
     body: JSON.stringify(camp),
   });
   if (!response.ok) throw new Error("Failed to add camp");
   return response.json();
 }
 
-// Fetch all blood inventory
-export async function fetchInventory() {
-  const response = await fetch(`${API_BASE_URL}/inventory`);
-  if (!response.ok) throw new Error("Failed to fetch inventory");
+// Register a donor for a camp; full camps put the donor on the waitlist
+export async function registerForCamp(campId: string, donorId: string) {
+  const response = await fetch(`${API_BASE_URL}/camps/${campId}/register`, {
+    method: "POST",
+    headers: authHeaders({ "Content-Type": "application/json" }),
+    body: JSON.stringify({ donor_id: donorId }),
+  });
+  if (!response.ok) throw new Error("Failed to register for camp");
+  return response.json();
+}
+
+// Cancel a camp registration; the next waitlisted donor takes the seat
+export async function cancelCampRegistration(campId: string, donorId: string) {
+  const response = await fetch(`${API_BASE_URL}/camps/${campId}/registrations/${donorId}`, {
+    method: "DELETE",
+    headers: authHeaders(),
+  });
+  if (!response.ok) throw new Error("Failed to cancel camp registration");
+  return response.json();
+}
+
+// Fetch a page of blood inventory
+export async function fetchInventory(params: QueryParams = {}) {
+  return fetchListPage("/inventory", params);
+}
+
+// Per blood group / location totals split into expiry buckets
+export async function fetchInventorySummary() {
+  const response = await fetch(`${API_BASE_URL}/inventory/summary`);
+  if (!response.ok) throw new Error("Failed to fetch inventory summary");
+  return response.json();
+}
+
+// Closest locations that can cover `units` of `blood_group`, with distance_km
+export async function fetchNearestInventory(params: {
+  lat: number;
+  lon: number;
+  blood_group: string;
+  units?: number;
+  k?: number;
+  radius_km?: number;
+}) {
+  const response = await fetch(buildUrl("/inventory/nearest", params));
+  if (!response.ok) throw new Error("Failed to fetch nearest blood banks");
   return response.json();
 }
 
@@ -49,25 +137,28 @@ export async function fetchInventory() {
 export async function addInventory(item: any) {
   const response = await fetch(`${API_BASE_URL}/inventory`, {
     method: "POST",
-    headers: { "Content-Type": "application/json" },
+    headers: authHeaders({ "Content-Type": "application/json" }),
     body: JSON.stringify(item),
   });
   if (!response.ok) throw new Error("Failed to add inventory");
   return response.json();
 }
 
-// Fetch all emergency requests
-export async function fetchEmergencyRequests() {
-  const response = await fetch(`${API_BASE_URL}/emergency-requests`);
-  if (!response.ok) throw new Error("Failed to fetch emergency requests");
-  return response.json();
+// Fetch a page of emergency requests
+export async function fetchEmergencyRequests(params: QueryParams = {}) {
+  return fetchListPage("/emergency-requests", params);
+}
+
+// Fetch ranked eligible donors for an emergency request, one page at a time
+export async function fetchEmergencyMatches(requestId: string, params: QueryParams = {}) {
+  return fetchPage(`/emergency-requests/${requestId}/matches`, params);
 }
 
 // Add a new emergency request
 export async function addEmergencyRequest(request: any) {
   const response = await fetch(`${API_BASE_URL}/emergency-requests`, {
     method: "POST",
-    headers: { "Content-Type": "application/json" },
+    headers: authHeaders({ "Content-Type": "application/json" }),
     body: JSON.stringify(request),
   });
   if (!response.ok) throw new Error("Failed to add emergency request");
@@ -78,36 +169,66 @@ export async function addEmergencyRequest(request: any) {
 export async function updateEmergencyRequestStatus(requestId: string, status: string) {
   const response = await fetch(`${API_BASE_URL}/emergency-requests/${requestId}/status`, {
     method: "PUT",
-    headers: { "Content-Type": "application/json" },
+    headers: authHeaders({ "Content-Type": "application/json" }),
     body: JSON.stringify({ status }),
   });
   if (!response.ok) throw new Error("Failed to update request status");
   return response.json();
 }
 
-// Fetch all appointments
-export async function fetchAppointments() {
-  const response = await fetch(`${API_BASE_URL}/appointments`);
-  if (!response.ok) throw new Error("Failed to fetch appointments");
-  return response.json();
+// Live change events (Server-Sent Events). EventSource reconnects by itself and
+// resends Last-Event-ID, so events missed during a short drop are replayed.
+export type ChangeEvent = { type: string; data: any };
+
+export function subscribeToEvents(topics: string[], onEvent: (event: ChangeEvent) => void) {
+  const source = new EventSource(buildUrl("/events", { topics: topics.join(",") }));
+  const eventTypes = [
+    "emergency_request.created",
+    "emergency_request.status",
+    "appointment.created",
+    "appointment.status",
+    "inventory.low_stock",
+  ];
+  eventTypes.forEach((type) =>
+    source.addEventListener(type, (e) => onEvent({ type, data: JSON.parse((e as MessageEvent).data) }))
+  );
+  return () => source.close();
+}
+
+// Fetch a page of appointments
+export async function fetchAppointments(params: QueryParams = {}) {
+  return fetchListPage("/appointments", params);
 }
 
 // Add a new appointment
 export async function addAppointment(appointment: any) {
   const response = await fetch(`${API_BASE_URL}/appointments`, {
     method: "POST",
-    headers: { "Content-Type": "application/json" },
+    headers: authHeaders({ "Content-Type": "application/json" }),
     body: JSON.stringify(appointment),
   });
-  if (!response.ok) throw new Error("Failed to add appointment");
+  if (!response.ok) {
+    // 409 when the slot was taken, 400 when it is outside the doctor's hours
+    const error = await response.json().catch(() => ({}));
+    throw new Error(error.detail || "Failed to add appointment");
+  }
   return response.json();
 }
 
+export type AvailabilityDay = { date: string; slots: { time: string; end_time: string }[] };
+
+// Free slots for a doctor between two dates (inclusive)
+export async function fetchDoctorAvailability(doctorId: string, from: string, to?: string) {
+  const response = await fetch(buildUrl(`/doctors/${doctorId}/availability`, { from, to }));
+  if (!response.ok) throw new Error("Failed to fetch doctor availability");
+  return response.json() as Promise<{ has_schedule: boolean; days: AvailabilityDay[] }>;
+}
+
 // Update appointment status
 export async function updateAppointmentStatus(appointmentId: string, status: string) {
   const response = await fetch(`${API_BASE_URL}/appointments/${appointmentId}/status`, {
     method: "PUT",
-    headers: { "Content-Type": "application/json" },
+    headers: authHeaders({ "Content-Type": "application/json" }),
     body: JSON.stringify({ status }),
   });
   if (!response.ok) throw new Error("Failed to update appointment status");
@@ -118,7 +239,7 @@ export async function updateAppointmentStatus(appointmentId: string, status: str
 export async function submitDonation(data: any) {
   const response = await fetch(`${API_BASE_URL}/donations`, {
     method: "POST",
-    headers: { "Content-Type": "application/json" },
+    headers: authHeaders({ "Content-Type": "application/json" }),
     body: JSON.stringify(data),
   });
   if (!response.ok) throw new Error("Failed to submit donation");
@@ -126,16 +247,14 @@ export async function submitDonation(data: any) {
 }
 
 // Doctors master
-export async function fetchDoctors() {
-  const response = await fetch(`${API_BASE_URL}/doctors`);
-  if (!response.ok) throw new Error("Failed to fetch doctors");
-  return response.json();
+export async function fetchDoctors(params: QueryParams = {}) {
+  return fetchListPage("/doctors", params);
 }
 
 export async function addDoctor(doctor: any) {
   const response = await fetch(`${API_BASE_URL}/doctors`, {
     method: "POST",
-    headers: { "Content-Type": "application/json" },
+    headers: authHeaders({ "Content-Type": "application/json" }),
     body: JSON.stringify(doctor),
   });
   if (!response.ok) throw new Error("Failed to add doctor");
@@ -0,0 +1,130 @@
+import logging
+from datetime import timedelta
+
+import dashboard
+
+logger = logging.getLogger("donorconnect.stock")
+
+EXPIRING_SOON_DAYS = 7
+SWEEP_LOCK = "donorconnect_inventory_sweep"
+
+
+def expire_lots(conn, today, batch_size=5000) -> int:
+    """Mark lots past their expiry date as expired, in index-ordered batches.
+
+    Each batch locks its lots over idx_inventory_status_expiry, marks them
+    expired and takes their units off the dashboard counters in one short
+    transaction, so a large backlog never holds row locks for long.
+    """
+    total = 0
+    cur = conn.cursor()
+    try:
+        while True:
+            cur.execute(
+                """
+                SELECT inventory_id, blood_group, units_available FROM blood_inventory
+                WHERE status = 'available' AND expiry_date < %s
+                ORDER BY expiry_date LIMIT %s FOR UPDATE
+                """,
+                (today, batch_size),
+            )
+            lots = cur.fetchall()
+            if lots:
+                cur.execute(
+                    f"UPDATE blood_inventory SET status = 'expired' WHERE inventory_id IN ({', '.join(['%s'] * len(lots))})",
+                    [inventory_id for inventory_id, _, _ in lots],
+                )
+                dashboard.bump(cur, dashboard.units_changed((group, -units) for _, group, units in lots))
+            conn.commit()
+            total += len(lots)
+            if len(lots) < batch_size:
+                return total
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cur.close()
+
+
+def refresh_stock_levels(conn, today, location_threshold, group_threshold):
+    """Rebuild inventory_stock_levels from available lots; return low-stock alerts.
+
+    An alert is raised only when a location or a whole blood group crosses
+    from at or above its threshold to below it since the previous refresh,
+    so a shortage is reported once rather than on every run.
+    """
+    soon = today + timedelta(days=EXPIRING_SOON_DAYS)
+    cur = conn.cursor()
+    try:
+        cur.execute("SELECT blood_group, location, units_available FROM inventory_stock_levels")
+        previous = {(g, loc): units for g, loc, units in cur.fetchall()}
+        cur.execute(
+            """
+            SELECT blood_group, location, COUNT(*), SUM(units_available),
+                   SUM(CASE WHEN expiry_date <= %s THEN units_available ELSE 0 END)
+            FROM blood_inventory
+            WHERE status = 'available' AND expiry_date >= %s
+            GROUP BY blood_group, location
+            """,
+            (soon, today),
+        )
+        current = {(g, loc): (int(lots), int(units or 0), int(expiring or 0))
+                   for g, loc, lots, units, expiring in cur.fetchall()}
+        # Locations that ran dry still get a row, so readers see zero rather than nothing
+        for key in previous.keys() - current.keys():
+            current[key] = (0, 0, 0)
+
+        cur.execute("DELETE FROM inventory_stock_levels")
+        if current:
+            cur.executemany(
+                """
+                INSERT INTO inventory_stock_levels
+                (blood_group, location, lots, units_available, expiring_units, low_stock)
+                VALUES (%s, %s, %s, %s, %s, %s)
+                """,
+                [(g, loc, lots, units, expiring, units < location_threshold)
+                 for (g, loc), (lots, units, expiring) in current.items()],
+            )
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cur.close()
+
+    alerts = []
+    for (group, location), (_, units, expiring) in sorted(current.items()):
+        before = previous.get((group, location))
+        if before is not None and before >= location_threshold > units:
+            alerts.append({"scope": "location", "blood_group": group, "location": location,
+                           "units_available": units, "expiring_units": expiring, "threshold": location_threshold})
+    group_before, group_now = {}, {}
+    for (group, _), units in previous.items():
+        group_before[group] = group_before.get(group, 0) + units
+    for (group, _), (_, units, _) in current.items():
+        group_now[group] = group_now.get(group, 0) + units
+    for group in sorted(group_now):
+        before = group_before.get(group)
+        if before is not None and before >= group_threshold > group_now[group]:
+            alerts.append({"scope": "blood_group", "blood_group": group,
+                           "units_available": group_now[group], "threshold": group_threshold})
+    return alerts
+
+
+def try_lock(conn, name, timeout=0) -> bool:
+    """MySQL named lock so only one worker process runs a job at a time"""
+    cur = conn.cursor()
+    try:
+        cur.execute("SELECT GET_LOCK(%s, %s)", (name, timeout))
+        return cur.fetchone()[0] == 1
+    finally:
+        cur.close()
+
+
+def release_lock(conn, name):
+    cur = conn.cursor()
+    try:
+        cur.execute("SELECT RELEASE_LOCK(%s)", (name,))
+        cur.fetchone()
+    finally:
+        cur.close()
@@ -3,7 +3,7 @@
 import mysql.connector
 from mysql.connector import Error
 
-def test_database_connection():
+def check_database_connection():
     """Test MySQL database connection"""
     print("=" * 50)
     print("Testing MySQL Database Connection...")
@@ -80,7 +80,7 @@ def test_database_connection():
     return True
 
 
-def test_api_endpoints():
+def check_api_endpoints():
     """Test API endpoints"""
     import requests
     
@@ -97,6 +97,7 @@ def test_api_endpoints():
         ("GET", "/inventory", "Fetch Blood Inventory"),
         ("GET", "/emergency-requests", "Fetch Emergency Requests"),
         ("GET", "/appointments", "Fetch Appointments"),
+        ("GET", "/dashboard", "Fetch Dashboard Counters"),
     ]
     
     print("\n🌐 Testing API Endpoints:")
@@ -113,28 +114,230 @@ def test_api_endpoints():
                 print(f" {description:30} : {count} records")
             else:
                 print(f" {description:30} : Status {response.status_code}")
+                api_status = False
         except requests.exceptions.ConnectionError:
             print(f"  {description:30} : API not running (start with 'uvicorn api:app --reload')")
             return False
         except Exception as e:
             print(f" {description:30} : Error - {str(e)}")
+            api_status = False
     
-    print("\nAll API endpoints are working!")
+    if api_status:
+        print("\nAll API endpoints are working!")
+    return api_status
+
+
+def api_session(workers, base="http://localhost:8000/api"):
+    """requests session sized for ``workers`` threads, logged in as the benchmarks.seed admin account"""
+    import os
+    import requests
+
+    session = requests.Session()
+    session.mount("http://", requests.adapters.HTTPAdapter(pool_maxsize=workers))
+    user = os.getenv("BENCH_USER", "bench-admin")
+    password = os.getenv("BENCH_PASSWORD", "bench-admin-password")
+    try:
+        response = session.post(f"{base}/auth/login", json={"username": user, "password": password}, timeout=30)
+        if response.status_code == 401:
+            raise SystemExit(f"Login as {user!r} failed; create the account with 'python -m benchmarks.seed'")
+        response.raise_for_status()
+        session.headers["Authorization"] = f"Bearer {response.json()['token']}"
+    except requests.exceptions.ConnectionError:
+        pass  # reported by the caller's first request
+    return session
+
+
+def check_concurrent_donor_ids(total=2000, workers=64):
+    """Fire parallel POST /api/donors calls and check every returned ID is unique"""
+    import requests
+    from concurrent.futures import ThreadPoolExecutor
+
+    print("\n" + "=" * 50)
+    print(f"Testing ID allocation with {total} parallel donor inserts...")
+    print("=" * 50)
+
+    url = "http://localhost:8000/api/donors"
+    session = api_session(workers)
+
+    def create(i):
+        donor = {
+            "name": f"Load Test Donor {i}",
+            "blood_group": "O+",
+            "phone": f"90000{i:05d}",
+            "email": f"loadtest{i}@example.com",
+            "city": "Testville",
+            "last_donation_date": "2020-01-01",
+            "gender": "Other",
+            "age": 30,
+        }
+        response = session.post(url, json=donor, timeout=30)
+        response.raise_for_status()
+        return response.json()["donor_id"]
+
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            ids = list(executor.map(create, range(total)))
+    except requests.exceptions.ConnectionError:
+        print("  API not running (start with 'uvicorn api:app --reload')")
+        return False
+    except Exception as e:
+        print(f"  Insert failed: {e}")
+        return False
+
+    duplicates = len(ids) - len(set(ids))
+    if duplicates:
+        print(f"  {duplicates} duplicate donor IDs returned!")
+        return False
+    print(f"  {len(ids)} inserts, all donor IDs unique")
     return True
 
 
+def check_camp_registration_capacity(total=2000, capacity=50, workers=128, cancellations=10):
+    """Register ``total`` donors at once for a ``capacity``-seat camp; check nothing is overbooked"""
+    import json
+    import time
+    import requests
+    from collections import Counter
+    from concurrent.futures import ThreadPoolExecutor
+
+    print("\n" + "=" * 50)
+    print(f"Testing {total} simultaneous registrations for a {capacity}-seat camp...")
+    print("=" * 50)
+
+    base = "http://localhost:8000/api"
+    session = api_session(workers)
+    city = f"RegTest{int(time.time())}"
+
+    try:
+        camp = session.post(f"{base}/camps", json={
+            "title": "Registration Load Test", "venue": "Test Hall", "city": city, "date": "2030-01-01",
+            "start_time": "09:00", "end_time": "17:00", "organizer": "Test", "capacity": capacity,
+        }, timeout=30)
+        camp.raise_for_status()
+        camp_id = camp.json()["camp_id"]
+
+        donors = "\n".join(json.dumps({
+            "name": f"Registration Test {i}", "blood_group": "O+", "phone": f"91111{i:05d}",
+            "email": f"regtest{i}@example.com", "city": city, "last_donation_date": "2020-01-01",
+            "gender": "Other", "age": 30,
+        }) for i in range(total))
+        session.post(f"{base}/donors/import?format=ndjson", data=donors.encode(), timeout=120).raise_for_status()
+        donor_ids, after = [], None
+        while True:
+            page = session.get(f"{base}/donors", params={"city": city, "limit": 1000, "after": after}, timeout=30)
+            page.raise_for_status()
+            donor_ids += [d["donor_id"] for d in page.json()]
+            after = page.headers.get("X-Next-Cursor")
+            if not after:
+                break
+    except requests.exceptions.ConnectionError:
+        print("  API not running (start with 'uvicorn api:app --reload')")
+        return False
+
+    def register(donor_id):
+        response = session.post(f"{base}/camps/{camp_id}/register", json={"donor_id": donor_id}, timeout=60)
+        response.raise_for_status()
+        return donor_id, response.json()["status"]
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        results = list(executor.map(register, donor_ids))
+    outcomes = Counter(status for _, status in results)
+    print(f"  {outcomes['registered']} registered, {outcomes['waitlisted']} waitlisted")
+
+    def seats_taken():
+        camps = session.get(f"{base}/camps", params={"city": city}, timeout=30).json()
+        return camps[0]["registered"]
+
+    ok = outcomes["registered"] == min(capacity, len(donor_ids)) and seats_taken() == outcomes["registered"]
+
+    # Cancelling seated donors should hand each seat to the head of the waitlist
+    seated = [donor_id for donor_id, status in results if status == "registered"][:cancellations]
+    promoted = 0
+    for donor_id in seated:
+        response = session.delete(f"{base}/camps/{camp_id}/registrations/{donor_id}", timeout=30)
+        response.raise_for_status()
+        promoted += response.json()["promoted_donor_id"] is not None
+    expected_promotions = min(len(seated), outcomes["waitlisted"])
+    ok = ok and promoted == expected_promotions and seats_taken() == min(capacity, len(donor_ids))
+    print(f"  {len(seated)} cancellations, {promoted} promoted from the waitlist")
+    print("  No overbooking" if ok else "  Seat count mismatch!")
+    return ok
+
+
+def check_appointment_double_booking(attempts=500, slots=5, workers=64):
+    """Race ``attempts`` bookings over ``slots`` slots of one doctor; each slot must be booked once"""
+    import time
+    import requests
+    from collections import Counter
+    from concurrent.futures import ThreadPoolExecutor
+    from datetime import date, timedelta
+
+    print("\n" + "=" * 50)
+    print(f"Testing {attempts} simultaneous bookings for {slots} appointment slots...")
+    print("=" * 50)
+
+    base = "http://localhost:8000/api"
+    session = api_session(workers)
+    name = f"Dr. Slot Test {int(time.time())}"
+
+    try:
+        doctor = session.post(f"{base}/doctors", json={
+            "name": name, "specialty": "Hematology", "phone": "9000000000",
+            "email": "slottest@example.com", "city": "Testville",
+        }, timeout=30)
+        doctor.raise_for_status()
+        doctor_id = doctor.json()["doctor_id"]
+        session.put(f"{base}/doctors/{doctor_id}/schedule", json=[
+            {"weekday": d, "start_time": "09:00", "end_time": "17:00", "slot_minutes": 30} for d in range(7)
+        ], timeout=30).raise_for_status()
+    except requests.exceptions.ConnectionError:
+        print("  API not running (start with 'uvicorn api:app --reload')")
+        return False
+
+    day = (date.today() + timedelta(days=1)).isoformat()
+    times = [f"{9 + i // 2:02d}:{30 * (i % 2):02d}" for i in range(slots)]
+
+    def book(i):
+        response = session.post(f"{base}/appointments", json={
+            "patient_name": f"Slot Test {i}", "doctor_id": doctor_id, "doctor_name": name,
+            "specialty": "Hematology", "date": day, "time": times[i % slots],
+            "reason": "Load test", "phone": "9000000000",
+        }, timeout=60)
+        return times[i % slots], response.status_code
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        results = list(executor.map(book, range(attempts)))
+    booked = Counter(slot for slot, code in results if code == 200)
+    codes = Counter(code for _, code in results)
+    print(f"  {codes[200]} booked, {codes[409]} rejected as conflicts, {attempts - codes[200] - codes[409]} other")
+
+    availability = session.get(f"{base}/doctors/{doctor_id}/availability",
+                               params={"from": day, "to": day}, timeout=30).json()
+    free = {slot["time"] for slot in availability["days"][0]["slots"]}
+    ok = all(booked[t] == 1 for t in times) and codes[200] + codes[409] == attempts and not free & set(times)
+    print("  Every slot booked exactly once" if ok else "  Double booking or lost booking!")
+    return ok
+
+
 if __name__ == "__main__":
+    import sys
+
+    if "--concurrency" in sys.argv:
+        # Writes thousands of test donors; run only against a disposable database
+        sys.exit(0 if check_concurrent_donor_ids() and check_camp_registration_capacity()
+                 and check_appointment_double_booking() else 1)
+
     print("\nDonorConnect Backend Testing Suite")
     print("=" * 50)
     
     # Test database connection
-    db_status = test_database_connection()
+    db_status = check_database_connection()
     
     # Test API endpoints (only if database is working)
     api_status = False
     if db_status:
         print("\nTesting API endpoints (make sure FastAPI server is running)...")
-        api_status = test_api_endpoints()
+        api_status = check_api_endpoints()
     
     print("\n" + "=" * 50)
     print("Testing Complete!")
@@ -153,4 +356,4 @@ if __name__ == "__main__":
         print("\nPlease fix database connection issues first!")
         print("  - Check MySQL is running")
         print("  - Verify credentials in api.py")
-        print("  - Run: mysql -u root -p < database_schema.sql")
+        print("  - Run: python schema.py migrate")
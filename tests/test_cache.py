@@ -0,0 +1,52 @@
+import time
+
+from cache import TTLCache
+
+
+def test_get_returns_default_when_missing():
+    cache = TTLCache()
+    assert cache.get("missing") is None
+    assert cache.get("missing", 1) == 1
+    assert cache.misses == 2
+
+
+def test_set_then_get():
+    cache = TTLCache()
+    cache.set("k", {"a": 1})
+    assert cache.get("k") == {"a": 1}
+    assert cache.hits == 1
+
+
+def test_entries_expire():
+    cache = TTLCache(ttl=60)
+    cache.set("short", 1, ttl=0.01)
+    cache.set("long", 2)
+    time.sleep(0.02)
+    assert cache.get("short") is None
+    assert cache.get("long") == 2
+    assert len(cache) == 1
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = TTLCache(maxsize=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+
+
+def test_invalidate_makes_namespace_keys_unreachable():
+    cache = TTLCache()
+    donors = cache.key(("donors",), "page", 1)
+    both = cache.key(("donors", "camps"), "summary")
+    camps = cache.key(("camps",), "page", 1)
+    for key in (donors, both, camps):
+        cache.set(key, "cached")
+    cache.invalidate("donors")
+    assert cache.get(cache.key(("donors",), "page", 1)) is None
+    assert cache.get(cache.key(("donors", "camps"), "summary")) is None
+    assert cache.get(cache.key(("camps",), "page", 1)) == "cached"
+    assert cache.generation("donors") == 1
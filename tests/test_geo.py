@@ -0,0 +1,51 @@
+import pytest
+
+from geo import GeoGrid, haversine_km
+
+# Chennai, Bengaluru, Mumbai
+CHENNAI = (13.0827, 80.2707)
+BENGALURU = (12.9716, 77.5946)
+MUMBAI = (19.0760, 72.8777)
+
+
+def test_haversine():
+    assert haversine_km(*CHENNAI, *CHENNAI) == 0
+    assert haversine_km(*CHENNAI, *BENGALURU) == pytest.approx(290, rel=0.02)
+
+
+def grid():
+    g = GeoGrid(cell_deg=0.25)
+    g.add("chennai", *CHENNAI)
+    g.add("bengaluru", *BENGALURU)
+    g.add("mumbai", *MUMBAI)
+    return g
+
+
+def test_nearby_is_sorted_and_bounded_by_radius():
+    found = grid().nearby(*CHENNAI, radius_km=400)
+    assert [key for _, key in found] == ["chennai", "bengaluru"]
+    assert found[0][0] == 0
+
+
+def test_nearby_k_and_accept():
+    g = grid()
+    assert [key for _, key in g.nearby(*CHENNAI, radius_km=2000, k=1)] == ["chennai"]
+    found = g.nearby(*CHENNAI, radius_km=2000, k=1, accept=lambda key: key != "chennai")
+    assert [key for _, key in found] == ["bengaluru"]
+
+
+def test_add_moves_and_remove_drops_points():
+    g = grid()
+    g.add("chennai", *MUMBAI)
+    assert len(g) == 3
+    assert [key for _, key in g.nearby(*CHENNAI, radius_km=50)] == []
+    g.remove("chennai")
+    g.remove("unknown")
+    assert len(g) == 2
+    assert [key for _, key in g.nearby(*MUMBAI, radius_km=50)] == ["mumbai"]
+
+
+def test_nearby_wraps_around_the_antimeridian():
+    g = GeoGrid(cell_deg=0.25)
+    g.add("east", 0.0, 179.9)
+    assert [key for _, key in g.nearby(0.0, -179.9, radius_km=50)] == ["east"]
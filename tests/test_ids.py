@@ -0,0 +1,149 @@
+import threading
+
+import pytest
+
+from ids import IdAllocator, format_id, normalize_id
+
+
+class FakeSequences:
+    """Just enough of MySQL's id_sequences table for IdAllocator"""
+
+    def __init__(self, highest=None):
+        self.highest = highest or {}  # table -> highest number already used
+        self.next_value = {}
+        self.round_trips = 0
+        # MySQL's row lock on the sequence makes each UPDATE atomic
+        self.lock = threading.Lock()
+
+    def connect(self):
+        return FakeConnection(self)
+
+
+class FakeConnection:
+    def __init__(self, sequences):
+        self.sequences = sequences
+        self.last_insert_id = 0
+
+    def cursor(self):
+        return FakeCursor(self)
+
+    def commit(self):
+        pass
+
+    def rollback(self):
+        pass
+
+    def close(self):
+        pass
+
+
+class FakeCursor:
+    def __init__(self, conn):
+        self.conn = conn
+        self.rowcount = -1
+        self._result = None
+
+    def execute(self, sql, params=()):
+        seqs = self.conn.sequences
+        if sql.startswith("UPDATE id_sequences"):
+            size, table = params
+            with seqs.lock:
+                self.rowcount = int(table in seqs.next_value)
+                if self.rowcount:
+                    seqs.next_value[table] += size
+                    self.conn.last_insert_id = seqs.next_value[table]
+        elif "INSERT IGNORE INTO id_sequences" in sql:
+            (table,) = params
+            with seqs.lock:
+                seqs.next_value.setdefault(table, seqs.highest.get(table, 0) + 1)
+        elif sql == "SELECT LAST_INSERT_ID()":
+            seqs.round_trips += 1
+            self._result = (self.conn.last_insert_id,)
+        else:
+            raise AssertionError(f"Unexpected SQL: {sql}")
+
+    def fetchone(self):
+        return self._result
+
+    def close(self):
+        pass
+
+
+def test_sequence_is_seeded_past_existing_ids():
+    allocator = IdAllocator(FakeSequences({"donors": 41}).connect)
+    assert allocator.next_ids("donors", 3) == [format_id("D", 42), format_id("D", 43), format_id("D", 44)]
+
+
+def test_ids_come_from_the_cached_block():
+    sequences = FakeSequences()
+    allocator = IdAllocator(sequences.connect, block_size=20)
+    ids = [allocator.next_id("camps") for _ in range(20)]
+    assert ids == [format_id("C", n) for n in range(1, 21)]
+    assert sequences.round_trips == 1
+    allocator.next_id("camps")
+    assert sequences.round_trips == 2
+
+
+def test_large_batch_reserves_in_one_round_trip():
+    sequences = FakeSequences()
+    allocator = IdAllocator(sequences.connect, block_size=20)
+    assert len(set(allocator.next_ids("appointments", 500))) == 500
+    assert sequences.round_trips == 1
+
+
+def test_unknown_table_is_rejected():
+    with pytest.raises(KeyError):
+        IdAllocator(FakeSequences().connect).next_id("nope")
+
+
+def test_ids_sort_in_numeric_order():
+    ids = [format_id("D", n) for n in (1, 999, 1000, 123456)]
+    assert ids == sorted(ids)
+    assert format_id("D", 1000) == "D0001000"
+    with pytest.raises(ValueError):
+        format_id("D", 10 ** 7)
+
+
+def test_normalize_id_accepts_old_padding():
+    assert normalize_id("d042") == normalize_id("D42") == "D0000042"
+
+
+def test_allocators_sharing_a_sequence_get_disjoint_blocks():
+    # Two workers, each with its own allocator and connection, reserving from one table
+    sequences = FakeSequences({"donors": 7})
+    first = IdAllocator(sequences.connect, block_size=5)
+    second = IdAllocator(sequences.connect, block_size=5)
+    issued = []
+    for _ in range(12):
+        issued.append(first.next_id("donors"))
+        issued.append(second.next_id("donors"))
+    issued.extend(second.next_ids("donors", 30))
+    assert len(set(issued)) == len(issued)
+    assert min(issued) == format_id("D", 8)
+    assert sequences.round_trips == 3 + 3 + 1
+
+
+def test_concurrent_allocation_never_repeats_an_id():
+    # Like thousands of parallel POST /api/donors across several workers: 4 allocators
+    # (one per process), 16 threads on each, single IDs and small batches mixed
+    sequences = FakeSequences({"donors": 999})
+    allocators = [IdAllocator(sequences.connect, block_size=7) for _ in range(4)]
+    issued = []
+    start = threading.Barrier(64)
+
+    def work(allocator, n):
+        start.wait()
+        for i in range(100):
+            if (i + n) % 10 == 0:
+                issued.extend(allocator.next_ids("donors", 5))
+            else:
+                issued.append(allocator.next_id("donors"))
+
+    threads = [threading.Thread(target=work, args=(allocators[n % 4], n)) for n in range(64)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len(issued) == 64 * (90 + 10 * 5)
+    assert len(set(issued)) == len(issued)
+    assert min(issued) == format_id("D", 1000)
@@ -0,0 +1,135 @@
+import ast
+import os
+import re
+
+import pytest
+
+import schema
+from repository import Repository
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# The modules whose queries the API runs; api.py itself must hold no SQL
+MODULES = ["repository", "scheduling", "intents", "stock_levels", "dashboard", "geo", "ids"]
+SQL = re.compile(r"\s*(SELECT|INSERT|UPDATE|DELETE|REPLACE)\b")
+# Single-row writes and SELECTs of no table have no access path worth an EXPLAIN
+NO_PLAN = re.compile(r"(INSERT INTO \w+ \([^)]*\) VALUES|SELECT (?!.* FROM ))")
+
+# Queries built with f-strings, by enclosing function: the catalog entries covering them
+DYNAMIC = {
+    "repository.Repository.page": ["list_donors", "list_donors_by_city", "list_inventory_by_group"],
+    "repository.Repository.stream_table": ["export_donors", "export_inventory_fields"],
+    "repository.Repository.eligible_donors": ["match_donors"],
+    "scheduling.OVERLAP_SQL": ["doctor_slot_overlap"],
+    "intents.IntentEngine._answer_inventory": ["chat_inventory"],
+    "stock_levels.expire_lots": ["expire_lots_mark"],
+    "ids.IdAllocator._seed": ["id_sequence_seed"],
+}
+
+
+def normalize(sql):
+    return re.sub(r"\s+", " ", sql).strip()
+
+
+CATALOG = {name: normalize(sql) for name, sql, _, _ in schema.QUERY_CATALOG}
+
+
+def catalogued(sql):
+    """A query is covered when an entry is it, or it is the fixed start of one built up by +="""
+    sql = normalize(sql)
+    return any(entry == sql or entry.startswith(sql + " ") for entry in CATALOG.values())
+
+
+def sql_literals(module):
+    """(scope, sql) for each SQL string constant and (scope, None) for each SQL f-string"""
+    tree = ast.parse(open(os.path.join(ROOT, module + ".py")).read())
+    found = []
+
+    def visit(node, scope):
+        if isinstance(node, (ast.ClassDef, ast.FunctionDef)):
+            scope = f"{scope}.{node.name}"
+        elif isinstance(node, ast.Assign) and scope == module and isinstance(node.targets[0], ast.Name):
+            scope = f"{scope}.{node.targets[0].id}"
+        if isinstance(node, ast.JoinedStr):
+            first = node.values[0]
+            if isinstance(first, ast.Constant) and SQL.match(first.value):
+                found.append((scope, None))
+            return
+        if isinstance(node, ast.Constant) and isinstance(node.value, str) and SQL.match(node.value):
+            found.append((scope, node.value))
+        for child in ast.iter_child_nodes(node):
+            visit(child, scope)
+
+    visit(tree, module)
+    return found
+
+
+@pytest.mark.parametrize("module", MODULES)
+def test_every_query_is_in_the_catalog(module):
+    missing = [sql for _, sql in sql_literals(module)
+               if sql is not None and not NO_PLAN.match(normalize(sql)) and not catalogued(sql)]
+    assert not missing, f"add these {module} queries to schema.QUERY_CATALOG: {missing}"
+
+
+@pytest.mark.parametrize("module", MODULES)
+def test_built_queries_are_mapped_to_catalog_entries(module):
+    scopes = {scope for scope, sql in sql_literals(module) if sql is None}
+    unmapped = scopes - DYNAMIC.keys()
+    assert not unmapped, f"list the catalog entries covering {unmapped} in DYNAMIC"
+    for scope in scopes:
+        assert set(DYNAMIC[scope]) <= CATALOG.keys(), scope
+
+
+def test_handlers_leave_sql_to_the_repository():
+    assert sql_literals("api") == []
+
+
+class RecordingConnection:
+    def __init__(self):
+        self.executed = []
+
+    def statement(self, sql):
+        return RecordingCursor(self)
+
+    def cursor(self, buffered=True):
+        return RecordingCursor(self)
+
+
+class RecordingCursor:
+    def __init__(self, conn):
+        self.conn = conn
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, sql, params=()):
+        self.conn.executed.append(sql)
+        self.column_names = ()
+
+    def fetchall(self):
+        return []
+
+    def fetchmany(self, size):
+        return []
+
+    def close(self):
+        pass
+
+
+@pytest.mark.parametrize("name, call", [
+    ("list_donors", lambda repo: repo.page("donors", "donor_id", ["donor_id", "name"], {})),
+    ("list_donors_by_city",
+     lambda repo: repo.page("donors", "donor_id", ["donor_id", "name"], {"city": "Kolkata"}, after="D0000001")),
+    ("list_inventory_by_group",
+     lambda repo: repo.page("blood_inventory", "inventory_id", ["inventory_id", "units_available"],
+                            {"status": "available", "blood_group": "A+"})),
+    ("export_donors",
+     lambda repo: list(repo.stream_table("donors", "donor_id",
+                                         ["donor_id", "name", "blood_group", "city", "last_donation_date"]))),
+])
+def test_repository_builders_render_the_catalogued_sql(name, call):
+    conn = RecordingConnection()
+    call(Repository(conn))
+    assert [normalize(sql) for sql in conn.executed] == [CATALOG[name]]
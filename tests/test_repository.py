@@ -0,0 +1,258 @@
+import threading
+
+import mysql.connector
+import pytest
+
+from repository import NotFound, Repository
+
+
+class FakeCamps:
+    """One camp, its registrations and the donors table, driven through Repository SQL.
+
+    Every statement runs under one lock, standing in for the atomicity
+    MySQL gives a single statement.
+    """
+
+    def __init__(self, capacity, registered=0, donors=(), waitlist=()):
+        self.capacity = capacity
+        self.registered = registered
+        self.donors = set(donors) | set(waitlist)
+        # registration_id -> [donor_id, status]
+        self.registrations = {i: [donor, "waitlisted"] for i, donor in enumerate(waitlist, 1)}
+        self.lock = threading.Lock()
+
+    def statement(self, sql):
+        return FakeCursor(self)
+
+    def live(self, status):
+        return sorted(i for i, (_, s) in self.registrations.items() if s == status)
+
+
+class FakeCursor:
+    def __init__(self, camps):
+        self.camps = camps
+        self.rowcount = 0
+        self.lastrowid = None
+        self.column_names = ()
+        self._rows = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, sql, params=()):
+        with self.camps.lock:
+            self._execute(sql, params)
+
+    def _execute(self, sql, params):
+        camps = self.camps
+        regs = camps.registrations
+        if sql.startswith("UPDATE camps SET registered = registered + 1"):
+            if camps.registered < camps.capacity:
+                camps.registered += 1
+                self.rowcount = 1
+        elif sql.startswith("UPDATE camps SET registered = registered - 1"):
+            if camps.registered > 0:
+                camps.registered -= 1
+                self.rowcount = 1
+        elif sql.startswith("SELECT 1 AS found FROM camps"):
+            self._result(("found",), [(1,)] if params[0] == "C1" else [])
+        elif sql.startswith("INSERT INTO camp_registrations"):
+            camp_id, status, donor_id = params
+            if donor_id not in camps.donors:
+                return
+            if any(donor == donor_id for donor, _ in regs.values()):
+                raise mysql.connector.errors.IntegrityError("Duplicate entry")
+            self.lastrowid = max(regs, default=0) + 1
+            regs[self.lastrowid] = [donor_id, status]
+            self.rowcount = 1
+        elif sql.startswith("SELECT COUNT(*) AS position"):
+            _, registration_id = params
+            self._result(("position",), [(sum(1 for i in camps.live("waitlisted") if i <= registration_id),)])
+        elif sql.startswith("SELECT registration_id, status FROM camp_registrations"):
+            _, donor_id = params
+            self._result(("registration_id", "status"),
+                         [(i, status) for i, (donor, status) in regs.items() if donor == donor_id])
+        elif sql.startswith("SELECT registration_id, donor_id FROM camp_registrations"):
+            self._result(("registration_id", "donor_id"), [(i, regs[i][0]) for i in camps.live("waitlisted")[:1]])
+        elif sql.startswith("UPDATE camp_registrations SET status = 'registered'"):
+            regs[params[0]][1] = "registered"
+            self.rowcount = 1
+        elif sql.startswith("UPDATE camp_registrations SET status = 'cancelled'"):
+            regs[params[0]][1] = "cancelled"
+            self.rowcount = 1
+        else:
+            raise AssertionError(f"Unexpected SQL: {sql}")
+
+    def _result(self, names, rows):
+        self.column_names = names
+        self._rows = rows
+
+    def fetchall(self):
+        return self._rows
+
+
+def test_register_seats_until_full_then_waitlists():
+    camps = FakeCamps(capacity=2, donors=["D1", "D2", "D3", "D4"])
+    repo = Repository(camps)
+    results = [repo.register("C1", donor) for donor in ("D1", "D2", "D3", "D4")]
+    assert [r["status"] for r in results] == ["registered", "registered", "waitlisted", "waitlisted"]
+    assert [r.get("waitlist_position") for r in results] == [None, None, 1, 2]
+    assert camps.registered == 2
+
+
+def test_register_unknown_camp_or_donor():
+    repo = Repository(FakeCamps(capacity=0, donors=["D1"]))
+    with pytest.raises(NotFound, match="Camp"):
+        repo.register("C2", "D1")
+    with pytest.raises(NotFound, match="Donor"):
+        repo.register("C1", "D9")
+
+
+def test_register_twice_is_an_integrity_error():
+    repo = Repository(FakeCamps(capacity=5, donors=["D1"]))
+    repo.register("C1", "D1")
+    with pytest.raises(mysql.connector.errors.IntegrityError):
+        repo.register("C1", "D1")
+
+
+def test_concurrent_registrations_never_oversell():
+    capacity, donors = 25, [f"D{n}" for n in range(400)]
+    camps = FakeCamps(capacity=capacity, donors=donors)
+    results = []
+    start = threading.Barrier(16)
+
+    def sign_up(chunk):
+        repo = Repository(camps)
+        start.wait()
+        for donor in chunk:
+            results.append(repo.register("C1", donor))
+
+    threads = [threading.Thread(target=sign_up, args=(donors[i::16],)) for i in range(16)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert camps.registered == capacity
+    assert len(camps.live("registered")) == capacity
+    assert sum(r["status"] == "registered" for r in results) == capacity
+    positions = sorted(r["waitlist_position"] for r in results if r["status"] == "waitlisted")
+    assert positions == list(range(1, len(donors) - capacity + 1))
+
+
+def test_freed_seat_goes_to_head_of_waitlist():
+    camps = FakeCamps(capacity=10, registered=10, waitlist=["D2", "D3"])
+    assert Repository(camps).free_seat("C1") == "D2"
+    assert camps.registrations[1] == ["D2", "registered"]
+    assert camps.registrations[2] == ["D3", "waitlisted"]
+    # The seat changed hands, so the count stays the same
+    assert camps.registered == 10
+
+
+def test_waitlist_is_promoted_in_order():
+    camps = FakeCamps(capacity=10, registered=10, waitlist=["D2", "D3"])
+    repo = Repository(camps)
+    assert [repo.free_seat("C1"), repo.free_seat("C1")] == ["D2", "D3"]
+    assert repo.free_seat("C1") is None
+    assert camps.registered == 9
+
+
+def test_empty_waitlist_frees_the_seat():
+    camps = FakeCamps(capacity=1, registered=1)
+    repo = Repository(camps)
+    assert repo.free_seat("C1") is None
+    assert camps.registered == 0
+    # Never goes negative
+    assert repo.free_seat("C1") is None
+    assert camps.registered == 0
+
+
+def test_cancel_promotes_and_rejects_repeats():
+    camps = FakeCamps(capacity=1, donors=["D1", "D2"])
+    repo = Repository(camps)
+    repo.register("C1", "D1")
+    repo.register("C1", "D2")
+    assert repo.cancel_registration("C1", "D1") == "D2"
+    assert camps.registered == 1
+    with pytest.raises(NotFound, match="Registration"):
+        repo.cancel_registration("C1", "D1")
+    # Leaving the waitlist frees nothing
+    camps.registrations[3] = ["D3", "waitlisted"]
+    assert repo.cancel_registration("C1", "D3") is None
+    assert camps.registered == 1
+
+
+class ScriptedConnection:
+    """Answers each query with canned rows and records what ran"""
+
+    def __init__(self, columns, rows):
+        self.columns = columns
+        self.rows = rows
+        self.executed = []
+        self.closed = 0
+
+    def statement(self, sql):
+        return ScriptedCursor(self)
+
+    def cursor(self, buffered=True):
+        return ScriptedCursor(self)
+
+
+class ScriptedCursor(FakeCursor):
+    def __init__(self, conn):
+        super().__init__(None)
+        self.conn = conn
+
+    def execute(self, sql, params=()):
+        self.conn.executed.append((sql, tuple(params)))
+        self._result(self.conn.columns, list(self.conn.rows))
+
+    def executemany(self, sql, rows):
+        self.conn.executed.append((sql, list(rows)))
+        self.rowcount = len(rows)
+
+    def fetchmany(self, size):
+        batch, self._rows = self._rows[:size], self._rows[size:]
+        return batch
+
+    def close(self):
+        self.conn.closed += 1
+
+
+def test_doctor_id_by_name_needs_exactly_one_match():
+    assert Repository(ScriptedConnection(("doctor_id",), [("T1",)])).doctor_id_by_name("Dr. Rao") == "T1"
+    assert Repository(ScriptedConnection(("doctor_id",), [("T1",), ("T2",)])).doctor_id_by_name("Dr. Rao") is None
+    assert Repository(ScriptedConnection(("doctor_id",), [])).doctor_id_by_name("Dr. Rao") is None
+
+
+def test_stock_levels_filters_and_converts_flags():
+    conn = ScriptedConnection(("blood_group", "low_stock"), [("O+", 1), ("A+", 0)])
+    rows = Repository(conn).stock_levels(blood_group="O+")
+    assert rows == [{"blood_group": "O+", "low_stock": True}, {"blood_group": "A+", "low_stock": False}]
+    sql, params = conn.executed[0]
+    assert "WHERE blood_group = %s ORDER BY" in sql and params == ("O+",)
+
+
+def test_stream_table_batches_and_closes_the_cursor():
+    conn = ScriptedConnection(("donor_id",), [(f"D{n}",) for n in range(5)])
+    batches = list(Repository(conn).stream_table("donors", "donor_id", ["donor_id"], fetch_size=2))
+    assert [len(b) for b in batches] == [2, 2, 1]
+    assert conn.executed[0][0] == "SELECT donor_id FROM donors ORDER BY donor_id"
+    assert conn.closed == 1
+
+
+def test_stream_table_closes_the_cursor_when_abandoned():
+    conn = ScriptedConnection(("donor_id",), [(f"D{n}",) for n in range(5)])
+    batches = Repository(conn).stream_table("donors", "donor_id", ["donor_id"], fetch_size=2)
+    next(batches)
+    batches.close()
+    assert conn.closed == 1
+
+
+def test_bulk_inserts_use_one_executemany():
+    conn = ScriptedConnection((), [])
+    assert Repository(conn).insert_donors([("D1",), ("D2",)]) == 2
+    sql, rows = conn.executed[0]
+    assert sql.startswith("INSERT INTO donors") and len(rows) == 2
@@ -0,0 +1,52 @@
+from datetime import timedelta
+
+import pytest
+
+from scheduling import IntervalIndex, format_minutes, to_minutes
+
+
+def test_empty_index_has_no_conflicts():
+    assert not IntervalIndex().conflicts(0, 24 * 60)
+
+
+def test_conflicts_are_half_open():
+    index = IntervalIndex()
+    index.add(600, 630)
+    assert index.conflicts(600, 630)
+    assert index.conflicts(615, 645)
+    assert index.conflicts(570, 601)
+    # Touching at either end is not an overlap
+    assert not index.conflicts(630, 660)
+    assert not index.conflicts(570, 600)
+
+
+def test_overlapping_intervals_merge():
+    index = IntervalIndex()
+    index.add(600, 630)
+    index.add(660, 690)
+    assert len(index) == 2
+    index.add(620, 670)
+    assert len(index) == 1
+    assert index.conflicts(689, 700)
+    # Back-to-back appointments touch but stay separate intervals
+    index.add(690, 720)
+    assert len(index) == 2
+    assert index.conflicts(700, 710)
+    assert not index.conflicts(720, 750)
+
+
+def test_gap_between_intervals_stays_free():
+    index = IntervalIndex()
+    index.add(540, 570)
+    index.add(600, 630)
+    assert not index.conflicts(570, 600)
+    assert index.conflicts(560, 610)
+
+
+def test_to_minutes_accepts_mysql_and_string_times():
+    assert to_minutes(timedelta(hours=9, minutes=30)) == 570
+    assert to_minutes("09:30") == 570
+    assert to_minutes("09:30:59") == 570
+    assert format_minutes(570) == "09:30"
+    with pytest.raises(ValueError):
+        to_minutes("930")
@@ -0,0 +1,36 @@
+import pytest
+
+import schema
+
+
+class FakeCursor:
+    def __init__(self, rows):
+        self.rows = rows
+        self.executed = []
+
+    def execute(self, sql, params=()):
+        self.executed.append((sql, params))
+
+    def fetchall(self):
+        return self.rows
+
+
+def test_id_rewrite_proceeds_without_foreign_keys():
+    cur = FakeCursor([])
+    schema.check_id_references(cur)
+    sql, params = cur.executed[0]
+    assert sql.count("%s") == len(params) == 2 * len(schema.ID_COLUMNS)
+
+
+def test_id_rewrite_refuses_foreign_keys():
+    cur = FakeCursor([("camp_registrations", "donor_id", "donors", "donor_id")])
+    with pytest.raises(RuntimeError, match="camp_registrations.donor_id -> donors.donor_id"):
+        schema.check_id_references(cur)
+
+
+def test_id_rewrite_is_a_single_transaction():
+    statements = next(statements for version, _, statements in schema.MIGRATIONS if version == 11)
+    assert statements[0] is schema.check_id_references
+    # DDL would commit implicitly and leave a half-padded database behind on failure
+    assert all(s.startswith("UPDATE ") for s in statements[1:])
+    assert {table for table, _ in schema.ID_COLUMNS} <= {s.split()[1] for s in statements[1:]}